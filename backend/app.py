@@ -4,18 +4,30 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import logging
-from flask import Flask
+from io import BytesIO
+from flask import Flask, Request
 from flask_cors import CORS
 from routes.auth_routes import auth_bp
 from routes.resume_routes import resume_bp
 from routes.interview_routes import interview_bp
 from routes.admin_routes import admin_bp
 from routes.student_routes import student_bp
-from config import SECRET_KEY
+from config import SECRET_KEY, MAX_FILE_SIZE
+from services.resume_service import resume_pending_jobs
+import database
 
-# Configure Flask to serve the frontend folder at the root path
-app = Flask(__name__, static_folder='../frontend', static_url_path='/')
-app.secret_key = SECRET_KEY
+class InMemoryUploadRequest(Request):
+    """
+    Keep uploaded files up to the resume size limit in memory (Werkzeug
+    spools anything over 500KB to a temporary file), since resumes are
+    parsed straight from the uploaded bytes.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Allow some room for the multipart headers around the file
+        if total_content_length is not None and total_content_length <= MAX_FILE_SIZE + 64 * 1024:
+            return BytesIO()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
 
 # Configure logging
 logging.basicConfig(
@@ -24,31 +36,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Enable CORS with restricted origins
-CORS(app, resources={
-    r"/*": {"origins": ["*"]}
-})
+def create_app():
+    """
+    Build the application. Kept out of module scope so that importing this
+    module (e.g. a spawned resume-import process re-importing the main
+    script) does not redo the startup work.
+    """
+    # Configure Flask to serve the frontend folder at the root path
+    app = Flask(__name__, static_folder='../frontend', static_url_path='/')
+    app.request_class = InMemoryUploadRequest
+    app.secret_key = SECRET_KEY
+
+    # Enable CORS with restricted origins
+    CORS(app, resources={
+        r"/*": {"origins": ["*"]}
+    })
+
+    # One pooled database connection per request, released on teardown
+    database.init_app(app)
+
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(resume_bp)
+    app.register_blueprint(interview_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(student_bp)
 
-app.register_blueprint(auth_bp)
-app.register_blueprint(resume_bp)
-app.register_blueprint(interview_bp)
-app.register_blueprint(admin_bp)
-app.register_blueprint(student_bp)
+    @app.route('/')
+    def home():
+        # Serve the main frontend page
+        return app.send_static_file('index.html')
 
-@app.route('/')
-def home():
-    # Serve the main frontend page
-    return app.send_static_file('index.html')
+    @app.errorhandler(404)
+    def not_found(error):
+        return {'error': 'Endpoint not found'}, 404
 
-@app.errorhandler(404)
-def not_found(error):
-    return {'error': 'Endpoint not found'}, 404
+    @app.errorhandler(500)
+    def internal_error(error):
+        logger.error(f'Internal server error: {str(error)}')
+        return {'error': 'Internal server error'}, 500
 
-@app.errorhandler(500)
-def internal_error(error):
-    logger.error(f'Internal server error: {str(error)}')
-    return {'error': 'Internal server error'}, 500
+    # Finish resume uploads that were still being parsed when the server stopped
+    resume_pending_jobs()
+    return app
 
 if __name__=='__main__':
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
-    app.run(debug=debug_mode, host='127.0.0.1', port=5000)
+    create_app().run(debug=debug_mode, host='127.0.0.1', port=5000)
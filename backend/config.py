@@ -4,11 +4,84 @@ BASE_DIR=os.path.dirname(os.path.abspath(__file__))
 # Generate a secure secret key from environment or use a strong default
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production-12345')
 DATABASE_PATH = os.path.join(BASE_DIR, '../database/interview.db')
+# Idle SQLite connections kept open for reuse (per process)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+# SQLite tuning applied to every new connection: 'wal' (default) or 'legacy'
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'wal').lower()
+# Optional per-setting overrides of the chosen profile (unset = profile value)
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE')  # WAL, DELETE, TRUNCATE, ...
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS')  # OFF, NORMAL, FULL, EXTRA
+SQLITE_BUSY_TIMEOUT_MS = os.getenv('SQLITE_BUSY_TIMEOUT_MS')
+SQLITE_CACHE_SIZE_KB = os.getenv('SQLITE_CACHE_SIZE_KB')
+SQLITE_MMAP_SIZE_MB = os.getenv('SQLITE_MMAP_SIZE_MB')
+SQLITE_FOREIGN_KEYS = os.getenv('SQLITE_FOREIGN_KEYS')  # on / off
 
 # Upload configuration
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 ALLOWED_EXTENSIONS = {'pdf'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+# Limits on the text read from one PDF (utils/pdf_parser.py)
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '30'))
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', '200000'))
+PDF_PAGE_TIMEOUT = float(os.getenv('PDF_PAGE_TIMEOUT', '2'))  # seconds
+
+# Background resume parsing: worker threads, and how long a job may sit in
+# 'processing' without progress before it is assumed lost and requeued
+RESUME_INGEST_WORKERS = int(os.getenv('RESUME_INGEST_WORKERS', '2'))
+RESUME_JOB_STALE_SECONDS = int(os.getenv('RESUME_JOB_STALE_SECONDS', '600'))
+# Uploads are parsed from memory; this keeps a copy of each PDF in
+# UPLOAD_FOLDER (written in the background) for later reference and so
+# jobs interrupted by a restart can be finished
+RESUME_RETAIN_UPLOADS = os.getenv('RESUME_RETAIN_UPLOADS', 'True').lower() == 'true'
+
+# Bulk resume import (services/resume_import_service.py): parser processes,
+# resumes written per transaction, and the largest zip accepted over HTTP
+RESUME_IMPORT_WORKERS = int(os.getenv('RESUME_IMPORT_WORKERS', str(os.cpu_count() or 2)))
+RESUME_IMPORT_BATCH_SIZE = int(os.getenv('RESUME_IMPORT_BATCH_SIZE', '50'))
+RESUME_IMPORT_MAX_ZIP_SIZE = int(os.getenv('RESUME_IMPORT_MAX_ZIP_SIZE', str(200 * 1024 * 1024)))
 
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Largest number of answers accepted by POST /interview/submit-answers
+MAX_BATCH_ANSWERS = int(os.getenv('MAX_BATCH_ANSWERS', '50'))
+
+# Evaluation plan cache (parsed questions kept in memory for grading)
+EVALUATION_PLAN_CACHE_SIZE = int(os.getenv('EVALUATION_PLAN_CACHE_SIZE', '2048'))
+# Touched whenever questions are edited so every process drops stale plans
+QUESTIONS_VERSION_PATH = os.path.join(os.path.dirname(DATABASE_PATH), 'questions.version')
+
+# Skills extracted from each resume, kept in memory for next-question lookups
+RESUME_SKILLS_CACHE_SIZE = int(os.getenv('RESUME_SKILLS_CACHE_SIZE', '4096'))
+
+# In-memory question index (utils/question_index.py): candidate pools kept per filter
+QUESTION_POOL_CACHE_SIZE = int(os.getenv('QUESTION_POOL_CACHE_SIZE', '512'))
+# Seconds an index is trusted before re-checking the version marker and question count
+QUESTION_INDEX_CHECK_INTERVAL = float(os.getenv('QUESTION_INDEX_CHECK_INTERVAL', '5'))
+
+# Seconds between batched writes of question usage stats (times_asked / avg_score)
+QUESTION_STATS_FLUSH_INTERVAL = float(os.getenv('QUESTION_STATS_FLUSH_INTERVAL', '5'))
+
+# Dashboard responses cached per process (utils/response_cache.py)
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '30'))  # seconds
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '2048'))
+
+# Admin listings (questions, students): default and largest page size
+ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', '50'))
+ADMIN_MAX_PAGE_SIZE = int(os.getenv('ADMIN_MAX_PAGE_SIZE', '500'))
+
+# Threads that look up the next planned question while a submitted answer is graded
+NEXT_QUESTION_PREFETCH_WORKERS = int(os.getenv('NEXT_QUESTION_PREFETCH_WORKERS', '4'))
+
+# Code execution sandbox (pre-started worker pool, see utils/sandbox.py)
+SANDBOX_ENABLED = os.getenv('SANDBOX_ENABLED', 'True').lower() == 'true'
+SANDBOX_POOL_SIZE = int(os.getenv('SANDBOX_POOL_SIZE', '4'))
+SANDBOX_MAX_JOBS_PER_WORKER = int(os.getenv('SANDBOX_MAX_JOBS_PER_WORKER', '200'))
+SANDBOX_TIMEOUT = int(os.getenv('SANDBOX_TIMEOUT', '5'))  # seconds per run
+SANDBOX_MEMORY_LIMIT_MB = int(os.getenv('SANDBOX_MEMORY_LIMIT_MB', '256'))
+SANDBOX_OUTPUT_LIMIT = int(os.getenv('SANDBOX_OUTPUT_LIMIT', str(64 * 1024)))  # bytes
+SANDBOX_QUEUE_TIMEOUT = int(os.getenv('SANDBOX_QUEUE_TIMEOUT', '15'))  # wait for a free worker
+CODING_TEST_TIMEOUT = float(os.getenv('CODING_TEST_TIMEOUT', '2'))  # seconds per test case when grading
+CODING_TIME_BUDGET = float(os.getenv('CODING_TIME_BUDGET', '10'))  # seconds for all test cases of one answer
+CODING_PARALLEL_JOBS = int(os.getenv('CODING_PARALLEL_JOBS', '2'))  # sandbox workers one answer may use
+CODING_MIN_CASES_PER_JOB = int(os.getenv('CODING_MIN_CASES_PER_JOB', '4'))
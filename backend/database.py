@@ -1,7 +1,239 @@
+import os
+import queue
+import logging
 import sqlite3
-from config import DATABASE_PATH
+from contextlib import contextmanager
+from flask import g, has_app_context
+from config import (
+    DATABASE_PATH, DB_POOL_SIZE, SQLITE_PROFILE, SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE_MB, SQLITE_FOREIGN_KEYS
+)
+
+logger = logging.getLogger(__name__)
+
+# Connection tuning profiles.
+# 'wal': readers (admin dashboard) no longer block on writers (answer submits)
+#        and commits skip the per-transaction fsync of the rollback journal.
+# 'legacy': SQLite's stock settings, what the app used before.
+# foreign_keys stays off in both: existing data has answers whose questions were
+# deleted, and the admin question delete relies on that being allowed.
+SQLITE_PROFILES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout_ms': 5000,
+        'cache_size_kb': 16384,
+        'mmap_size_mb': 128,
+        'foreign_keys': False,
+    },
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout_ms': 5000,
+        'cache_size_kb': 2000,
+        'mmap_size_mb': 0,
+        'foreign_keys': False,
+    },
+}
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+
+# Session scores and rollups are updated with UPDATE ... RETURNING (3.35+)
+# and UPDATE ... FROM (3.33+)
+MIN_SQLITE_VERSION = (3, 35, 0)
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def _load_sqlite_settings():
+    """Resolve the configured profile plus env overrides; fails fast on bad values."""
+    if SQLITE_PROFILE not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE '{SQLITE_PROFILE}' (expected one of {', '.join(SQLITE_PROFILES)})")
+    settings = dict(SQLITE_PROFILES[SQLITE_PROFILE])
+
+    if SQLITE_JOURNAL_MODE:
+        settings['journal_mode'] = SQLITE_JOURNAL_MODE.upper()
+    if SQLITE_SYNCHRONOUS:
+        settings['synchronous'] = SQLITE_SYNCHRONOUS.upper()
+    for key, value in (('busy_timeout_ms', SQLITE_BUSY_TIMEOUT_MS),
+                       ('cache_size_kb', SQLITE_CACHE_SIZE_KB),
+                       ('mmap_size_mb', SQLITE_MMAP_SIZE_MB)):
+        if value:
+            settings[key] = int(value)
+    if SQLITE_FOREIGN_KEYS:
+        settings['foreign_keys'] = SQLITE_FOREIGN_KEYS.lower() in ('1', 'on', 'true', 'yes')
+
+    if settings['journal_mode'] not in JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE '{settings['journal_mode']}'")
+    if settings['synchronous'] not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS '{settings['synchronous']}'")
+    return settings
+
+
+SQLITE_SETTINGS = _load_sqlite_settings()
+
+# Idle connections kept for reuse. Connections are only ever used by one
+# thread at a time (a request, or whoever called get_db_connection()).
+_idle = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+_pool_pid = os.getpid()
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a sqlite3 connection. close() hands the connection
+    back to the pool instead of closing it; everything else is delegated.
+    Request-scoped wrappers ignore close() entirely - the connection is
+    released when the request ends.
+    """
+
+    def __init__(self, raw, request_scoped=False):
+        self._raw = raw
+        self._request_scoped = request_scoped
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._request_scoped or self._released:
+            return
+        self._released = True
+        _release(self._raw)
+
+
+def _apply_pragmas(conn, settings=SQLITE_SETTINGS):
+    # Values are validated in _load_sqlite_settings, so formatting them in is safe
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    # Negative cache_size means KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = -{int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size_mb']) * 1024 * 1024}")
+    conn.execute(f"PRAGMA foreign_keys = {'ON' if settings['foreign_keys'] else 'OFF'}")
+
+
+def _connect():
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False,
+                           timeout=SQLITE_SETTINGS['busy_timeout_ms'] / 1000)
+    conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn)
+    return conn
+
+
+def _acquire():
+    global _idle, _pool_pid
+    # Never reuse connections inherited from a parent process (gunicorn fork)
+    if _pool_pid != os.getpid():
+        _idle = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+        _pool_pid = os.getpid()
+    try:
+        return _idle.get_nowait()
+    except queue.Empty:
+        return _connect()
+
+
+def _release(raw):
+    try:
+        if raw.in_transaction:
+            # Same outcome as closing a connection without committing
+            raw.rollback()
+        raw.row_factory = sqlite3.Row
+        if _pool_pid == os.getpid():
+            _idle.put_nowait(raw)
+            return
+    except (queue.Full, sqlite3.Error):
+        pass
+    raw.close()
+
 
 def get_db_connection():
-    conn=sqlite3.connect(DATABASE_PATH)
-    conn.row_factory=sqlite3.Row
-    return conn
\ No newline at end of file
+    """
+    Inside a Flask request: the request's shared connection (opened on first
+    use, released on teardown). Elsewhere: a pooled connection, returned to
+    the pool by close().
+    """
+    if has_app_context():
+        conn = g.get('db_conn')
+        if conn is None:
+            conn = PooledConnection(_acquire(), request_scoped=True)
+            g.db_conn = conn
+        return conn
+    return PooledConnection(_acquire())
+
+
+@contextmanager
+def db_connection(conn=None):
+    """
+    Use the caller's connection if one is given, otherwise borrow one for the
+    duration of the block. Lets model functions accept an optional conn.
+    """
+    if conn is not None:
+        yield conn
+        return
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def like_contains(text):
+    """
+    LIKE pattern matching text anywhere, with % and _ in text taken
+    literally. Use with ESCAPE '\\'.
+    """
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def release_request_connection(exception=None):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        _release(conn._raw)
+
+
+def check_sqlite_settings():
+    """
+    Read the settings back from a live connection and log them.
+    SQLite silently keeps the old journal mode when WAL is not possible
+    (e.g. on some network filesystems), so a mismatch is reported as a warning.
+    Raises RuntimeError if the SQLite library is older than MIN_SQLITE_VERSION.
+    Returns the active values.
+    """
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"SQLite {sqlite3.sqlite_version} is too old: "
+            f"{'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required"
+        )
+    conn = get_db_connection()
+    try:
+        active = {
+            'journal_mode': conn.execute("PRAGMA journal_mode").fetchone()[0].upper(),
+            'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA')[conn.execute("PRAGMA synchronous").fetchone()[0]],
+            'busy_timeout_ms': conn.execute("PRAGMA busy_timeout").fetchone()[0],
+            'cache_size_kb': -conn.execute("PRAGMA cache_size").fetchone()[0],
+            'mmap_size_mb': conn.execute("PRAGMA mmap_size").fetchone()[0] // (1024 * 1024),
+            'foreign_keys': bool(conn.execute("PRAGMA foreign_keys").fetchone()[0]),
+        }
+    finally:
+        conn.close()
+
+    logger.info(
+        f"SQLite {sqlite3.sqlite_version} profile '{SQLITE_PROFILE}': "
+        + ', '.join(f"{key}={value}" for key, value in active.items())
+    )
+    for key, expected in SQLITE_SETTINGS.items():
+        if key == 'mmap_size_mb' and active[key] == 0 and expected:
+            # mmap is capped by the compile-time SQLITE_MAX_MMAP_SIZE; not an error
+            logger.warning("SQLite mmap is unavailable in this build; continuing without it")
+        elif active[key] != expected:
+            logger.warning(f"SQLite setting {key} is {active[key]}, expected {expected}")
+    return active
+
+
+def init_app(app):
+    app.teardown_appcontext(release_request_connection)
+    try:
+        check_sqlite_settings()
+    except sqlite3.Error as e:
+        logger.error(f"Could not verify SQLite settings: {e}")
@@ -0,0 +1,39 @@
+"""
+Bulk-import resumes for a placement drive.
+
+Usage: python import_resumes.py <directory or .zip of PDF resumes>
+
+Each PDF must be named after its student: <email>.pdf or <user id>.pdf.
+PDFs are parsed in parallel (RESUME_IMPORT_WORKERS processes).
+"""
+import sys
+import zipfile
+from services.resume_import_service import (
+    ResumeImportError, import_resumes, sources_from_directory, sources_from_zip
+)
+
+def print_progress(sources):
+    for report in import_resumes(sources):
+        print(f"{report['processed']}/{report['total']} processed: "
+              f"{report['imported']} imported, {report['failed']} failed")
+        for error in report['errors']:
+            print(f"  {error['file']}: {error['error']}")
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__.strip())
+        sys.exit(2)
+
+    path = sys.argv[1]
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                print_progress(sources_from_zip(archive))
+        else:
+            print_progress(sources_from_directory(path))
+    except ResumeImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
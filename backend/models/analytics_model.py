@@ -0,0 +1,310 @@
+from database import db_connection, like_contains
+
+# Completed sessions scoring at least this count towards placement readiness
+STRONG_SESSION_SCORE = 7.0
+
+# Rollup tables behind the admin dashboard. They are updated by the
+# record_* functions below inside the transaction that writes the session or
+# answers, so reading the dashboard never aggregates answers/sessions.
+ROLLUP_TABLES = ['daily_activity', 'skill_score_totals', 'student_stats']
+
+def _is_strong(score):
+    return 1 if (score or 0) >= STRONG_SESSION_SCORE else 0
+
+def _is_scored(score):
+    # Averages skip sessions without a total_score, like AVG(total_score) did
+    return 0 if score is None else 1
+
+# --- Updates (called with the writer's connection, before it commits) ---
+
+def record_session_created(conn, user_id, started_at):
+    """Count a new session (total_score starts at 0) for its day and its user."""
+    conn.execute(
+        """
+        INSERT INTO daily_activity (day, session_count) VALUES (date(?), 1)
+        ON CONFLICT(day) DO UPDATE SET session_count = session_count + 1
+        """,
+        (started_at,)
+    )
+    conn.execute(
+        """
+        INSERT INTO student_stats (user_id, total_sessions, scored_sessions, last_active) VALUES (?, 1, 1, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            total_sessions = total_sessions + 1,
+            scored_sessions = scored_sessions + 1,
+            last_active = MAX(COALESCE(last_active, ''), excluded.last_active)
+        """,
+        (user_id, started_at)
+    )
+
+def record_answers(conn, answers):
+    """Add answers (dicts with question_id and score) to their skill's totals."""
+    conn.executemany(
+        """
+        INSERT INTO skill_score_totals (skill_id, answer_count, score_sum)
+        SELECT skill_id, 1, ? FROM questions WHERE id = ? AND skill_id IS NOT NULL
+        ON CONFLICT(skill_id) DO UPDATE SET
+            answer_count = answer_count + excluded.answer_count,
+            score_sum = score_sum + excluded.score_sum
+        """,
+        [(a['score'], a['question_id']) for a in answers]
+    )
+
+def record_session_score_change(conn, user_id, completed, old_score, new_score):
+    """Move a session's contribution to its user's score sums from old_score to new_score."""
+    scored = _is_scored(new_score) - _is_scored(old_score)
+    old_score, new_score = old_score or 0, new_score or 0
+    if completed:
+        conn.execute(
+            """
+            UPDATE student_stats SET
+                score_sum = score_sum + ?,
+                scored_sessions = scored_sessions + ?,
+                completed_score_sum = completed_score_sum + ?,
+                completed_scored_sessions = completed_scored_sessions + ?,
+                strong_sessions = strong_sessions + ?
+            WHERE user_id = ?
+            """,
+            (new_score - old_score, scored, new_score - old_score, scored,
+             _is_strong(new_score) - _is_strong(old_score), user_id)
+        )
+    else:
+        conn.execute(
+            "UPDATE student_stats SET score_sum = score_sum + ?, scored_sessions = scored_sessions + ? WHERE user_id = ?",
+            (new_score - old_score, scored, user_id)
+        )
+
+def record_session_completed(conn, user_id, total_score):
+    """Count a session that just moved to 'completed'."""
+    conn.execute(
+        """
+        UPDATE student_stats SET
+            completed_sessions = completed_sessions + 1,
+            completed_score_sum = completed_score_sum + ?,
+            completed_scored_sessions = completed_scored_sessions + ?,
+            strong_sessions = strong_sessions + ?
+        WHERE user_id = ?
+        """,
+        (total_score or 0, _is_scored(total_score), _is_strong(total_score), user_id)
+    )
+
+def remove_user_activity(conn, user_id):
+    """
+    Take a user's sessions and answers out of the rollups. Call before
+    deleting them.
+    """
+    conn.execute(
+        """
+        UPDATE daily_activity SET session_count = session_count - (
+            SELECT COUNT(*) FROM interview_sessions
+            WHERE user_id = ? AND date(started_at) = daily_activity.day
+        )
+        WHERE day IN (SELECT date(started_at) FROM interview_sessions WHERE user_id = ?)
+        """,
+        (user_id, user_id)
+    )
+    conn.execute("DELETE FROM daily_activity WHERE session_count <= 0")
+    conn.execute(
+        """
+        UPDATE skill_score_totals SET
+            answer_count = answer_count - t.removed_count,
+            score_sum = score_sum - t.removed_sum
+        FROM (
+            SELECT q.skill_id, COUNT(*) AS removed_count, SUM(a.score) AS removed_sum
+            FROM answers a
+            JOIN interview_sessions s ON a.session_id = s.id
+            JOIN questions q ON a.question_id = q.id
+            WHERE s.user_id = ?
+            GROUP BY q.skill_id
+        ) AS t
+        WHERE t.skill_id = skill_score_totals.skill_id
+        """,
+        (user_id,)
+    )
+    conn.execute("DELETE FROM skill_score_totals WHERE answer_count <= 0")
+    conn.execute("DELETE FROM student_stats WHERE user_id = ?", (user_id,))
+
+def remove_question_answers(conn, question_id):
+    """
+    Take a question's answers out of its skill's totals. Call before
+    deleting the question or moving it to another skill.
+    """
+    conn.execute(
+        """
+        UPDATE skill_score_totals SET
+            answer_count = answer_count - t.removed_count,
+            score_sum = score_sum - t.removed_sum
+        FROM (
+            SELECT q.skill_id, COUNT(*) AS removed_count, SUM(a.score) AS removed_sum
+            FROM answers a
+            JOIN questions q ON a.question_id = q.id
+            WHERE q.id = ?
+            GROUP BY q.skill_id
+        ) AS t
+        WHERE t.skill_id = skill_score_totals.skill_id
+        """,
+        (question_id,)
+    )
+    conn.execute("DELETE FROM skill_score_totals WHERE answer_count <= 0")
+
+def add_question_answers(conn, question_id):
+    """Add a question's answers to its skill's totals (after moving it to another skill)."""
+    conn.execute(
+        """
+        INSERT INTO skill_score_totals (skill_id, answer_count, score_sum)
+        SELECT q.skill_id, COUNT(*), SUM(a.score)
+        FROM answers a
+        JOIN questions q ON a.question_id = q.id
+        WHERE q.id = ? AND q.skill_id IS NOT NULL
+        GROUP BY q.skill_id
+        ON CONFLICT(skill_id) DO UPDATE SET
+            answer_count = answer_count + excluded.answer_count,
+            score_sum = score_sum + excluded.score_sum
+        """,
+        (question_id,)
+    )
+
+def clear_rollups(conn):
+    for table in ROLLUP_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+
+def rebuild_rollups(conn=None):
+    """
+    Recompute every rollup from answers and interview_sessions (migration,
+    or repair after editing those tables by hand).
+    """
+    with db_connection(conn) as conn:
+        try:
+            clear_rollups(conn)
+            conn.execute(
+                """
+                INSERT INTO daily_activity (day, session_count)
+                SELECT date(started_at), COUNT(*) FROM interview_sessions
+                WHERE started_at IS NOT NULL
+                GROUP BY date(started_at)
+                """
+            )
+            conn.execute(
+                """
+                INSERT INTO skill_score_totals (skill_id, answer_count, score_sum)
+                SELECT q.skill_id, COUNT(*), SUM(a.score)
+                FROM answers a JOIN questions q ON a.question_id = q.id
+                WHERE q.skill_id IS NOT NULL
+                GROUP BY q.skill_id
+                """
+            )
+            conn.execute(
+                """
+                INSERT INTO student_stats (user_id, total_sessions, score_sum, scored_sessions,
+                                           completed_sessions, completed_score_sum,
+                                           completed_scored_sessions, strong_sessions, last_active)
+                SELECT user_id,
+                       COUNT(*),
+                       SUM(COALESCE(total_score, 0)),
+                       COUNT(total_score),
+                       SUM(status = 'completed'),
+                       SUM(CASE WHEN status = 'completed' THEN COALESCE(total_score, 0) ELSE 0 END),
+                       SUM(status = 'completed' AND total_score IS NOT NULL),
+                       SUM(status = 'completed' AND total_score >= ?),
+                       MAX(started_at)
+                FROM interview_sessions
+                GROUP BY user_id
+                """,
+                (STRONG_SESSION_SCORE,)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+# --- Reads (admin dashboard) ---
+
+def get_overall_stats(conn=None):
+    """
+    Session totals across all users: total_interviews, completed_sessions,
+    completed_score_sum, completed_scored_sessions (completed sessions with
+    a total_score) and strong_sessions.
+    """
+    with db_connection(conn) as conn:
+        row = conn.execute(
+            """
+            SELECT COALESCE(SUM(total_sessions), 0) AS total_interviews,
+                   COALESCE(SUM(completed_sessions), 0) AS completed_sessions,
+                   COALESCE(SUM(completed_score_sum), 0) AS completed_score_sum,
+                   COALESCE(SUM(completed_scored_sessions), 0) AS completed_scored_sessions,
+                   COALESCE(SUM(strong_sessions), 0) AS strong_sessions
+            FROM student_stats
+            """
+        ).fetchone()
+    return dict(row)
+
+def _student_summary_query(after_id=None, search=None):
+    clauses = ["(u.role = 'student' OR u.role IS NULL)"]
+    params = []
+    if after_id is not None:
+        clauses.append("u.id > ?")
+        params.append(after_id)
+    if search:
+        clauses.append("(u.full_name LIKE ? ESCAPE '\\' OR u.email LIKE ? ESCAPE '\\')")
+        params += [like_contains(search), like_contains(search)]
+    query = f"""
+        SELECT
+            u.id,
+            u.full_name,
+            u.email,
+            COALESCE(st.total_sessions, 0) as total_sessions,
+            st.score_sum / NULLIF(st.scored_sessions, 0) as avg_score,
+            st.last_active
+        FROM users u
+        LEFT JOIN student_stats st ON st.user_id = u.id
+        WHERE {' AND '.join(clauses)}
+        ORDER BY u.id
+    """
+    return query, params
+
+def get_student_summaries(limit, after_id=None, search=None, conn=None):
+    """
+    One page of students with total_sessions, avg_score and last_active,
+    in id order. Keyset pagination: pass the last id of the previous page as
+    after_id. Returns up to limit + 1 rows so the caller can tell whether
+    another page follows.
+    """
+    query, params = _student_summary_query(after_id, search)
+    with db_connection(conn) as conn:
+        rows = conn.execute(query + " LIMIT ?", params + [limit + 1]).fetchall()
+    return [dict(row) for row in rows]
+
+def iter_student_summaries(search=None, conn=None):
+    """Every student summary, yielded one row at a time (for streaming exports)."""
+    query, params = _student_summary_query(search=search)
+    with db_connection(conn) as conn:
+        for row in conn.execute(query, params):
+            yield dict(row)
+
+def get_skill_averages(conn=None):
+    """Average answer score per skill, as (skill_name, avg_score) rows."""
+    with db_connection(conn) as conn:
+        rows = conn.execute(
+            """
+            SELECT sk.skill_name, t.score_sum / t.answer_count as avg_score
+            FROM skill_score_totals t
+            JOIN skills sk ON t.skill_id = sk.id
+            WHERE t.answer_count > 0
+            """
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+def get_daily_activity(limit=7, conn=None):
+    """Session counts of the latest `limit` days that had sessions, oldest first."""
+    with db_connection(conn) as conn:
+        rows = conn.execute(
+            """
+            SELECT day as interview_date, session_count
+            FROM daily_activity
+            WHERE session_count > 0
+            ORDER BY day DESC
+            LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+    return [dict(row) for row in reversed(rows)]
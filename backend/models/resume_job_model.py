@@ -0,0 +1,129 @@
+import json
+from database import db_connection
+
+def create_resume_job(user_id, filename, filepath, content_hash=None, conn=None):
+    """
+    Queue a saved upload for background parsing. Returns the job id.
+    """
+    with db_connection(conn) as conn:
+        cursor = conn.execute(
+            "INSERT INTO resume_jobs (user_id, filename, filepath, content_hash) VALUES (?, ?, ?, ?)",
+            (user_id, filename, filepath, content_hash)
+        )
+        job_id = cursor.lastrowid
+        conn.commit()
+    return job_id
+
+def claim_resume_job(job_id, conn=None):
+    """
+    Move a queued job to 'processing'. Returns the job row, or None if
+    another worker (or process) already claimed it.
+    """
+    with db_connection(conn) as conn:
+        job = conn.execute(
+            """
+            UPDATE resume_jobs
+            SET status = 'processing', stage = 'starting', progress = 0, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+            RETURNING *
+            """,
+            (job_id,)
+        ).fetchone()
+        conn.commit()
+    return job
+
+def update_resume_job_progress(job_id, stage, progress, conn=None):
+    with db_connection(conn) as conn:
+        conn.execute(
+            "UPDATE resume_jobs SET stage = ?, progress = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (stage, progress, job_id)
+        )
+        conn.commit()
+
+def complete_resume_job(job_id, resume_id, skills, conn=None):
+    with db_connection(conn) as conn:
+        conn.execute(
+            """
+            UPDATE resume_jobs
+            SET status = 'done', stage = 'done', progress = 100, resume_id = ?, skills = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (resume_id, json.dumps(skills) if skills is not None else None, job_id)
+        )
+        conn.commit()
+
+def fail_resume_job(job_id, error, conn=None):
+    with db_connection(conn) as conn:
+        conn.execute(
+            "UPDATE resume_jobs SET status = 'failed', error = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (error, job_id)
+        )
+        conn.commit()
+
+def get_resume_job(job_id, stale_seconds=0, conn=None):
+    """
+    Fetch a job with the text preview of its resume once it is done, and
+    whether it has gone stale_seconds without an update
+    """
+    with db_connection(conn) as conn:
+        job = conn.execute(
+            """
+            SELECT j.*, substr(r.extracted_text, 1, 503) AS extracted_text,
+                j.updated_at < datetime('now', ?) AS stale
+            FROM resume_jobs j
+            LEFT JOIN resumes r ON j.resume_id = r.id
+            WHERE j.id = ?
+            """,
+            (f'-{int(stale_seconds)} seconds', job_id)
+        ).fetchone()
+    return job
+
+def requeue_stale_resume_jobs(stale_seconds, conn=None):
+    """
+    Put jobs left 'processing' by a worker that died (no update for
+    stale_seconds) back in the queue. Returns every queued job as
+    (id, filepath, stale) rows, stale meaning it has waited stale_seconds.
+    """
+    cutoff = f'-{int(stale_seconds)} seconds'
+    with db_connection(conn) as conn:
+        conn.execute(
+            """
+            UPDATE resume_jobs SET status = 'queued'
+            WHERE status = 'processing' AND updated_at < datetime('now', ?)
+            """,
+            (cutoff,)
+        )
+        conn.commit()
+        rows = conn.execute(
+            """
+            SELECT id, filepath, updated_at < datetime('now', ?) AS stale
+            FROM resume_jobs WHERE status = 'queued' ORDER BY id
+            """,
+            (cutoff,)
+        ).fetchall()
+    return rows
+
+def remove_user_resume_jobs(conn, user_id):
+    """
+    Delete a user's ingestion jobs and the parse cache entries of files only
+    they uploaded. Call before deleting the user. Returns the retained
+    upload files no other user's job refers to, to be removed once the
+    deletion is committed.
+    """
+    rows = conn.execute(
+        """
+        SELECT DISTINCT content_hash, filepath FROM resume_jobs j
+        WHERE user_id = ? AND content_hash IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM resume_jobs other
+            WHERE other.content_hash = j.content_hash AND other.user_id != j.user_id
+        )
+        """,
+        (user_id,)
+    ).fetchall()
+    conn.executemany(
+        "DELETE FROM resume_parse_cache WHERE content_hash = ?",
+        [(row['content_hash'],) for row in rows]
+    )
+    conn.execute("DELETE FROM resume_jobs WHERE user_id = ?", (user_id,))
+    return sorted({row['filepath'] for row in rows if row['filepath']})
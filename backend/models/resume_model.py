@@ -1,60 +1,136 @@
-from database import get_db_connection
+import json
+from database import db_connection
 
-def save_resume(user_id, filename, extracted_text):
+def save_resume(user_id, filename, extracted_text, skills=None, conn=None):
     """
-    Save resume metadata and extracted text to database
+    Save resume metadata, extracted text and (if already known) its skills
     """
-    conn = get_db_connection()
-    cursor = conn.execute(
-        "INSERT INTO resumes (user_id, filename, extracted_text) VALUES (?, ?, ?)",
-        (user_id, filename, extracted_text)
-    )
-    resume_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with db_connection(conn) as conn:
+        cursor = conn.execute(
+            "INSERT INTO resumes (user_id, filename, extracted_text, skills) VALUES (?, ?, ?, ?)",
+            (user_id, filename, extracted_text, json.dumps(skills) if skills is not None else None)
+        )
+        resume_id = cursor.lastrowid
+        conn.commit()
     return resume_id
 
-def save_candidate_skills(user_id, skills):
+def save_resumes_batch(resumes, conn=None):
     """
-    Save extracted skills for a candidate
+    Save many resumes (dicts with user_id, filename, extracted_text and
+    skills) in one transaction. A resume with skills also replaces its
+    user's candidate_skills, as save_candidate_skills does.
     """
-    conn = get_db_connection()
-    try:
-        # First, clear previous skills for this user (assuming re-upload replaces skills)
-        conn.execute("DELETE FROM candidate_skills WHERE user_id = ?", (user_id,))
-        
-        # Insert new skills
-        for skill in skills:
-            conn.execute(
+    # The last resume of a user decides their candidate skills
+    skills_by_user = {r['user_id']: r['skills'] for r in resumes if r['skills']}
+    with db_connection(conn) as conn:
+        try:
+            conn.executemany(
+                "INSERT INTO resumes (user_id, filename, extracted_text, skills) VALUES (?, ?, ?, ?)",
+                [(r['user_id'], r['filename'], r['extracted_text'],
+                  json.dumps(r['skills']) if r['skills'] is not None else None) for r in resumes]
+            )
+            conn.executemany(
+                "DELETE FROM candidate_skills WHERE user_id = ?",
+                [(user_id,) for user_id in skills_by_user]
+            )
+            conn.executemany(
                 "INSERT INTO candidate_skills (user_id, skill_name) VALUES (?, ?)",
-                (user_id, skill)
+                [(user_id, skill) for user_id, skills in skills_by_user.items() for skill in skills]
             )
-        conn.commit()
-    except Exception as e:
-        print(f"Error saving skills: {e}")
-    finally:
-        conn.close()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def save_candidate_skills(user_id, skills, conn=None):
+    """
+    Save extracted skills for a candidate
+    """
+    with db_connection(conn) as conn:
+        try:
+            # First, clear previous skills for this user (assuming re-upload replaces skills)
+            conn.execute("DELETE FROM candidate_skills WHERE user_id = ?", (user_id,))
 
-def get_resume_by_user(user_id):
+            # Insert new skills
+            for skill in skills:
+                conn.execute(
+                    "INSERT INTO candidate_skills (user_id, skill_name) VALUES (?, ?)",
+                    (user_id, skill)
+                )
+            conn.commit()
+        except Exception as e:
+            print(f"Error saving skills: {e}")
+
+def get_resume_by_user(user_id, conn=None):
     """
     Fetch the most recent resume for a user
     """
-    conn = get_db_connection()
-    resume = conn.execute(
-        "SELECT * FROM resumes WHERE user_id = ? ORDER BY uploaded_at DESC LIMIT 1",
-        (user_id,)
-    ).fetchone()
-    conn.close()
+    with db_connection(conn) as conn:
+        resume = conn.execute(
+            "SELECT * FROM resumes WHERE user_id = ? ORDER BY uploaded_at DESC LIMIT 1",
+            (user_id,)
+        ).fetchone()
     return resume
 
-def get_resume_by_id(resume_id):
+def get_resume_by_id(resume_id, conn=None):
     """
     Fetch resume by ID
     """
-    conn = get_db_connection()
-    resume = conn.execute(
-        "SELECT * FROM resumes WHERE id = ?",
-        (resume_id,)
-    ).fetchone()
-    conn.close()
+    with db_connection(conn) as conn:
+        resume = conn.execute(
+            "SELECT * FROM resumes WHERE id = ?",
+            (resume_id,)
+        ).fetchone()
     return resume
+
+def get_resume_skills_row(resume_id, conn=None):
+    """
+    Fetch the stored skills of a resume without loading its text.
+    skills is a JSON list, or NULL if they were never extracted.
+    """
+    with db_connection(conn) as conn:
+        row = conn.execute(
+            "SELECT id, skills FROM resumes WHERE id = ?",
+            (resume_id,)
+        ).fetchone()
+    return row
+
+def save_resume_skills(resume_id, skills, conn=None):
+    """
+    Store the skills extracted from a resume
+    """
+    with db_connection(conn) as conn:
+        conn.execute(
+            "UPDATE resumes SET skills = ? WHERE id = ?",
+            (json.dumps(skills), resume_id)
+        )
+        conn.commit()
+
+def get_resume_parse(content_hash, conn=None):
+    """
+    Fetch the cached parse of an uploaded PDF by the SHA-256 of its bytes
+    """
+    with db_connection(conn) as conn:
+        row = conn.execute(
+            "SELECT * FROM resume_parse_cache WHERE content_hash = ?",
+            (content_hash,)
+        ).fetchone()
+    return row
+
+def save_resume_parse(content_hash, extracted_text, skills, skills_version, conn=None):
+    """
+    Cache the text and skills parsed from an uploaded PDF (replacing the
+    skills of an earlier parse of the same bytes)
+    """
+    with db_connection(conn) as conn:
+        conn.execute(
+            """
+            INSERT INTO resume_parse_cache (content_hash, extracted_text, skills, skills_version)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(content_hash) DO UPDATE SET
+                skills = excluded.skills,
+                skills_version = excluded.skills_version
+            """,
+            (content_hash, extracted_text, json.dumps(skills) if skills is not None else None, skills_version)
+        )
+        conn.commit()
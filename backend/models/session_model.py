@@ -1,154 +1,307 @@
-from database import get_db_connection
+from database import db_connection
 from datetime import datetime
+from utils.seen_set import SeenSet
+from models.analytics_model import (
+    record_session_created, record_answers, record_session_score_change, record_session_completed
+)
 
-def create_session(user_id, resume_id, total_questions):
+def create_session(user_id, resume_id, total_questions, conn=None):
     """
     Create a new interview session
     """
-    conn = get_db_connection()
-    cursor = conn.execute(
-        "INSERT INTO interview_sessions (user_id, resume_id, total_questions) VALUES (?, ?, ?)",
-        (user_id, resume_id, total_questions)
-    )
-    session_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return session_id
+    with db_connection(conn) as conn:
+        try:
+            row = conn.execute(
+                "INSERT INTO interview_sessions (user_id, resume_id, total_questions) VALUES (?, ?, ?) RETURNING id, started_at",
+                (user_id, resume_id, total_questions)
+            ).fetchone()
+            record_session_created(conn, user_id, row['started_at'])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return row['id']
 
-def save_answer(session_id, question_id, user_answer, score, feedback, technical_score=0.0, communication_score=0.0, problem_solving_score=0.0):
+def save_answer(session_id, question_id, user_answer, score, feedback, technical_score=0.0, communication_score=0.0, problem_solving_score=0.0, conn=None):
     """
-    Save user's answer with score and feedback
+    Save user's answer with score and feedback, and fold it into the
+    session's running score in the same transaction.
+    Returns the new session score.
     """
-    conn = get_db_connection()
-    conn.execute(
-        "INSERT INTO answers (session_id, question_id, user_answer, score, feedback, technical_score, communication_score, problem_solving_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-        (session_id, question_id, user_answer, score, feedback, technical_score, communication_score, problem_solving_score)
-    )
-    conn.commit()
-    conn.close()
+    return save_answers_batch(session_id, [{
+        'question_id': question_id,
+        'user_answer': user_answer,
+        'score': score,
+        'feedback': feedback,
+        'technical_score': technical_score,
+        'communication_score': communication_score,
+        'problem_solving_score': problem_solving_score,
+    }], conn=conn)
 
-def update_session_score(session_id):
+def save_answers_batch(session_id, answers, conn=None):
     """
-    Calculate and update total score for a session
+    Save several graded answers and refresh the session score in a single
+    transaction. Each item is a dict with question_id, user_answer, score,
+    feedback and the technical/communication/problem_solving pillar scores.
+    Returns the new session score.
     """
-    conn = get_db_connection()
-    
-    # Calculate average score from all answers
-    result = conn.execute(
-        "SELECT AVG(score) as avg_score FROM answers WHERE session_id = ?",
+    with db_connection(conn) as conn:
+        try:
+            conn.executemany(
+                "INSERT INTO answers (session_id, question_id, user_answer, score, feedback, technical_score, communication_score, problem_solving_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (session_id, a['question_id'], a['user_answer'], a['score'], a['feedback'],
+                     a['technical_score'], a['communication_score'], a['problem_solving_score'])
+                    for a in answers
+                ]
+            )
+            _mark_questions_seen(conn, session_id, [a['question_id'] for a in answers])
+            record_answers(conn, answers)
+            session_score = _add_to_session_score(conn, session_id, answers)
+            conn.commit()
+            return session_score
+        except Exception:
+            conn.rollback()
+            raise
+
+def _add_to_session_score(conn, session_id, answers):
+    """
+    Add answers to the session's running sums and recompute total_score from
+    them in one UPDATE (the right-hand side sees the old column values), so
+    concurrent submits serialize on the row instead of racing an AVG().
+    Must run in the transaction that inserted the answers.
+    """
+    # The answer INSERT already holds the write lock, so this cannot go stale
+    old = conn.execute(
+        "SELECT user_id, status, total_score FROM interview_sessions WHERE id = ?",
         (session_id,)
     ).fetchone()
-    
-    avg_score = result['avg_score'] if result['avg_score'] else 0
-    
-    # Update session with total score
-    conn.execute(
-        "UPDATE interview_sessions SET total_score = ? WHERE id = ?",
-        (avg_score, session_id)
+    row = conn.execute(
+        """
+        UPDATE interview_sessions SET
+            answer_count = answer_count + ?,
+            score_sum = score_sum + ?,
+            technical_sum = technical_sum + ?,
+            communication_sum = communication_sum + ?,
+            problem_solving_sum = problem_solving_sum + ?,
+            total_score = (score_sum + ?) / (answer_count + ?)
+        WHERE id = ?
+        RETURNING total_score
+        """,
+        (
+            len(answers),
+            sum(a['score'] for a in answers),
+            sum(a['technical_score'] for a in answers),
+            sum(a['communication_score'] for a in answers),
+            sum(a['problem_solving_score'] for a in answers),
+            sum(a['score'] for a in answers),
+            len(answers),
+            session_id,
+        )
+    ).fetchone()
+    if row is None:
+        return 0
+    record_session_score_change(
+        conn, old['user_id'], old['status'] == 'completed', old['total_score'], row['total_score']
     )
-    conn.commit()
-    conn.close()
-    return avg_score
+    return row['total_score'] or 0
 
-def complete_session(session_id):
+def complete_session(session_id, conn=None):
     """
     Mark session as completed
     """
-    conn = get_db_connection()
-    conn.execute(
-        "UPDATE interview_sessions SET status = 'completed', completed_at = ? WHERE id = ?",
-        (datetime.now(), session_id)
-    )
-    conn.commit()
-    conn.close()
+    with db_connection(conn) as conn:
+        try:
+            # Only the first completion counts towards the dashboard rollups
+            row = conn.execute(
+                "UPDATE interview_sessions SET status = 'completed', completed_at = ? WHERE id = ? AND status != 'completed' RETURNING user_id, total_score",
+                (datetime.now(), session_id)
+            ).fetchone()
+            if row:
+                record_session_completed(conn, row['user_id'], row['total_score'])
+            else:
+                conn.execute(
+                    "UPDATE interview_sessions SET completed_at = ? WHERE id = ?",
+                    (datetime.now(), session_id)
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
-def get_session_results(session_id):
+def get_session_results(session_id, conn=None):
     """
     Get complete session data with all answers
     """
-    conn = get_db_connection()
-    
-    # Get session info
-    session = conn.execute(
-        "SELECT * FROM interview_sessions WHERE id = ?",
-        (session_id,)
-    ).fetchone()
-    
-    # Get all answers with question details
-    answers = conn.execute(
-        """
-        SELECT a.*, q.question_text, q.difficulty, s.skill_name
-        FROM answers a
-        JOIN questions q ON a.question_id = q.id
-        JOIN skills s ON q.skill_id = s.id
-        WHERE a.session_id = ?
-        ORDER BY a.answered_at
-        """,
-        (session_id,)
-    ).fetchall()
-    
-    conn.close()
-    
+    with db_connection(conn) as conn:
+        # Get session info
+        session = conn.execute(
+            "SELECT * FROM interview_sessions WHERE id = ?",
+            (session_id,)
+        ).fetchone()
+
+        # Get all answers with question details
+        answers = conn.execute(
+            """
+            SELECT a.*, q.question_text, q.difficulty, s.skill_name
+            FROM answers a
+            JOIN questions q ON a.question_id = q.id
+            JOIN skills s ON q.skill_id = s.id
+            WHERE a.session_id = ?
+            ORDER BY a.answered_at
+            """,
+            (session_id,)
+        ).fetchall()
+
     return {
         'session': dict(session) if session else None,
         'answers': [dict(answer) for answer in answers]
     }
 
-def get_user_history(user_id):
+def get_user_history(user_id, conn=None):
     """
     Get all interview sessions for a user
     """
-    conn = get_db_connection()
-    sessions = conn.execute(
-        """
-        SELECT * FROM interview_sessions 
-        WHERE user_id = ? 
-        ORDER BY started_at DESC
-        """,
-        (user_id,)
-    ).fetchall()
-    conn.close()
+    with db_connection(conn) as conn:
+        sessions = conn.execute(
+            """
+            SELECT * FROM interview_sessions
+            WHERE user_id = ?
+            ORDER BY started_at DESC
+            """,
+            (user_id,)
+        ).fetchall()
     return [dict(session) for session in sessions]
 
-def get_answered_questions(session_id):
+def get_answered_questions(session_id, conn=None):
     """
     Get list of question IDs already answered in this session
     """
-    conn = get_db_connection()
-    answered = conn.execute(
-        "SELECT question_id FROM answers WHERE session_id = ?",
-        (session_id,)
-    ).fetchall()
-    conn.close()
+    with db_connection(conn) as conn:
+        answered = conn.execute(
+            "SELECT question_id FROM answers WHERE session_id = ?",
+            (session_id,)
+        ).fetchall()
     return [row['question_id'] for row in answered]
 
-def get_globally_seen_questions(user_id):
+def get_globally_seen_questions(user_id, conn=None):
     """
     Get all question IDs the user has already been asked across ALL past sessions.
     Used for cross-session no-repeat mode.
     Returns a list of question IDs.
     """
-    conn = get_db_connection()
-    rows = conn.execute(
-        """
-        SELECT DISTINCT a.question_id
-        FROM answers a
-        JOIN interview_sessions s ON a.session_id = s.id
-        WHERE s.user_id = ?
-        """,
-        (user_id,)
-    ).fetchall()
-    conn.close()
+    with db_connection(conn) as conn:
+        rows = conn.execute(
+            """
+            SELECT DISTINCT a.question_id
+            FROM answers a
+            JOIN interview_sessions s ON a.session_id = s.id
+            WHERE s.user_id = ?
+            """,
+            (user_id,)
+        ).fetchall()
     return [row['question_id'] for row in rows]
 
-def get_session_by_id(session_id):
+def get_session_by_id(session_id, conn=None):
     """
     Get session details by ID
     """
-    conn = get_db_connection()
+    with db_connection(conn) as conn:
+        session = conn.execute(
+            "SELECT * FROM interview_sessions WHERE id = ?",
+            (session_id,)
+        ).fetchone()
+    return dict(session) if session else None
+
+def _load_seen_set(conn, user_id):
+    row = conn.execute(
+        "SELECT seen FROM user_seen_questions WHERE user_id = ?",
+        (user_id,)
+    ).fetchone()
+    return SeenSet(row['seen']) if row else None
+
+def _store_seen_set(conn, user_id, seen):
+    conn.execute(
+        "INSERT OR REPLACE INTO user_seen_questions (user_id, seen) VALUES (?, ?)",
+        (user_id, seen.to_bytes())
+    )
+
+def _mark_questions_seen(conn, session_id, question_ids):
+    """
+    Add freshly saved answers to the session owner's seen set. Runs inside the
+    caller's transaction, after the answers INSERT has taken the write lock,
+    so concurrent submits cannot lose each other's bits.
+    """
     session = conn.execute(
-        "SELECT * FROM interview_sessions WHERE id = ?",
+        "SELECT user_id FROM interview_sessions WHERE id = ?",
         (session_id,)
     ).fetchone()
-    conn.close()
-    return dict(session) if session else None
+    if not session:
+        return
+    seen = _load_seen_set(conn, session['user_id'])
+    if seen is None:
+        # First answer since seen sets were introduced: the new rows are
+        # already visible to this transaction, so the full rebuild covers them
+        seen = SeenSet.from_ids(get_globally_seen_questions(session['user_id'], conn=conn))
+    else:
+        seen.update(question_ids)
+    _store_seen_set(conn, session['user_id'], seen)
+
+def get_seen_question_set(user_id, conn=None):
+    """
+    Get the set of question IDs the user has answered across ALL sessions as a
+    SeenSet bitmap (one primary-key lookup). Built from the answers table and
+    stored the first time it is needed.
+    """
+    with db_connection(conn) as conn:
+        seen = _load_seen_set(conn, user_id)
+        if seen is None:
+            seen = SeenSet.from_ids(get_globally_seen_questions(user_id, conn=conn))
+            _store_seen_set(conn, user_id, seen)
+            conn.commit()
+    return seen
+
+def save_session_plan(session_id, plan, conn=None):
+    """
+    Store the planned questions of a session. plan is a list of
+    (question_id, stage) tuples in the order they will be asked.
+    """
+    with db_connection(conn) as conn:
+        conn.executemany(
+            "INSERT INTO session_plan (session_id, position, question_id, stage) VALUES (?, ?, ?, ?)",
+            [(session_id, position, question_id, stage) for position, (question_id, stage) in enumerate(plan)]
+        )
+        conn.commit()
+
+def get_planned_question(session_id, position, conn=None):
+    """
+    Get the plan entry (question_id, stage) for a 0-based position, or None
+    """
+    with db_connection(conn) as conn:
+        row = conn.execute(
+            "SELECT question_id, stage FROM session_plan WHERE session_id = ? AND position = ?",
+            (session_id, position)
+        ).fetchone()
+    return row
+
+def get_session_plan(session_id, conn=None):
+    """
+    Get all plan entries of a session in order
+    """
+    with db_connection(conn) as conn:
+        rows = conn.execute(
+            "SELECT position, question_id, stage FROM session_plan WHERE session_id = ? ORDER BY position",
+            (session_id,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+def replace_planned_question(session_id, position, question_id, conn=None):
+    """
+    Point a plan position at a different question (the planned one was deleted)
+    """
+    with db_connection(conn) as conn:
+        conn.execute(
+            "UPDATE session_plan SET question_id = ? WHERE session_id = ? AND position = ?",
+            (question_id, session_id, position)
+        )
+        conn.commit()
@@ -1,19 +1,27 @@
-from database import get_db_connection
+from database import db_connection
 
-def create_user(full_name, email, password):
-    conn = get_db_connection()
-    conn.execute(
-        "INSERT INTO users (full_name, email, password, role) VALUES (?, ?, ?, ?)",
-        (full_name, email, password, 'student')
-    )
-    conn.commit()
-    conn.close()
+def create_user(full_name, email, password, conn=None):
+    with db_connection(conn) as conn:
+        conn.execute(
+            "INSERT INTO users (full_name, email, password, role) VALUES (?, ?, ?, ?)",
+            (full_name, email, password, 'student')
+        )
+        conn.commit()
 
-def get_user_by_email(email):
-    conn = get_db_connection()
-    user = conn.execute(
-        "SELECT * FROM users WHERE email = ?",
-        (email,)
-    ).fetchone()
-    conn.close()
+def get_user_by_email(email, conn=None):
+    with db_connection(conn) as conn:
+        user = conn.execute(
+            "SELECT * FROM users WHERE email = ?",
+            (email,)
+        ).fetchone()
     return user
+
+def get_student_ids_by_email(conn=None):
+    """
+    Map every student's lowercased email to their user id
+    """
+    with db_connection(conn) as conn:
+        rows = conn.execute(
+            "SELECT id, email FROM users WHERE role = 'student' OR role IS NULL"
+        ).fetchall()
+    return {row['email'].lower(): row['id'] for row in rows}
@@ -1,12 +1,73 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+import json
 import logging
+import zipfile
+import tempfile
+from config import ADMIN_PAGE_SIZE, ADMIN_MAX_PAGE_SIZE, RESUME_IMPORT_MAX_ZIP_SIZE
 from database import get_db_connection
+from models.question_model import get_questions_page, iter_questions
 from services.auth_service import token_required
+from services.resume_import_service import import_resumes, sources_from_zip
+from services.resume_service import discard_uploads
+from models.resume_job_model import remove_user_resume_jobs
+from utils.evaluation_cache import mark_questions_changed
+from utils.response_cache import cached_json, invalidate_responses
+from models.analytics_model import (
+    get_overall_stats, get_student_summaries, iter_student_summaries, get_skill_averages, get_daily_activity,
+    remove_user_activity, remove_question_answers, add_question_answers, clear_rollups
+)
 import sqlite3
 
 logger = logging.getLogger(__name__)
 admin_bp = Blueprint('admin', __name__)
 
+# Read size when copying an uploaded resume zip
+COPY_CHUNK_SIZE = 1024 * 1024
+
+def _admin_error(user_id):
+    """403 response unless user_id belongs to an admin, else None."""
+    conn = get_db_connection()
+    try:
+        user = conn.execute("SELECT role FROM users WHERE id = ?", (user_id,)).fetchone()
+    finally:
+        conn.close()
+    if not user or user['role'] != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    return None
+
+# --- Listing helpers ---
+
+def _page_args():
+    """
+    (cursor, limit) from the query string. cursor is the id of the last row
+    of the previous page (None for the first page).
+    Raises ValueError when either is malformed.
+    """
+    cursor = request.args.get('cursor')
+    cursor = int(cursor) if cursor not in (None, '') else None
+    limit = int(request.args.get('limit', ADMIN_PAGE_SIZE))
+    if limit < 1 or limit > ADMIN_MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {ADMIN_MAX_PAGE_SIZE}')
+    return cursor, limit
+
+def _split_page(rows, limit):
+    """Trim the extra look-ahead row; returns (page, next_cursor)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]['id']
+    return rows, None
+
+def _ndjson_response(rows, filename):
+    """Stream rows as newline-delimited JSON without building the whole body."""
+    def generate():
+        for row in rows:
+            yield json.dumps(row, default=str) + '\n'
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 # --- Quality Control (Student Facing) ---
 @admin_bp.route('/api/flag_answer', methods=['POST'])
 @token_required
@@ -71,29 +132,34 @@ def get_stats(current_user_id):
         if not user or user['role'] != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
         
-        # 1. Total Candidates (All registered students)
-        total_candidates = conn.execute("SELECT COUNT(*) FROM users WHERE role = 'student'").fetchone()[0]
-        
-        # 2. Total Interviews
-        total_interviews = conn.execute("SELECT COUNT(*) FROM interview_sessions").fetchone()[0]
-        
-        # 3. Average Score
-        avg_score = conn.execute("SELECT AVG(total_score) FROM interview_sessions WHERE status = 'completed'").fetchone()[0]
-        avg_score = round(avg_score, 1) if avg_score else 0.0
-        
-        # 4. Placement Readiness (Custom Metric: % of sessions with score > 7)
-        strong_sessions = conn.execute("SELECT COUNT(*) FROM interview_sessions WHERE status = 'completed' AND total_score >= 7.0").fetchone()[0]
-        placement_readiness = round((strong_sessions / total_interviews * 100), 1) if total_interviews > 0 else 0
+        def compute():
+            # 1. Total Candidates (All registered students)
+            total_candidates = conn.execute("SELECT COUNT(*) FROM users WHERE role = 'student'").fetchone()[0]
+            
+            # 2-4. Session totals, from the student_stats rollup
+            totals = get_overall_stats(conn=conn)
+            
+            # 2. Total Interviews
+            total_interviews = totals['total_interviews']
+            
+            # 3. Average Score
+            avg_score = totals['completed_score_sum'] / totals['completed_scored_sessions'] if totals['completed_scored_sessions'] else 0
+            avg_score = round(avg_score, 1) if avg_score else 0.0
+            
+            # 4. Placement Readiness (Custom Metric: % of sessions with score > 7)
+            strong_sessions = totals['strong_sessions']
+            placement_readiness = round((strong_sessions / total_interviews * 100), 1) if total_interviews > 0 else 0
+            
+            return {
+                'total_candidates': total_candidates,
+                'total_interviews': total_interviews,
+                'avg_score': avg_score,
+                'placement_readiness': placement_readiness
+            }
         
+        response = cached_json(('admin', 'stats'), compute)
         conn.close()
-        conn.close()
-        
-        return jsonify({
-            'total_candidates': total_candidates,
-            'total_interviews': total_interviews,
-            'avg_score': avg_score,
-            'placement_readiness': placement_readiness
-        })
+        return response
     except Exception as e:
         print(f"Stats Error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -105,7 +171,14 @@ def get_activity():
     Returns: list of { full_name, session_id, started_at, status, questions_answered, total_score }
     """
     try:
-        conn = get_db_connection()
+        return cached_json(('admin', 'activity'), _recent_activity)
+    except Exception as e:
+        print(f"Activity Error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def _recent_activity():
+    conn = get_db_connection()
+    try:
         query = """
             SELECT 
                 u.full_name, 
@@ -120,47 +193,48 @@ def get_activity():
             LIMIT 10
         """
         rows = conn.execute(query).fetchall()
-        activity = [dict(row) for row in rows]
+        return [dict(row) for row in rows]
+    finally:
         conn.close()
-        return jsonify(activity)
-    except Exception as e:
-        print(f"Activity Error: {e}")
-        return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/admin/students', methods=['GET'])
-def get_students():
+@token_required
+def get_students(current_user_id):
     """
-    List of all students with summary stats.
+    List of students with summary stats, one page at a time (admin only).
+    Query: cursor (last id of the previous page), limit, q (name/email search),
+    format=ndjson to stream every matching student instead.
+    Returns: { students, next_cursor }
     """
     try:
-        conn = get_db_connection()
-        query = """
-            SELECT 
-                u.id, 
-                u.full_name, 
-                u.email,
-                COUNT(s.id) as total_sessions,
-                AVG(s.total_score) as avg_score,
-                MAX(s.started_at) as last_active
-            FROM users u
-            LEFT JOIN interview_sessions s ON u.id = s.user_id
-            WHERE u.role = 'student' OR u.role IS NULL
-            GROUP BY u.id
-        """
-        rows = conn.execute(query).fetchall()
+        error = _admin_error(current_user_id)
+        if error:
+            return error
         
-        students = []
-        for row in rows:
-            s_dict = dict(row)
-            s_dict['avg_score'] = round(s_dict['avg_score'], 1) if s_dict['avg_score'] else 0.0
-            students.append(s_dict)
-            
-        conn.close()
-        return jsonify(students)
+        search = request.args.get('q', '').strip() or None
+        if request.args.get('format') == 'ndjson':
+            return _ndjson_response(
+                (_round_avg_score(row) for row in iter_student_summaries(search=search)),
+                'students.ndjson'
+            )
+        try:
+            cursor, limit = _page_args()
+        except ValueError as e:
+            return jsonify({'error': f'Invalid pagination parameters: {e}'}), 400
+        
+        def compute():
+            rows, next_cursor = _split_page(get_student_summaries(limit, after_id=cursor, search=search), limit)
+            return {'students': [_round_avg_score(row) for row in rows], 'next_cursor': next_cursor}
+        
+        return cached_json(('admin', 'students', cursor, limit, search), compute)
     except Exception as e:
         print(f"Students Error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def _round_avg_score(s_dict):
+    s_dict['avg_score'] = round(s_dict['avg_score'], 1) if s_dict['avg_score'] else 0.0
+    return s_dict
+
 @admin_bp.route('/api/admin/students/<int:user_id>', methods=['DELETE'])
 def delete_student(user_id):
     """
@@ -182,15 +256,30 @@ def delete_student(user_id):
             return jsonify({'error': 'Cannot delete admin accounts via this route'}), 403
 
         # 2. Delete related data manually (in case FK constraints aren't enabled)
+        # Take their sessions and answers out of the dashboard rollups first
+        remove_user_activity(conn, user_id)
+        
+        # Delete resume ingestion jobs and parses of files only they uploaded
+        uploads = remove_user_resume_jobs(conn, user_id)
+        
         # Delete Answers
         conn.execute("""
             DELETE FROM answers 
             WHERE session_id IN (SELECT id FROM interview_sessions WHERE user_id = ?)
         """, (user_id,))
         
+        # Delete Session Plans
+        conn.execute("""
+            DELETE FROM session_plan 
+            WHERE session_id IN (SELECT id FROM interview_sessions WHERE user_id = ?)
+        """, (user_id,))
+        
         # Delete Sessions
         conn.execute("DELETE FROM interview_sessions WHERE user_id = ?", (user_id,))
         
+        # Delete seen-question set
+        conn.execute("DELETE FROM user_seen_questions WHERE user_id = ?", (user_id,))
+        
         # Delete Resumes
         conn.execute("DELETE FROM resumes WHERE user_id = ?", (user_id,))
         
@@ -199,6 +288,11 @@ def delete_student(user_id):
         
         conn.commit()
         conn.close()
+        discard_uploads(uploads)
+        
+        invalidate_responses('admin')
+        invalidate_responses('student_stats', user_id)
+        invalidate_responses('student_drives', user_id)
         
         logger.info(f"Student {user_id} deleted by admin.")
         return jsonify({'message': 'Student deleted successfully'}), 200
@@ -245,20 +339,10 @@ def get_skill_analytics():
     Average score per skill.
     """
     try:
-        conn = get_db_connection()
-        query = """
-            SELECT 
-                sk.skill_name, 
-                AVG(a.score) as avg_score
-            FROM answers a
-            JOIN questions q ON a.question_id = q.id
-            JOIN skills sk ON q.skill_id = sk.id
-            GROUP BY sk.skill_name
-        """
-        rows = conn.execute(query).fetchall()
-        analytics = [{'skill_name': row[0], 'avg_score': round(row[1], 1)} for row in rows]
-        conn.close()
-        return jsonify(analytics)
+        return cached_json(('admin', 'skills'), lambda: [
+            {'skill_name': row['skill_name'], 'avg_score': round(row['avg_score'], 1)}
+            for row in get_skill_averages()
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -268,21 +352,8 @@ def get_activity_analytics():
     Interviews conducted per day (last 7 data points).
     """
     try:
-        conn = get_db_connection()
-        query = """
-            SELECT 
-                date(started_at) as interview_date, 
-                COUNT(*) as session_count
-            FROM interview_sessions
-            GROUP BY date(started_at)
-            ORDER BY date(started_at) DESC
-            LIMIT 7
-        """
-        rows = conn.execute(query).fetchall()
-        # Reverse to show chronological order
-        analytics = [{'interview_date': row[0], 'session_count': row[1]} for row in reversed(rows)]
-        conn.close()
-        return jsonify(analytics)
+        # Already in chronological order
+        return cached_json(('admin', 'daily_activity'), lambda: get_daily_activity(7))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -312,6 +383,7 @@ def create_drive():
         """, (data['company'], data['role'], data['date'], data['description']))
         conn.commit()
         conn.close()
+        invalidate_responses('student_drives')
         return jsonify({'message': 'Drive created'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -323,10 +395,71 @@ def delete_drive(id):
         conn.execute("DELETE FROM drives WHERE id = ?", (id,))
         conn.commit()
         conn.close()
+        invalidate_responses('student_drives')
         return jsonify({'message': 'Drive deleted'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# --- Bulk Resume Import ---
+
+@admin_bp.route('/api/admin/resumes/import', methods=['POST'])
+@token_required
+def import_resume_archive(current_user_id):
+    """
+    Import a zip of resumes for a drive. Each PDF is named after its student:
+    <email>.pdf or <user id>.pdf.
+    Form data: file (the zip)
+    Streams progress reports as newline-delimited JSON (see import_resumes).
+    """
+    try:
+        error = _admin_error(current_user_id)
+        if error:
+            return error
+        
+        too_large = jsonify({'error': f'Zip exceeds {RESUME_IMPORT_MAX_ZIP_SIZE / (1024*1024):.0f}MB limit'}), 413
+        if request.content_length and request.content_length > RESUME_IMPORT_MAX_ZIP_SIZE:
+            return too_large
+        
+        file = request.files.get('file')
+        if not file or not file.filename.lower().endswith('.zip'):
+            return jsonify({'error': 'A .zip of PDF resumes is required'}), 400
+        
+        # Uploaded files are closed when this view returns, while the import
+        # streams on after that, so it reads from its own copy. The size is
+        # counted while copying: a chunked upload has no Content-Length.
+        archive_file = tempfile.TemporaryFile()
+        copied = 0
+        while True:
+            chunk = file.stream.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            copied += len(chunk)
+            if copied > RESUME_IMPORT_MAX_ZIP_SIZE:
+                archive_file.close()
+                return too_large
+            archive_file.write(chunk)
+        archive_file.seek(0)
+        try:
+            archive = zipfile.ZipFile(archive_file)
+        except zipfile.BadZipFile:
+            archive_file.close()
+            return jsonify({'error': 'File is not a valid zip'}), 400
+        
+        sources = sources_from_zip(archive)
+        if not sources:
+            archive.close()
+            archive_file.close()
+            return jsonify({'error': 'The zip contains no PDF files'}), 400
+        
+        def run_import():
+            with archive_file, archive:
+                yield from import_resumes(sources)
+        
+        return _ndjson_response(run_import(), 'resume_import.ndjson')
+    except Exception as e:
+        logger.error(f"Resume import error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 # --- Reports ---
 
 @admin_bp.route('/api/admin/reports', methods=['GET'])
@@ -378,10 +511,15 @@ def system_reset():
         # Delete data but keep users/questions/drives
         conn.execute("DELETE FROM answers")
         conn.execute("DELETE FROM interview_sessions")
+        conn.execute("DELETE FROM user_seen_questions")
+        conn.execute("DELETE FROM session_plan")
+        clear_rollups(conn)
         conn.execute("UPDATE sqlite_sequence SET seq = 0 WHERE name = 'answers'")
         conn.execute("UPDATE sqlite_sequence SET seq = 0 WHERE name = 'interview_sessions'")
         conn.commit()
         conn.close()
+        invalidate_responses('admin')
+        invalidate_responses('student_stats')
         return jsonify({'message': 'System reset successful'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -391,7 +529,10 @@ def system_reset():
 @token_required
 def get_questions(current_user_id):
     """
-    Get all questions for admin management.
+    Questions for admin management, newest first, one page at a time.
+    Query: cursor (last id of the previous page), limit, skill_id, difficulty,
+    type, q (text search), format=ndjson to stream every matching question.
+    Returns: { questions, next_cursor, skills }
     """
     try:
         # Verify admin
@@ -399,22 +540,30 @@ def get_questions(current_user_id):
         user = conn.execute("SELECT role FROM users WHERE id = ?", (current_user_id,)).fetchone()
         if not user or user['role'] != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
-            
-        query = """
-            SELECT q.id, q.question_text, q.difficulty, q.topic, q.expected_keywords, s.skill_name 
-            FROM questions q
-            JOIN skills s ON q.skill_id = s.id
-            ORDER BY q.id DESC
-        """
-        rows = conn.execute(query).fetchall()
-        questions = [dict(row) for row in rows]
+        
+        try:
+            skill_id = request.args.get('skill_id')
+            filters = {
+                'skill_id': int(skill_id) if skill_id not in (None, '') else None,
+                'difficulty': request.args.get('difficulty') or None,
+                'question_type': request.args.get('type') or None,
+                'search': request.args.get('q', '').strip() or None,
+            }
+            if request.args.get('format') == 'ndjson':
+                return _ndjson_response(iter_questions(**filters), 'questions.ndjson')
+            cursor, limit = _page_args()
+        except ValueError as e:
+            return jsonify({'error': f'Invalid query parameters: {e}'}), 400
+        
+        rows = get_questions_page(limit, before_id=cursor, conn=conn, **filters)
+        questions, next_cursor = _split_page(rows, limit)
         
         # Also fetch skills for the dropdown
         skills_rows = conn.execute("SELECT id, skill_name FROM skills").fetchall()
         skills = [dict(row) for row in skills_rows]
         
         conn.close()
-        return jsonify({'questions': questions, 'skills': skills})
+        return jsonify({'questions': questions, 'next_cursor': next_cursor, 'skills': skills})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -449,6 +598,7 @@ def create_question(current_user_id):
         ))
         conn.commit()
         conn.close()
+        mark_questions_changed()
         return jsonify({'message': 'Question created successfully'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -467,6 +617,12 @@ def update_question(current_user_id, id):
         if not user or user['role'] != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
             
+        # Moving a question to another skill moves its answers' totals with it
+        skill_changed = conn.execute(
+            "SELECT 1 FROM questions WHERE id = ? AND skill_id IS NOT ?", (id, data['skill_id'])
+        ).fetchone() is not None
+        if skill_changed:
+            remove_question_answers(conn, id)
         conn.execute("""
             UPDATE questions 
             SET skill_id = ?, question_text = ?, difficulty = ?, topic = ?, expected_keywords = ?
@@ -479,8 +635,14 @@ def update_question(current_user_id, id):
             data.get('expected_keywords', ''),
             id
         ))
+        if skill_changed:
+            add_question_answers(conn, id)
         conn.commit()
         conn.close()
+        mark_questions_changed(id)
+        if skill_changed:
+            invalidate_responses('admin')
+            invalidate_responses('student_stats')
         return jsonify({'message': 'Question updated successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -498,9 +660,14 @@ def delete_question(current_user_id, id):
         if not user or user['role'] != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
             
+        # Its answers no longer count towards any skill
+        remove_question_answers(conn, id)
         conn.execute("DELETE FROM questions WHERE id = ?", (id,))
         conn.commit()
         conn.close()
+        mark_questions_changed(id)
+        invalidate_responses('admin')
+        invalidate_responses('student_stats')
         return jsonify({'message': 'Question deleted successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
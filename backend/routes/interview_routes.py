@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
 from services.interview_service import (
     start_interview, get_next_question, submit_answer,
-    start_interview, get_next_question, submit_answer,
-    get_interview_results, get_history
+    submit_answers_batch, get_interview_results, get_history
 )
+from config import MAX_BATCH_ANSWERS
 from services.execution_service import execute_code
+from utils.response_cache import invalidate_responses
 
 interview_bp = Blueprint("interview", __name__, url_prefix="/interview")
 
@@ -31,7 +32,9 @@ def start(current_user_id):
         if persona not in valid_personas:
             return jsonify({'error': f'Invalid persona. Choose from: {", ".join(valid_personas)}'}), 400
         
-        return start_interview(user_id, resume_id, persona)
+        response = start_interview(user_id, resume_id, persona)
+        invalidate_responses('student_stats', current_user_id)
+        return response
     
     except Exception as e:
         return jsonify({'error': 'Error starting interview. Please try again.'}), 500
@@ -87,7 +90,9 @@ def next_question(current_user_id):
 def submit(current_user_id):
     """
     Submit answer for evaluation
-    Expects JSON: { session_id, question_id, user_answer }
+    Expects JSON: { session_id, question_id, user_answer, include_next? }
+    With include_next the response also carries the next question and
+    progress, saving the separate next-question call.
     """
     try:
         data = request.json
@@ -110,11 +115,58 @@ def submit(current_user_id):
         if not session or session['user_id'] != current_user_id:
             return jsonify({'error': 'Unauthorized access to this session'}), 403
         
-        return submit_answer(session_id, question_id, user_answer)
+        include_next = data.get('include_next', False) is True
+        
+        response = submit_answer(session_id, question_id, user_answer, include_next=include_next)
+        invalidate_responses('student_stats', current_user_id)
+        return response
     
     except Exception as e:
         return jsonify({'error': 'Error submitting answer. Please try again.'}), 500
 
+@interview_bp.route("/submit-answers", methods=["POST"])
+@token_required
+def submit_batch(current_user_id):
+    """
+    Submit several answers for evaluation in one request
+    Expects JSON: { session_id, answers: [{ question_id, user_answer }, ...] }
+    """
+    try:
+        data = request.json
+        if not data:
+            return jsonify({'error': 'Request body is required'}), 400
+        
+        session_id = data.get('session_id')
+        answers = data.get('answers')
+        
+        if not session_id or not isinstance(answers, list) or len(answers) == 0:
+            return jsonify({'error': 'Session ID and a non-empty answers list are required'}), 400
+        
+        if len(answers) > MAX_BATCH_ANSWERS:
+            return jsonify({'error': f'At most {MAX_BATCH_ANSWERS} answers can be submitted at once'}), 400
+        
+        submissions = []
+        for i, item in enumerate(answers):
+            if not isinstance(item, dict) or not item.get('question_id'):
+                return jsonify({'error': f'Answer {i+1}: Question ID is required'}), 400
+            user_answer = item.get('user_answer')
+            if not isinstance(user_answer, str) or len(user_answer.strip()) == 0:
+                return jsonify({'error': f'Answer {i+1}: Answer cannot be empty'}), 400
+            submissions.append({'question_id': item['question_id'], 'user_answer': user_answer})
+        
+        # Verify session belongs to current_user_id for security
+        from models.session_model import get_session_by_id
+        session = get_session_by_id(session_id)
+        if not session or session['user_id'] != current_user_id:
+            return jsonify({'error': 'Unauthorized access to this session'}), 403
+        
+        response = submit_answers_batch(session_id, submissions)
+        invalidate_responses('student_stats', current_user_id)
+        return response
+    
+    except Exception as e:
+        return jsonify({'error': 'Error submitting answers. Please try again.'}), 500
+
 @interview_bp.route("/results/<int:session_id>", methods=["GET"])
 @token_required
 def results(current_user_id, session_id):
@@ -122,7 +174,10 @@ def results(current_user_id, session_id):
     Get interview results
     """
     try:
-        return get_interview_results(session_id)
+        # Fetching results completes the session
+        response = get_interview_results(session_id)
+        invalidate_responses('student_stats', current_user_id)
+        return response
     
     except Exception as e:
         return jsonify({'error': f'Error getting results: {str(e)}'}), 500
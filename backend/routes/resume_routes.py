@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from services.resume_service import upload_and_parse_resume
+from services.resume_service import upload_and_parse_resume, get_resume_job_status
 from services.auth_service import token_required
 
 resume_bp = Blueprint("resume", __name__, url_prefix="/resume")
@@ -24,3 +24,15 @@ def upload(current_user_id):
     
     except Exception as e:
         return jsonify({'error': f'Error uploading resume: {str(e)}'}), 500
+
+@resume_bp.route("/jobs/<int:job_id>", methods=["GET"])
+@token_required
+def job_status(current_user_id, job_id):
+    """
+    Progress of a resume upload; resume_id and skills_found once done
+    """
+    try:
+        return get_resume_job_status(current_user_id, job_id)
+    
+    except Exception as e:
+        return jsonify({'error': f'Error reading job status: {str(e)}'}), 500
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 import logging
 from services.student_service import get_student_stats, get_eligible_drives, get_student_history
 from services.auth_service import token_required
+from utils.response_cache import cached_json
 
 logger = logging.getLogger(__name__)
 student_bp = Blueprint("student", __name__, url_prefix="/student")
@@ -13,8 +14,7 @@ def dashboard_stats(current_user_id):
     Get stats for student dashboard
     """
     try:
-        data = get_student_stats(current_user_id)
-        return jsonify(data), 200
+        return cached_json(('student_stats', current_user_id), lambda: get_student_stats(current_user_id))
     except Exception as e:
         logger.error(f"Error getting dashboard stats for user {current_user_id}: {str(e)}")
         return jsonify({'error': 'Error loading dashboard statistics'}), 500
@@ -26,8 +26,7 @@ def drives(current_user_id):
     Get eligible placement drives
     """
     try:
-        data = get_eligible_drives(current_user_id)
-        return jsonify(data), 200
+        return cached_json(('student_drives', current_user_id), lambda: get_eligible_drives(current_user_id))
     except Exception as e:
         logger.error(f"Error getting drives for user {current_user_id}: {str(e)}")
         return jsonify({'error': 'Error loading placement drives'}), 500
@@ -1,4 +1,5 @@
 from database import get_db_connection
+from models.analytics_model import clear_rollups
 import logging
 
 logger = logging.getLogger(__name__)
@@ -257,6 +258,9 @@ def reset_system():
         # Clear sessions and answers
         conn.execute("DELETE FROM answers")
         conn.execute("DELETE FROM interview_sessions")
+        conn.execute("DELETE FROM user_seen_questions")
+        conn.execute("DELETE FROM session_plan")
+        clear_rollups(conn)
         # Optional: Clear users too? keeping users for now as they might be registered.
         # conn.execute("DELETE FROM users") 
         conn.commit()
@@ -1,15 +1,48 @@
 import subprocess
 import tempfile
+import logging
 import os
 import sys
+from config import SANDBOX_TIMEOUT
+from utils.sandbox import sandbox_available, run_in_sandbox, SandboxError
+
+logger = logging.getLogger(__name__)
 
 def execute_code(code):
     """
-    Executes Python code safely-ish (local environment) and returns output.
+    Executes Python code in the sandbox worker pool and returns output.
+    Falls back to a one-off subprocess where the pool is unavailable.
     """
     if not code:
         return {"output": "", "error": "No code provided."}
 
+    if not sandbox_available():
+        return _execute_code_subprocess(code)
+
+    try:
+        result = run_in_sandbox(code, SANDBOX_TIMEOUT)
+    except SandboxError as e:
+        logger.error(f"Sandbox run failed: {str(e)}")
+        return {
+            "output": "",
+            "error": f"System Error: {str(e)}"
+        }
+
+    if result.get('timed_out'):
+        return {
+            "output": result.get('output', ''),
+            "error": f"Execution timed out (Limit: {SANDBOX_TIMEOUT} seconds)."
+        }
+
+    return {
+        "output": result.get('output', ''),
+        "error": result.get('error', '')
+    }
+
+def _execute_code_subprocess(code):
+    """
+    Runs the code in a fresh interpreter (used where fork() is not available).
+    """
     # Create a temporary file
     fd, temp_path = tempfile.mkstemp(suffix=".py")
     
@@ -20,12 +53,12 @@ def execute_code(code):
             
         # Run the code
         # render_output=True capture_output=True (for python < 3.7 use stdout=subprocess.PIPE)
-        # timeout=5 seconds to prevent infinite loops
+        # timeout prevents infinite loops
         result = subprocess.run(
             [sys.executable, temp_path], 
             capture_output=True, 
             text=True, 
-            timeout=5
+            timeout=SANDBOX_TIMEOUT
         )
         
         return {
@@ -36,7 +69,7 @@ def execute_code(code):
     except subprocess.TimeoutExpired:
         return {
             "output": "",
-            "error": "Execution timed out (Limit: 5 seconds)."
+            "error": f"Execution timed out (Limit: {SANDBOX_TIMEOUT} seconds)."
         }
     except Exception as e:
         return {
@@ -1,120 +1,223 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from flask import jsonify
-from database import get_db_connection
-from models.resume_model import get_resume_by_id
-from models.question_model import get_questions_by_skills, get_question_by_id, create_dynamic_question
+from config import NEXT_QUESTION_PREFETCH_WORKERS
+from database import get_db_connection, db_connection
+from models.question_model import get_question_with_skill
 from models.session_model import (
-    create_session, save_answer, update_session_score, 
+    create_session, save_answer, save_answers_batch,
     complete_session, get_session_results, get_user_history,
-    get_answered_questions, get_globally_seen_questions
+    get_answered_questions, get_seen_question_set,
+    save_session_plan, get_planned_question, get_session_plan, replace_planned_question
 )
-from utils.skill_extractor import extract_skills_from_text
-from utils.evaluator import evaluate_answer
-from utils.question_generator import generate_heuristic_questions
+from utils.resume_skills_cache import get_resume_skills
+from utils.evaluator import evaluate_answer_with_plan, evaluate_answers_batch
+from utils.evaluation_cache import get_evaluation_plan
+from utils.question_stats import record_question_scores
+from utils.question_index import get_question_index, invalidate_question_index, question_filter
 
 logger = logging.getLogger(__name__)
 
+# Looks up the next planned question while submit_answer grades the current one
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=NEXT_QUESTION_PREFETCH_WORKERS, thread_name_prefix='next-question'
+)
+
+# Questions per interview in the B.Tech placement pattern
+SESSION_QUESTION_COUNT = 15
+
+# INJECT CORE SUBJECTS (Standard B.Tech Stack)
+# Even if not in resume, these are fair game and prevent running out of questions
+CORE_SUBJECTS = ['DBMS', 'Operating Systems', 'Computer Networks', 'SQL', 'Object Oriented Programming']
+
 def start_interview(user_id, resume_id, persona='standard'):
     """
-    Start a new interview session with persona awareness
+    Start a new interview session with persona awareness.
+    The whole question plan is chosen here and stored in session_plan;
+    next-question then serves it in order.
     """
     try:
-        # Get resume
-        resume = get_resume_by_id(resume_id)
-        if not resume:
+        # Get resume skills (extracted once per resume, then cached)
+        skills = get_resume_skills(resume_id)
+        if skills is None:
             return jsonify({'error': 'Resume not found'}), 404
         
-        # Extract skills from resume text
-        extracted_text = resume['extracted_text']
-        skills = extract_skills_from_text(extracted_text)
-        
         if not skills:
             # Fallback for MVP: Don't block user. Assume General engineering.
             logger.warning(f"No skills found in resume {resume_id}. Defaulting to General.")
             skills = ['General']
-            
-        # 1. Generate Dynamic Questions (Heuristic) based on Persona
-        # DISABLING dynamic questions for now to ensure strict adherence to B.Tech pattern (Intro -> Core -> Hard)
-        # dynamic_qs = generate_heuristic_questions(skills, count=3, persona=persona)
-        created_dynamic_ids = []
-        
-        # 2. Get Standard Questions based on skills & persona
-        # Fetch 15 to match the specific B.Tech pattern
-        raw_standard_questions = get_questions_by_skills(skills, limit=15)
-        
-        filtered_standard_questions = []
-        if persona == 'technical':
-            # Prefer Hard/Medium
-            filtered_standard_questions = [
-                q for q in raw_standard_questions 
-                if q['difficulty'] in ['Hard', 'Medium'] or q['question_type'] == 'coding'
-            ]
-        elif persona == 'hr':
-            # Prefer Behavioral if possible (though we might not have many labeled as such linked to tech skills)
-            # Or just Easy questions
-            filtered_standard_questions = [
-                q for q in raw_standard_questions 
-                if q['difficulty'] == 'Easy' or q['skill_id'] == 1 # Assuming 1 is General/Behavioral - unsafe assumption but acceptable for mvp
-            ]
-        else:
-            filtered_standard_questions = raw_standard_questions
-            
-        # Fallback if filtering removed too many
-        if len(filtered_standard_questions) < 3:
-             filtered_standard_questions = raw_standard_questions
-
-        standard_questions = filtered_standard_questions
-
-        # Cap it
-        if not standard_questions and not created_dynamic_ids:
-             return jsonify({'error': 'No questions found for your skills'}), 404
-
-        # Combine Questions
-        final_questions_pool = []
-        
-        # Add dynamic ones (high priority)
-        # Note: We are disabling dynamic generation mostly, but keeping logic
-        for qid in created_dynamic_ids:
-            q_obj = get_question_by_id(qid)
-            if q_obj:
-                final_questions_pool.append(q_obj)
         
-        # Add standard ones
-        final_questions_pool.extend(standard_questions)
+        conn = get_db_connection()
         
-        # Ensure we have at least 15 for the session count
-        # (Though get_next_question will enforce it dynamically)
+        # Plan every stage up front: Warm-up (Q1-2) -> Core (Q3-10) -> Advanced (Q11-15)
+        plan_questions = _build_session_plan(conn, user_id, _interview_skills(skills))
+        if not plan_questions:
+            return jsonify({'error': 'No questions found for your skills'}), 404
         
         # Create session (save persona)
-        # Note: create_session needs update to accept persona, or we do manual update
-        session_id = create_session(user_id, resume_id, len(final_questions_pool))
-        
-        # Update persona column manually since create_session might not have it yet
-        conn = get_db_connection()
+        session_id = create_session(user_id, resume_id, len(plan_questions), conn=conn)
         conn.execute("UPDATE interview_sessions SET persona = ? WHERE id = ?", (persona, session_id))
-        conn.commit()
+        save_session_plan(session_id, [(q['id'], stage) for q, stage in plan_questions], conn=conn)
         conn.close()
         
         # Convert questions to list of dicts
-        question_list = [dict(q) for q in final_questions_pool]
+        question_list = [_question_for_stage(q, stage) for q, stage in plan_questions]
         
         return jsonify({
             'message': 'Interview started successfully',
             'session_id': session_id,
             'skills_found': skills,
-            'total_questions': len(final_questions_pool),
+            'total_questions': len(question_list),
             'questions': question_list
         }), 200
     
     except Exception as e:
         return jsonify({'error': f'Error starting interview: {str(e)}'}), 500
 
-def get_next_question(session_id, current_skills=None):
+def _interview_skills(skills):
+    skills = list(skills) or ['General']
+    for subject in CORE_SUBJECTS:
+        if subject not in skills:
+            skills.append(subject)
+    return skills
+
+def _stage_for(position):
+    """
+    (stage, target difficulty) for a 0-based question position:
+    1. Warm-up (Q1-2): Easy / Intro
+    2. Core (Q3-10): Medium
+    3. Advanced (Q11-15): Hard
+    """
+    if position < 2:
+        return "Warm-up", "Easy"
+    elif position < 10:
+        return "Core", "Medium"
+    # Last 5 questions (10-15)
+    return "Advanced", "Hard"
+
+def _question_for_stage(question, stage):
+    # Override difficulty for display consistency in Warm-up
+    q_dict = dict(question)
+    if stage == "Warm-up":
+        q_dict['difficulty'] = "Easy"
+    return q_dict
+
+def _pick_question(conn, index, filters, exclude):
+    """
+    Fetch one random question matching filters (see utils.question_index)
+    whose id is not in exclude, or None if there is none.
+    """
+    for _ in range(3):
+        ids = index.sample(filters, exclude=exclude)
+        if not ids:
+            return None
+        question = get_question_with_skill(ids[0], conn=conn)
+        if question:
+            return question
+        # Deleted since the index was built
+        invalidate_question_index()
+        index = get_question_index(conn=conn)
+    return None
+
+def _select_question(conn, index, position, skills, excluded_ids, session_ids):
+    """
+    Choose the question for a 0-based position with the stage fallbacks.
+    index: the question index (get_question_index), fetched once by the caller
+    excluded_ids: everything the user must not see again (no-repeat mode)
+    session_ids: questions already used in this session (never repeated)
+    """
+    curr_stage, target_difficulty = _stage_for(position)
+    
+    # Prioritize 'Behavioral' for Warm-up if possible
+    question = None
+    
+    if curr_stage == "Warm-up":
+        # 1. ROTATING INTRO: Q1 always picks an unseen 'Introduction'-topic question
+        if position == 0:
+            question = _pick_question(conn, index, (question_filter(topic='Introduction', require_skill=False),), excluded_ids)
+
+            if not question:
+                # All intro variants exhausted — pick any unseen Easy question as opener
+                logger.info("All intro variants seen. Using random Easy question as opener.")
+                question = _pick_question(conn, index, (question_filter(difficulty='Easy'),), excluded_ids)
+
+        # 2. General Warm-up (Behavioral or Easy) — respects no-repeat pool
+        if not question:
+            question = _pick_question(
+                conn, index,
+                (question_filter(topic='Behavioral'), question_filter(difficulty='Easy')),
+                excluded_ids
+            )
+
+    if not question:
+        # Standard Fetch for Core/Advanced — uses global exclusion list
+        # SAFETY NET for Coding: runnable_only skips coding questions without test cases
+        question = _pick_question(
+            conn, index,
+            (question_filter(skills=skills, difficulty=target_difficulty, runnable_only=True),),
+            excluded_ids
+        )
+
+    # Fallback 1: Any Medium question if specific difficulty not found (global exclusion)
+    if not question and target_difficulty != 'Medium':
+        logger.warning(f"No {target_difficulty} question found. Falling back to Medium (Strict Skills).")
+        question = _pick_question(conn, index, (question_filter(skills=skills, difficulty='Medium'),), excluded_ids)
+
+        if not question:
+            logger.warning("No Medium question found. Falling back to Easy (Strict Skills).")
+            question = _pick_question(conn, index, (question_filter(skills=skills, difficulty='Easy'),), excluded_ids)
+
+    # Fallback 2: Pool exhausted globally — relax to session-only exclusion
+    # This handles the rare case where a user has seen all questions for their skills
+    if not question and len(excluded_ids) > len(session_ids):
+        logger.warning("Global question pool exhausted for user. Relaxing to session-only exclusion.")
+        question = _pick_question(conn, index, (question_filter(skills=skills),), set(session_ids))
+
+    # Fallback 3: ABSOLUTE EMERGENCY - General/Behavioral only
+    if not question:
+        logger.warning("Emergency Fallback: Fetching General/Behavioral question.")
+        emg_placeholders = ','.join('?' * len(session_ids)) if session_ids else '0'
+        query_any = f"""
+           SELECT q.*, s.skill_name 
+           FROM questions q
+           JOIN skills s ON q.skill_id = s.id
+           WHERE q.id NOT IN ({emg_placeholders}) 
+           AND (s.skill_name = 'General' OR q.topic = 'Behavioral')
+           LIMIT 1
+        """
+        question = conn.execute(query_any, list(session_ids)).fetchone()
+
+    return question
+
+def _build_session_plan(conn, user_id, skills):
+    """
+    Choose all SESSION_QUESTION_COUNT questions of a new session.
+    Returns a list of (question row, stage); shorter if the bank runs dry.
+    """
+    # NO-REPEAT MODE: Exclude questions seen in ALL past sessions for this user
+    excluded_ids = get_seen_question_set(user_id, conn=conn)
+    index = get_question_index(conn=conn)
+    planned_ids = []
+    plan = []
+    for position in range(SESSION_QUESTION_COUNT):
+        question = _select_question(conn, index, position, skills, excluded_ids, planned_ids)
+        if not question:
+            break
+        excluded_ids.add(question['id'])
+        planned_ids.append(question['id'])
+        plan.append((question, _stage_for(position)[0]))
+    return plan
+
+def get_next_question(session_id, current_skills=None, prefetched=None):
     """
     Get the next unanswered question based on PROGRESSIVE STAGES:
     1. Warm-up (Q1-2): Easy / Intro
     2. Core (Q3-10): Medium
     3. Advanced (Q11-15): Hard
+    Planned sessions are a single session_plan lookup; sessions started
+    before plans existed (or past the end of their plan) choose live.
+    prefetched: result of _prefetch_next_question, used if it is for the
+    position actually due.
     """
     try:
         # 1. Check Session Status
@@ -126,24 +229,15 @@ def get_next_question(session_id, current_skills=None):
             return None
             
         # 2. Get Answered Question IDs (current session)
-        answered_ids = get_answered_questions(session_id)
+        answered_ids = get_answered_questions(session_id, conn=conn)
         count_answered = len(answered_ids)
-
-        # NO-REPEAT MODE: Exclude questions seen in ALL past sessions for this user
-        globally_seen_ids = get_globally_seen_questions(session['user_id'])
-        # Merge: union of current-session answered + all past sessions seen
-        # Use a set to deduplicate, convert back to list for SQL
-        excluded_ids = list(set(answered_ids) | set(globally_seen_ids))
         
         # HOTFIX: Force upgrade old sessions to 15 questions
-        if session['total_questions'] < 15:
-            logger.info(f"Upgrading session {session_id} from {session['total_questions']} to 15 questions.")
-            conn.execute("UPDATE interview_sessions SET total_questions = 15 WHERE id = ?", (session_id,))
+        if session['total_questions'] < SESSION_QUESTION_COUNT:
+            logger.info(f"Upgrading session {session_id} from {session['total_questions']} to {SESSION_QUESTION_COUNT} questions.")
+            conn.execute("UPDATE interview_sessions SET total_questions = ? WHERE id = ?", (SESSION_QUESTION_COUNT, session_id))
             conn.commit()
-            # Update local dict to match
-            # session is a Row, convert to dict to modify or just re-fetch?
-            # Easiest is just to trust the new limit logic below
-            session_limit = 15
+            session_limit = SESSION_QUESTION_COUNT
         else:
             session_limit = session['total_questions']
         
@@ -152,166 +246,38 @@ def get_next_question(session_id, current_skills=None):
             conn.close()
             return None # Interview Complete
             
-        # 4. DETERMINE TARGET DIFFICULTY BASED ON STAGE
-        curr_stage = "Core"
-        target_difficulty = "Medium"
-        
-        if count_answered < 2:
-            curr_stage = "Warm-up"
-            target_difficulty = "Easy"
-        elif count_answered < 10:
-            curr_stage = "Core"
-            target_difficulty = "Medium"
-        else:
-            # Last 5 questions (10-15)
-            curr_stage = "Advanced"
-            target_difficulty = "Hard"
-            
+        # 4. DETERMINE STAGE
+        curr_stage, target_difficulty = _stage_for(count_answered)
         logger.info(f"Session {session_id}: Fetching Q{count_answered+1} ({curr_stage} - {target_difficulty})")
 
-        # 5. Get User Skills
-        resume = get_resume_by_id(session['resume_id'])
-        extracted_text = resume['extracted_text']
-        skills = extract_skills_from_text(extracted_text)
-        if not skills: skills = ['General']
-        
-        # INJECT CORE SUBJECTS (Standard B.Tech Stack)
-        # Even if not in resume, these are fair game and prevent running out of questions
-        core_subjects = ['DBMS', 'Operating Systems', 'Computer Networks', 'SQL', 'Object Oriented Programming']
-        for result in core_subjects:
-            if result not in skills:
-                skills.append(result)
-            
-        skill_placeholders = ','.join('?' * len(skills))
-        # Use excluded_ids (global + current session) for no-repeat mode
-        # Fallback: if all questions are exhausted globally, reset to session-only exclusion
-        placeholders = ','.join('?' * len(excluded_ids)) if excluded_ids else '0'
-        exclude_params = excluded_ids if excluded_ids else []
-        
-        # 6. Fetch Question
-        # Prioritize 'Behavioral' for Warm-up if possible
+        # 5. Serve the planned question for this position
         question = None
-        
-        if curr_stage == "Warm-up":
-            # 1. ROTATING INTRO: Q1 always picks an unseen 'Introduction'-topic question
-            if count_answered == 0:
-                intro_placeholders = ','.join('?' * len(exclude_params)) if exclude_params else '0'
-                query_intro = f"""
-                    SELECT * FROM questions
-                    WHERE topic = 'Introduction'
-                    AND id NOT IN ({intro_placeholders})
-                    ORDER BY RANDOM() LIMIT 1
-                """
-                question = conn.execute(query_intro, exclude_params).fetchone()
-
-                if not question:
-                    # All intro variants exhausted — pick any unseen Easy question as opener
-                    logger.info("All intro variants seen. Using random Easy question as opener.")
-                    query_intro_fallback = f"""
-                        SELECT q.*, s.skill_name FROM questions q
-                        JOIN skills s ON q.skill_id = s.id
-                        WHERE q.id NOT IN ({intro_placeholders})
-                        AND q.difficulty = 'Easy'
-                        ORDER BY RANDOM() LIMIT 1
-                    """
-                    question = conn.execute(query_intro_fallback, exclude_params).fetchone()
-
-            # 2. General Warm-up (Behavioral or Easy) — respects no-repeat pool
-            if not question:
-                query_warmup = f"""
-                    SELECT DISTINCT q.*, s.skill_name
-                    FROM questions q
-                    JOIN skills s ON q.skill_id = s.id
-                    WHERE q.id NOT IN ({placeholders})
-                    AND (q.topic = 'Behavioral' OR q.difficulty = 'Easy')
-                    ORDER BY RANDOM() LIMIT 1
-                """
-                question = conn.execute(query_warmup, exclude_params).fetchone()
-
-
-        if not question:
-            # Standard Fetch for Core/Advanced — uses global exclusion list
-            query = f"""
-                SELECT DISTINCT q.*, s.skill_name
-                FROM questions q
-                JOIN skills s ON q.skill_id = s.id
-                WHERE q.id NOT IN ({placeholders})
-                AND s.skill_name IN ({skill_placeholders})
-                AND q.difficulty = ?
-                -- SAFETY NET for Coding
-                AND (q.question_type != 'coding' OR (q.test_cases IS NOT NULL AND length(q.test_cases) > 5))
-                ORDER BY RANDOM() LIMIT 1
-            """
-            params = exclude_params + list(skills) + [target_difficulty]
-            question = conn.execute(query, params).fetchone()
-
-        # Fallback 1: Any Medium question if specific difficulty not found (global exclusion)
-        if not question and target_difficulty != 'Medium':
-            logger.warning(f"No {target_difficulty} question found. Falling back to Medium (Strict Skills).")
-            query_fallback = f"""
-               SELECT DISTINCT q.*, s.skill_name
-               FROM questions q
-               JOIN skills s ON q.skill_id = s.id
-               WHERE q.id NOT IN ({placeholders})
-               AND s.skill_name IN ({skill_placeholders})
-               AND q.difficulty = 'Medium'
-               ORDER BY RANDOM() LIMIT 1
-            """
-            params_kb = exclude_params + list(skills)
-            question = conn.execute(query_fallback, params_kb).fetchone()
-
+        if prefetched and prefetched['position'] == count_answered and prefetched['question']:
+            planned = prefetched['planned']
+            question = prefetched['question']
+        else:
+            planned = get_planned_question(session_id, count_answered, conn=conn)
+        if planned and not question:
+            question = get_question_with_skill(planned['question_id'], conn=conn)
             if not question:
-                logger.warning("No Medium question found. Falling back to Easy (Strict Skills).")
-                query_fallback_easy = f"""
-                   SELECT DISTINCT q.*, s.skill_name
-                   FROM questions q
-                   JOIN skills s ON q.skill_id = s.id
-                   WHERE q.id NOT IN ({placeholders})
-                   AND s.skill_name IN ({skill_placeholders})
-                   AND q.difficulty = 'Easy'
-                   ORDER BY RANDOM() LIMIT 1
-                """
-                question = conn.execute(query_fallback_easy, params_kb).fetchone()
-
-        # Fallback 2: Pool exhausted globally — relax to session-only exclusion
-        # This handles the rare case where a user has seen all questions for their skills
-        if not question and len(excluded_ids) > len(answered_ids):
-            logger.warning("Global question pool exhausted for user. Relaxing to session-only exclusion.")
-            session_placeholders = ','.join('?' * len(answered_ids)) if answered_ids else '0'
-            query_relaxed = f"""
-               SELECT DISTINCT q.*, s.skill_name
-               FROM questions q
-               JOIN skills s ON q.skill_id = s.id
-               WHERE q.id NOT IN ({session_placeholders})
-               AND s.skill_name IN ({skill_placeholders})
-               ORDER BY RANDOM() LIMIT 1
-            """
-            question = conn.execute(query_relaxed, list(answered_ids) + list(skills)).fetchone()
+                logger.warning(f"Session {session_id}: planned question {planned['question_id']} was deleted. Choosing a replacement.")
 
-        # Fallback 3: ABSOLUTE EMERGENCY - General/Behavioral only
         if not question:
-            logger.warning("Emergency Fallback: Fetching General/Behavioral question.")
-            emg_placeholders = ','.join('?' * len(answered_ids)) if answered_ids else '0'
-            query_any = f"""
-               SELECT q.*, s.skill_name 
-               FROM questions q
-               JOIN skills s ON q.skill_id = s.id
-               WHERE q.id NOT IN ({emg_placeholders}) 
-               AND (s.skill_name = 'General' OR q.topic = 'Behavioral')
-               LIMIT 1
-            """
-            question = conn.execute(query_any, list(answered_ids)).fetchone()
+            # NO-REPEAT MODE: the seen set is a per-user bitmap; merge in the
+            # current session's answers and the rest of its plan
+            session_ids = list(answered_ids) + [p['question_id'] for p in get_session_plan(session_id, conn=conn)]
+            excluded_ids = get_seen_question_set(session['user_id'], conn=conn)
+            excluded_ids.update(session_ids)
+            skills = _interview_skills(get_resume_skills(session['resume_id'], conn=conn) or [])
+            question = _select_question(conn, get_question_index(conn=conn), count_answered, skills, excluded_ids, session_ids)
+            if question and planned:
+                replace_planned_question(session_id, count_answered, question['id'], conn=conn)
              
         conn.close()
         
         if question:
-             # Override difficulty for display consistency in Warm-up
-             q_dict = dict(question)
-             if curr_stage == "Warm-up":
-                 q_dict['difficulty'] = "Easy"
-             
              return {
-                 'question': q_dict,
+                 'question': _question_for_stage(question, curr_stage),
                  'progress': {
                      'answered': count_answered,
                      'total': session_limit
@@ -324,12 +290,24 @@ def get_next_question(session_id, current_skills=None):
         logger.error(f"Error in dynamic fetch: {str(e)}")
         return None
 
-def submit_answer(session_id, question_id, user_answer):
+def _prefetch_next_question(session_id):
+    """
+    Runs on the prefetch executor while an answer is being graded: load the
+    planned question for the position after the one being answered.
+    Uses its own pooled connection (there is no request context here).
+    """
+    with db_connection() as conn:
+        position = len(get_answered_questions(session_id, conn=conn)) + 1
+        planned = get_planned_question(session_id, position, conn=conn)
+        question = get_question_with_skill(planned['question_id'], conn=conn) if planned else None
+    return {'position': position, 'planned': planned, 'question': question}
+
+def submit_answer(session_id, question_id, user_answer, include_next=False):
     """
     Submit and evaluate user's answer
     
     Steps:
-    1. Get question details
+    1. Get the question's cached evaluation plan
     2. Evaluate answer using keyword matching
     3. Save answer with score and feedback
     4. Update session total score
@@ -341,32 +319,23 @@ def submit_answer(session_id, question_id, user_answer):
         user_answer: User's text answer
         
     Returns:
-        JSON response with score and feedback
+        JSON response with score and feedback, plus next_question and
+        progress (as returned by next-question) when include_next is set
     """
     try:
-        # Get question
-        question = get_question_by_id(question_id)
-        if not question:
+        # Get the (cached) evaluation plan for this question
+        plan = get_evaluation_plan(question_id)
+        if not plan:
             return jsonify({'error': 'Question not found'}), 404
         
-        # Evaluate answer
-        expected_keywords = question['expected_keywords']
-        # Fix: sqlite3.Row might not support .get(), convert to dict first
-        q_dict = dict(question)
-        question_type = q_dict.get('question_type', 'text')
-        test_cases_json = q_dict.get('test_cases')
-        answer_variants_json = q_dict.get('answer_variants')
+        # Prepare the next pick in the background while the answer is graded
+        prefetch = _prefetch_executor.submit(_prefetch_next_question, session_id) if include_next else None
         
-        evaluation = evaluate_answer(
-            user_answer, 
-            expected_keywords, 
-            question_type, 
-            test_cases_json,
-            answer_variants_json=answer_variants_json
-        )
+        # Evaluate answer
+        evaluation = evaluate_answer_with_plan(user_answer, plan)
         
-        # Save answer
-        save_answer(
+        # Save answer (also updates the session's running score)
+        session_score = save_answer(
             session_id, 
             question_id, 
             user_answer, 
@@ -376,25 +345,128 @@ def submit_answer(session_id, question_id, user_answer):
             communication_score=evaluation.get('communication_score', evaluation.get('score', 0)),
             problem_solving_score=evaluation.get('problem_solving_score', evaluation.get('score', 0))
         )
-        
-        # Update session score
-        update_session_score(session_id)
+        if not evaluation.get('grading_error'):
+            # An answer the sandbox could not grade says nothing about the question
+            record_question_scores([(question_id, evaluation['score'])])
 
         # --- PERSONA FEEDBACK REMOVED ---
         # The new strict evaluator generates comprehensive feedback.
         final_feedback = evaluation.get('feedback', 'No feedback')
 
-        return jsonify({
+        response = {
             'message': 'Answer submitted successfully',
             'score': evaluation.get('score', 0),
             'feedback': final_feedback,
             'matched_keywords': evaluation.get('matched_keywords', []),
-            'total_keywords': evaluation.get('total_keywords', 0)
-        }), 200
+            'total_keywords': evaluation.get('total_keywords', 0),
+            'test_results': evaluation.get('test_results', []),
+            'grading_error': evaluation.get('grading_error', False),
+            'session_score': session_score
+        }
+        
+        if prefetch is not None:
+            try:
+                prefetched = prefetch.result()
+            except Exception as e:
+                logger.warning(f"Next question prefetch failed for session {session_id}: {e}")
+                prefetched = None
+            next_result = get_next_question(session_id, prefetched=prefetched)
+            response['next_question'] = next_result['question'] if next_result else None
+            if next_result:
+                response['progress'] = next_result['progress']
+        
+        return jsonify(response), 200
     
     except Exception as e:
         return jsonify({'error': f'Error submitting answer: {str(e)}'}), 500
 
+def submit_answers_batch(session_id, submissions):
+    """
+    Submit and evaluate several answers for one session in a single call
+    (e.g. a written mock test submitted at the end).
+    
+    Steps:
+    1. Look up every question's cached evaluation plan
+    2. Evaluate all answers
+    3. Save all answers and update the session score in one transaction
+    4. Return per-answer results in submission order
+    
+    Args:
+        session_id: ID of the interview session
+        submissions: list of { question_id, user_answer } dicts (already validated)
+        
+    Returns:
+        JSON response with a result per answer and the session score
+    """
+    try:
+        plans = []
+        missing = []
+        for item in submissions:
+            plan = get_evaluation_plan(item['question_id'])
+            if not plan:
+                missing.append(item['question_id'])
+            plans.append(plan)
+        
+        if missing:
+            return jsonify({'error': 'Question not found', 'question_ids': missing}), 404
+        
+        evaluations = evaluate_answers_batch(
+            (item['user_answer'], plan) for item, plan in zip(submissions, plans)
+        )
+        
+        rows = []
+        for item, evaluation in zip(submissions, evaluations):
+            rows.append({
+                'question_id': item['question_id'],
+                'user_answer': item['user_answer'],
+                'score': evaluation['score'],
+                'feedback': evaluation['feedback'],
+                'technical_score': evaluation.get('technical_score', evaluation.get('score', 0)),
+                'communication_score': evaluation.get('communication_score', evaluation.get('score', 0)),
+                'problem_solving_score': evaluation.get('problem_solving_score', evaluation.get('score', 0))
+            })
+        
+        session_score = save_answers_batch(session_id, rows)
+        record_question_scores(
+            (row['question_id'], row['score'])
+            for row, evaluation in zip(rows, evaluations) if not evaluation.get('grading_error')
+        )
+        
+        results = []
+        for item, evaluation in zip(submissions, evaluations):
+            results.append({
+                'question_id': item['question_id'],
+                'score': evaluation.get('score', 0),
+                'feedback': evaluation.get('feedback', 'No feedback'),
+                'matched_keywords': evaluation.get('matched_keywords', []),
+                'total_keywords': evaluation.get('total_keywords', 0),
+                'test_results': evaluation.get('test_results', []),
+                'grading_error': evaluation.get('grading_error', False)
+            })
+        
+        return jsonify({
+            'message': f'{len(results)} answers submitted successfully',
+            'results': results,
+            'session_score': session_score
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': f'Error submitting answers: {str(e)}'}), 500
+
+def _pillar_scores(session):
+    """
+    Average technical / communication / problem-solving score of a session
+    row, from its running sums.
+    """
+    count = session.get('answer_count') or 0
+    if not count:
+        return {'technical': 0, 'communication': 0, 'problem_solving': 0}
+    return {
+        'technical': round(session['technical_sum'] / count, 1),
+        'communication': round(session['communication_sum'] / count, 1),
+        'problem_solving': round(session['problem_solving_sum'] / count, 1),
+    }
+
 def get_interview_results(session_id):
     """
     Get final interview results
@@ -443,6 +515,7 @@ def get_interview_results(session_id):
             'answers': results['answers'],
             'total_score': results['session']['total_score'],
             'total_questions': results['session']['total_questions'],
+            'pillar_scores': _pillar_scores(results['session']),
             'skill_breakdown': skill_breakdown
         }), 200
     
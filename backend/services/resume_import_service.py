@@ -0,0 +1,178 @@
+import os
+import logging
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from models.question_model import get_all_skills
+from models.resume_model import save_resumes_batch
+from models.user_model import get_student_ids_by_email
+from utils.resume_import_worker import init_worker, parse_resume
+from utils.response_cache import invalidate_responses
+from config import MAX_FILE_SIZE, RESUME_IMPORT_WORKERS, RESUME_IMPORT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+class ResumeImportError(Exception):
+    """The import cannot start; the message is shown to the admin."""
+    pass
+
+def sources_from_directory(path):
+    """
+    Every PDF directly inside a directory, as (filename, path, size) sorted
+    by name
+    """
+    if not os.path.isdir(path):
+        raise ResumeImportError(f'Not a directory: {path}')
+    sources = []
+    for name in sorted(os.listdir(path)):
+        filepath = os.path.join(path, name)
+        if name.lower().endswith('.pdf') and os.path.isfile(filepath):
+            sources.append((name, filepath, os.path.getsize(filepath)))
+    return sources
+
+def sources_from_zip(archive):
+    """
+    Every PDF in an open ZipFile, as (filename, loader, size); loader()
+    reads the file's bytes. Folders inside the zip are ignored.
+    """
+    sources = []
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        # Skip folders and macOS metadata files (._name.pdf)
+        if info.is_dir() or name.startswith('.') or not name.lower().endswith('.pdf'):
+            continue
+        sources.append((name, partial(archive.read, info), info.file_size))
+    return sources
+
+def _match_student(filename, students, student_ids):
+    """User id of the student a file is named after (<email>.pdf or <user id>.pdf), or None."""
+    stem = os.path.splitext(filename)[0].strip().lower()
+    if stem in students:
+        return students[stem]
+    if stem.isdigit() and int(stem) in student_ids:
+        return int(stem)
+    return None
+
+def _pool_context():
+    """
+    Start the parser processes with forkserver (spawn where unavailable):
+    forking the threaded web server could copy a lock held by another
+    thread into the child. The children only need the skill rows passed to
+    init_worker and never open the database.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+def import_resumes(sources, workers=RESUME_IMPORT_WORKERS, batch_size=RESUME_IMPORT_BATCH_SIZE):
+    """
+    Parse PDFs across a process pool and save each as a resume of the
+    student it is named after (<email>.pdf or <user id>.pdf), with its
+    skills. Resumes are written batch_size at a time, one transaction each.
+
+    Args:
+        sources: (filename, pdf, size) tuples; pdf is a path, or a callable
+            returning the file's bytes (see sources_from_directory/_zip)
+
+    Yields:
+        A progress report after every batch_size files: total, processed,
+        imported and failed counts, and the errors ({file, error}) since the
+        previous report. The last report has done set to True.
+    """
+    students = get_student_ids_by_email()
+    student_ids = set(students.values())
+    skills = [dict(skill) for skill in get_all_skills()]
+
+    report = {'total': len(sources), 'processed': 0, 'imported': 0, 'failed': 0, 'errors': [], 'done': False}
+    batch = []
+    unreported = 0
+
+    def fail(filename, error):
+        report['failed'] += 1
+        report['errors'].append({'file': filename, 'error': error})
+
+    def skip(filename, error):
+        nonlocal unreported
+        fail(filename, error)
+        report['processed'] += 1
+        unreported += 1
+
+    def collect(done):
+        nonlocal unreported
+        for future in done:
+            filename, user_id = pending.pop(future)
+            try:
+                extracted_text, found_skills = future.result()
+                batch.append({
+                    'user_id': user_id, 'filename': filename,
+                    'extracted_text': extracted_text, 'skills': found_skills
+                })
+            except Exception as e:
+                fail(filename, str(e))
+            report['processed'] += 1
+            unreported += 1
+
+    def flush():
+        nonlocal unreported
+        if batch:
+            try:
+                save_resumes_batch(batch)
+                report['imported'] += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to save a batch of {len(batch)} imported resumes: {str(e)}")
+                for resume in batch:
+                    fail(resume['filename'], 'Failed to save resume')
+            batch.clear()
+        progress = dict(report)
+        report['errors'] = []
+        unreported = 0
+        return progress
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_pool_context(),
+        initializer=init_worker,
+        initargs=(skills,)
+    )
+    pending = {}
+    try:
+        for filename, pdf, size in sources:
+            user_id = _match_student(filename, students, student_ids)
+            if user_id is None:
+                skip(filename, 'No student with this email or user id')
+            elif size > MAX_FILE_SIZE:
+                skip(filename, f'File size exceeds {MAX_FILE_SIZE / (1024*1024):.1f}MB limit')
+            else:
+                # Bound the files held in memory to a few per worker
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                try:
+                    pdf = pdf() if callable(pdf) else pdf
+                except Exception as e:
+                    # e.g. a corrupt member of a zip
+                    skip(filename, f'Could not read file: {str(e)}')
+                else:
+                    pending[pool.submit(parse_resume, pdf)] = (filename, user_id)
+            if unreported >= batch_size:
+                yield flush()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+            if unreported >= batch_size:
+                yield flush()
+    finally:
+        # Also reached when the caller stops early (e.g. the client went away)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    progress = flush()
+    progress['done'] = True
+    if progress['imported']:
+        # New skills change the drive match scores
+        invalidate_responses('student_drives')
+    logger.info(
+        f"Resume import finished: {progress['imported']} imported, "
+        f"{progress['failed']} failed of {progress['total']}"
+    )
+    yield progress
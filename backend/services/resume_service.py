@@ -1,36 +1,102 @@
 import os
+import json
+import hashlib
 import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from flask import jsonify
 from werkzeug.utils import secure_filename
-from models.resume_model import save_resume, get_resume_by_user
-from utils.pdf_parser import extract_text_from_pdf
-from config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from models.resume_model import (
+    save_resume, save_candidate_skills, get_resume_by_user, get_resume_parse, save_resume_parse
+)
+from models.resume_job_model import (
+    create_resume_job, claim_resume_job, update_resume_job_progress,
+    complete_resume_job, fail_resume_job, get_resume_job, requeue_stale_resume_jobs
+)
+from utils.skill_extractor import SkillStream, get_skill_dictionary
+from utils.resume_skills_cache import remember_resume_skills
+from utils.response_cache import invalidate_responses
+from utils.pdf_parser import iter_pdf_pages
+from config import (
+    UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE, RESUME_INGEST_WORKERS, RESUME_JOB_STALE_SECONDS,
+    RESUME_RETAIN_UPLOADS
+)
 
 logger = logging.getLogger(__name__)
 
+# Parses uploaded resumes off the request thread (see process_resume_job)
+_ingest_executor = ThreadPoolExecutor(max_workers=RESUME_INGEST_WORKERS, thread_name_prefix='resume-ingest')
+# Writes retained copies of uploads without holding up the request or the parsing
+_upload_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-store')
+
+class ResumeJobError(Exception):
+    """A resume could not be ingested; the message is shown to the user."""
+    pass
+
 def allowed_file(filename):
     """
     Check if file extension is allowed
     """
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _upload_path(content_hash):
+    # Uploads are stored under their SHA-256, so identical uploads share one file
+    return os.path.join(UPLOAD_FOLDER, f"{content_hash}.pdf")
+
+def _store_upload(filepath, data):
+    """
+    Save uploaded bytes to filepath unless an identical upload already did
+    (runs on _upload_writer)
+    """
+    try:
+        if os.path.exists(filepath):
+            return
+        # Write to a temporary name first so nothing ever reads a partial file
+        with tempfile.NamedTemporaryFile(dir=UPLOAD_FOLDER, suffix='.tmp', delete=False) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, filepath)
+    except Exception as e:
+        logger.error(f"Failed to store upload {filepath}: {str(e)}")
+
+def _remove_uploads(filepaths):
+    for filepath in filepaths:
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Failed to remove upload {filepath}: {str(e)}")
+
+def discard_uploads(filepaths):
+    """
+    Remove retained uploads (e.g. of a deleted student). Runs on
+    _upload_writer, after any pending write of the same files.
+    """
+    if filepaths:
+        _upload_writer.submit(_remove_uploads, list(filepaths))
+
 def upload_and_parse_resume(user_id, file):
     """
-    Handle resume upload, extract text, and save to database
+    Handle resume upload: validate and save the file, then queue it for
+    parsing in the background
     
     Steps:
     1. Validate file type and size
-    2. Save file to upload folder
-    3. Extract text from PDF
-    4. Save resume data to database
-    5. Return resume ID and extracted text
+    2. Create an ingestion job and hand it, with the file's bytes, to the
+       worker threads (the PDF is parsed from memory)
+    3. If RESUME_RETAIN_UPLOADS, save the file to the upload folder in the
+       background, named by the SHA-256 of its contents
+    4. Return the job ID (poll GET /resume/jobs/<id> for the result)
+    
+    A file that was parsed before is not parsed again: its cached text and
+    skills are saved right away and the finished job is returned.
     
     Args:
         user_id: ID of the user uploading resume
         file: File object from request
         
     Returns:
-        JSON response with resume_id and extracted_text
+        JSON response with job_id (202 Accepted), or the finished job (200)
     """
     try:
         # Validate file
@@ -40,15 +106,13 @@ def upload_and_parse_resume(user_id, file):
         if not allowed_file(file.filename):
             return jsonify({'error': 'Only PDF files are allowed'}), 400
         
-        # Check file size
-        file.seek(0, 2)  # Seek to end
-        file_size = file.tell()
-        file.seek(0)  # Reset to start
+        # Check file size (read one byte past the limit to detect larger files)
+        data = file.read(MAX_FILE_SIZE + 1)
         
-        if file_size > MAX_FILE_SIZE:
+        if len(data) > MAX_FILE_SIZE:
             return jsonify({'error': f'File size exceeds {MAX_FILE_SIZE / (1024*1024):.1f}MB limit'}), 413
         
-        if file_size == 0:
+        if len(data) == 0:
             return jsonify({'error': 'File is empty'}), 400
         
         # Secure filename and save file
@@ -56,47 +120,213 @@ def upload_and_parse_resume(user_id, file):
         if not filename:
             return jsonify({'error': 'Invalid filename'}), 400
         
-        filepath = os.path.join(UPLOAD_FOLDER, f"{user_id}_{filename}")
-        file.save(filepath)
+        content_hash = hashlib.sha256(data).hexdigest()
+        filepath = _upload_path(content_hash) if RESUME_RETAIN_UPLOADS else ''
+        if filepath:
+            _upload_writer.submit(_store_upload, filepath, data)
         
-        # Extract text from PDF
         try:
-            extracted_text = extract_text_from_pdf(filepath)
+            job_id = create_resume_job(user_id, filename, filepath, content_hash)
+            cached = get_resume_parse(content_hash) is not None
         except Exception as e:
-            logger.error(f"PDF extraction failed for user {user_id}: {str(e)}")
-            return jsonify({'error': 'Failed to extract text from PDF. Please ensure it is a valid PDF.'}), 400
+            logger.error(f"Failed to queue resume for user {user_id}: {str(e)}")
+            return jsonify({'error': 'Failed to save resume. Please try again.'}), 500
+        
+        if cached:
+            # Seen before: finishing the job only copies the cached parse
+            process_resume_job(job_id)
+            logger.info(f"Resume for user {user_id} matched a cached parse, job_id: {job_id}")
+            return get_resume_job_status(user_id, job_id)
+        
+        _ingest_executor.submit(process_resume_job, job_id, data)
+        logger.info(f"Resume queued for user {user_id}, job_id: {job_id}")
         
-        if not extracted_text or len(extracted_text.strip()) == 0:
-            return jsonify({'error': 'PDF appears to be empty or unreadable'}), 400
+        return jsonify({
+            'message': 'Resume uploaded, processing started',
+            'job_id': job_id,
+            'status': 'queued'
+        }), 202
+    
+    except Exception as e:
+        logger.error(f"Unexpected error uploading resume for user {user_id}: {str(e)}")
+        return jsonify({'error': 'Error processing resume. Please try again.'}), 500
+
+def _parse_resume(job_id, user_id, pdf):
+    """
+    Extract the text and skills of a PDF (a path or the file's bytes).
+    Returns (extracted_text, skills, skills_version); skills is None if
+    their extraction failed.
+    """
+    # Extract text from PDF page by page, feeding the skill extractor as
+    # pages arrive (it stops working once the skills section is complete)
+    update_resume_job_progress(job_id, 'extracting_text', 10)
+    pages = []
+    skill_stream = SkillStream()
+    try:
+        for page_text in iter_pdf_pages(pdf):
+            pages.append(page_text)
+            skill_stream.feed(page_text)
+    except Exception as e:
+        logger.error(f"PDF extraction failed for user {user_id}: {str(e)}")
+        raise ResumeJobError('Failed to extract text from PDF. Please ensure it is a valid PDF.')
+    extracted_text = ''.join(pages).strip()
+    
+    if not extracted_text or len(extracted_text.strip()) == 0:
+        raise ResumeJobError('PDF appears to be empty or unreadable')
+    
+    # Skills are extracted once; they are stored with the resume and reused for every question
+    update_resume_job_progress(job_id, 'extracting_skills', 70)
+    try:
+        dictionary = get_skill_dictionary()
+        return extracted_text, skill_stream.skills(dictionary), dictionary.version
+    except Exception as e:
+        logger.warning(f"Failed to extract skills for user {user_id}: {str(e)}")
+        # Don't fail the upload if skill extraction fails
+        return extracted_text, None, None
+
+def _cached_parse(content_hash):
+    """
+    Return (extracted_text, skills) of an earlier upload of the same bytes,
+    or None. Skills found with an older skill dictionary are extracted again
+    from the cached text.
+    """
+    cached = get_resume_parse(content_hash)
+    if cached is None:
+        return None
+    extracted_text = cached['extracted_text']
+    
+    try:
+        dictionary = get_skill_dictionary()
+    except Exception as e:
+        logger.warning(f"Failed to load skills for cached resume {content_hash}: {str(e)}")
+        return extracted_text, None
+    if cached['skills'] is not None and cached['skills_version'] == dictionary.version:
+        return extracted_text, json.loads(cached['skills'])
+    
+    skill_stream = SkillStream()
+    skill_stream.feed(extracted_text)
+    skills = skill_stream.skills(dictionary)
+    _remember_parse(content_hash, extracted_text, skills, dictionary.version)
+    return extracted_text, skills
+
+def _remember_parse(content_hash, extracted_text, skills, skills_version):
+    try:
+        save_resume_parse(content_hash, extracted_text, skills, skills_version)
+    except Exception as e:
+        # The upload itself succeeded; the next copy is just parsed again
+        logger.warning(f"Failed to cache parsed resume {content_hash}: {str(e)}")
+
+def process_resume_job(job_id, data=None):
+    """
+    Worker side of an upload: extract the text and skills of the PDF (or
+    take them from the parse cache), save the resume and record the outcome
+    on the job. The PDF is parsed from data, its bytes, or else read from
+    the job's retained copy. Returns without doing anything if the job was
+    already claimed.
+    """
+    job = claim_resume_job(job_id)
+    if job is None:
+        return
+    user_id = job['user_id']
+    
+    try:
+        content_hash = job['content_hash']
+        cached = _cached_parse(content_hash) if content_hash else None
+        if cached is not None:
+            extracted_text, skills = cached
+        else:
+            if data is None and not (job['filepath'] and os.path.exists(job['filepath'])):
+                raise ResumeJobError('The upload was interrupted. Please upload the file again.')
+            pdf = data if data is not None else job['filepath']
+            extracted_text, skills, skills_version = _parse_resume(job_id, user_id, pdf)
+            if content_hash:
+                _remember_parse(content_hash, extracted_text, skills, skills_version)
         
         # Save to database
+        update_resume_job_progress(job_id, 'saving', 90)
         try:
-            resume_id = save_resume(user_id, filename, extracted_text)
+            resume_id = save_resume(user_id, job['filename'], extracted_text, skills=skills)
         except Exception as e:
             logger.error(f"Failed to save resume for user {user_id}: {str(e)}")
-            return jsonify({'error': 'Failed to save resume. Please try again.'}), 500
+            raise ResumeJobError('Failed to save resume. Please try again.')
         
-        # Extract and Save Skills
-        try:
-            from utils.skill_extractor import extract_skills_from_text
-            from models.resume_model import save_candidate_skills
-            
-            skills = extract_skills_from_text(extracted_text)
+        if skills is not None:
+            remember_resume_skills(resume_id, skills)
             if skills:
                 save_candidate_skills(user_id, skills)
-        except Exception as e:
-            logger.warning(f"Failed to extract skills for user {user_id}: {str(e)}")
-            # Don't fail the upload if skill extraction fails
+                # New skills change the drive match scores
+                invalidate_responses('student_drives', user_id)
+        
+        complete_resume_job(job_id, resume_id, skills)
+        logger.info(f"Resume processed for user {user_id}, job_id: {job_id}, resume_id: {resume_id}")
+    
+    except ResumeJobError as e:
+        fail_resume_job(job_id, str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error processing resume job {job_id}: {str(e)}")
+        fail_resume_job(job_id, 'Error processing resume. Please try again.')
+
+def get_resume_job_status(user_id, job_id):
+    """
+    Report an ingestion job's progress; once done it carries the resume ID,
+    the skills found and a preview of the extracted text
+    
+    Args:
+        user_id: ID of the user asking (must own the job)
+        job_id: ID of the job
         
-        logger.info(f"Resume uploaded successfully for user {user_id}, resume_id: {resume_id}")
+    Returns:
+        JSON response with the job status
+    """
+    try:
+        job = get_resume_job(job_id, RESUME_JOB_STALE_SECONDS)
+        if not job or job['user_id'] != user_id:
+            return jsonify({'error': 'Job not found'}), 404
         
-        return jsonify({
-            'message': 'Resume uploaded successfully',
-            'resume_id': resume_id,
-            'skills_found': skills if 'skills' in locals() else [],
-            'extracted_text': extracted_text[:500] + '...' if len(extracted_text) > 500 else extracted_text
-        }), 200
+        if job['status'] in ('queued', 'processing') and job['stale']:
+            # The worker that had it went away (e.g. its process was restarted)
+            resume_pending_jobs()
+            job = get_resume_job(job_id, RESUME_JOB_STALE_SECONDS)
+        
+        response = {
+            'job_id': job['id'],
+            'status': job['status'],
+            'stage': job['stage'],
+            'progress': job['progress'],
+            'resume_id': job['resume_id'],
+            'skills_found': json.loads(job['skills']) if job['skills'] else [],
+            'error': job['error']
+        }
+        if job['status'] == 'done':
+            extracted_text = job['extracted_text'] or ''
+            response['extracted_text'] = extracted_text[:500] + '...' if len(extracted_text) > 500 else extracted_text
+        return jsonify(response), 200
     
     except Exception as e:
-        logger.error(f"Unexpected error uploading resume for user {user_id}: {str(e)}")
-        return jsonify({'error': 'Error processing resume. Please try again.'}), 500
+        logger.error(f"Error reading resume job {job_id}: {str(e)}")
+        return jsonify({'error': 'Error reading job status. Please try again.'}), 500
+
+def resume_pending_jobs():
+    """
+    Queue again the jobs left unfinished by a worker that went away (called
+    at startup, and when a poll finds a stale job). Claiming is atomic, so
+    several workers may safely do this.
+    Only jobs with a retained copy of their upload can be finished; the
+    others are failed once stale (until then, the process that accepted the
+    upload may still be parsing it from memory).
+    """
+    try:
+        jobs = requeue_stale_resume_jobs(RESUME_JOB_STALE_SECONDS)
+    except Exception as e:
+        # Table not migrated yet
+        logger.warning(f"Could not check for pending resume jobs: {e}")
+        return
+    requeued = 0
+    for job in jobs:
+        if job['filepath'] and os.path.exists(job['filepath']):
+            _ingest_executor.submit(process_resume_job, job['id'])
+            requeued += 1
+        elif job['stale']:
+            fail_resume_job(job['id'], 'The upload was interrupted. Please upload the file again.')
+    if requeued:
+        logger.info(f"Requeued {requeued} pending resume jobs")
@@ -0,0 +1,98 @@
+import os
+import logging
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from config import EVALUATION_PLAN_CACHE_SIZE, QUESTIONS_VERSION_PATH
+from models.question_model import get_question_by_id
+from utils.evaluator import build_evaluation_plan, question_content_hash
+
+logger = logging.getLogger(__name__)
+
+# LRU of evaluation plans keyed by (question_id, content_hash), plus an index
+# from question id to its current content hash. The index is what lets a submit
+# skip the database entirely; it is dropped whenever the questions version
+# marker changes, while plans whose content did not change are reused.
+_plans = OrderedDict()
+_current_hash = {}
+_seen_version = None
+_lock = threading.Lock()
+
+
+def questions_version():
+    """Current contents of the shared questions version marker ('' if missing)."""
+    try:
+        with open(QUESTIONS_VERSION_PATH) as f:
+            return f.read()
+    except OSError:
+        return ''
+
+
+def mark_questions_changed(question_id=None):
+    """
+    Invalidate cached plans and the question index after a question is
+    added, edited or deleted. Touches the shared version marker so other
+    worker processes (and the manage_questions.py CLI) invalidate their
+    caches too.
+    """
+    # Imported here: utils.question_index reads the marker through this module
+    from utils.question_index import invalidate_question_index
+    try:
+        # Write to a temporary name first so no reader ever sees an empty marker
+        with tempfile.NamedTemporaryFile(
+            'w', dir=os.path.dirname(QUESTIONS_VERSION_PATH), suffix='.tmp', delete=False
+        ) as tmp:
+            tmp.write(uuid.uuid4().hex)
+        os.replace(tmp.name, QUESTIONS_VERSION_PATH)
+    except OSError as e:
+        logger.warning(f"Could not touch questions version marker: {e}")
+
+    invalidate_question_index()
+    with _lock:
+        if question_id is None:
+            _current_hash.clear()
+        else:
+            _current_hash.pop(question_id, None)
+
+
+def get_evaluation_plan(question_id):
+    """
+    Return the evaluation plan for a question, or None if it does not exist.
+    """
+    global _seen_version
+
+    version = questions_version()
+    with _lock:
+        if version != _seen_version:
+            _current_hash.clear()
+            _seen_version = version
+
+        content_hash = _current_hash.get(question_id)
+        if content_hash is not None:
+            plan = _plans.get((question_id, content_hash))
+            if plan is not None:
+                _plans.move_to_end((question_id, content_hash))
+                return plan
+
+    question = get_question_by_id(question_id)
+    if not question:
+        return None
+
+    q_dict = dict(question)
+    key = (question_id, question_content_hash(q_dict))
+    with _lock:
+        plan = _plans.get(key)
+    if plan is None:
+        plan = build_evaluation_plan(q_dict)
+
+    with _lock:
+        _plans[key] = plan
+        _plans.move_to_end(key)
+        _current_hash[question_id] = key[1]
+        while len(_plans) > EVALUATION_PLAN_CACHE_SIZE:
+            old_key, _ = _plans.popitem(last=False)
+            if _current_hash.get(old_key[0]) == old_key[1]:
+                del _current_hash[old_key[0]]
+
+    return plan
@@ -1,8 +1,18 @@
 import re
 import json
+import hashlib
+import time
 import logging
 import traceback
 import random
+from functools import lru_cache
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    SANDBOX_TIMEOUT, CODING_TEST_TIMEOUT, CODING_TIME_BUDGET,
+    CODING_PARALLEL_JOBS, CODING_MIN_CASES_PER_JOB
+)
+from utils.sandbox import run_in_sandbox, SandboxError, SandboxCancelled
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +164,61 @@ def evaluate_output_answer(user_answer: str, expected_keywords: str) -> dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# EVALUATION PLAN — a question pre-parsed into everything grading needs
+# ---------------------------------------------------------------------------
+PLAN_FIELDS = ('question_type', 'expected_keywords', 'test_cases', 'answer_variants')
+
+
+def question_content_hash(question):
+    """Stable hash of the question fields that affect grading."""
+    payload = json.dumps([question.get(f) for f in PLAN_FIELDS], default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def build_evaluation_plan(question):
+    """
+    Parse a question (dict with the PLAN_FIELDS columns) once into a plan:
+    answer variants with their compiled keyword matchers and decoded test cases.
+    """
+    question_type = question.get('question_type') or 'text'
+    expected_keywords = question.get('expected_keywords')
+
+    # Test cases stay as the raw string when they are not valid JSON so the
+    # coding evaluator can report the format error itself.
+    test_cases = question.get('test_cases')
+    if test_cases:
+        try:
+            test_cases = json.loads(test_cases)
+        except (json.JSONDecodeError, TypeError):
+            pass
+
+    variants = []
+    answer_variants_json = question.get('answer_variants')
+    if answer_variants_json:
+        try:
+            parsed = json.loads(answer_variants_json)
+            if isinstance(parsed, list):
+                variants = parsed
+        except json.JSONDecodeError:
+            pass
+
+    if not variants:
+        variants = [{"variant_name": "Standard", "keywords": expected_keywords}]
+
+    return {
+        'question_id': question.get('id'),
+        'content_hash': question_content_hash(question),
+        'question_type': question_type,
+        'expected_keywords': expected_keywords,
+        'test_cases': test_cases,
+        'variants': [
+            (v.get('variant_name', 'Standard'), get_keyword_matcher(v.get('keywords', '')))
+            for v in variants
+        ],
+    }
+
+
 # ---------------------------------------------------------------------------
 # MAIN ENTRY POINT
 # ---------------------------------------------------------------------------
@@ -163,6 +228,20 @@ def evaluate_answer(user_answer, expected_keywords, question_type='text',
     Evaluate user's answer using Strict Technical Interview Standards.
     Routes to specialised evaluators by question_type.
     """
+    plan = build_evaluation_plan({
+        'question_type': question_type,
+        'expected_keywords': expected_keywords,
+        'test_cases': test_cases_json,
+        'answer_variants': answer_variants_json,
+    })
+    return evaluate_answer_with_plan(user_answer, plan)
+
+
+def evaluate_answer_with_plan(user_answer, plan):
+    """
+    Evaluate user's answer against a pre-built evaluation plan
+    (see build_evaluation_plan / utils.evaluation_cache).
+    """
     if not user_answer or not user_answer.strip():
         return {
             'score': 0,
@@ -173,30 +252,16 @@ def evaluate_answer(user_answer, expected_keywords, question_type='text',
             'communication_score': 0
         }
 
-    if question_type == 'coding':
-        return evaluate_coding_answer(user_answer, test_cases_json)
+    if plan['question_type'] == 'coding':
+        return evaluate_coding_answer(user_answer, plan['test_cases'])
 
-    if question_type == 'output':
-        return evaluate_output_answer(user_answer, expected_keywords or '')
+    if plan['question_type'] == 'output':
+        return evaluate_output_answer(user_answer, plan['expected_keywords'] or '')
 
     # === TEXT / LOGIC QUESTIONS ===
-    variants = []
-    if answer_variants_json:
-        try:
-            parsed = json.loads(answer_variants_json)
-            if isinstance(parsed, list):
-                variants = parsed
-        except json.JSONDecodeError:
-            pass
-
-    if not variants:
-        variants = [{"variant_name": "Standard", "keywords": expected_keywords}]
-
     best_result = None
-    for variant in variants:
-        v_keywords = variant.get('keywords', '')
-        v_name = variant.get('variant_name', 'Standard')
-        result = _evaluate_text_variant(user_answer, v_keywords)
+    for v_name, matcher in plan['variants']:
+        result = _evaluate_text_variant(user_answer, matcher)
         result['variant_name'] = v_name
         if best_result is None or result['score'] > best_result['score']:
             best_result = result
@@ -204,55 +269,141 @@ def evaluate_answer(user_answer, expected_keywords, question_type='text',
     return best_result
 
 
+def evaluate_answers_batch(submissions):
+    """
+    Evaluate many answers in one call.
+    submissions: iterable of (user_answer, plan) pairs.
+    Returns the evaluations in the same order.
+    """
+    return [evaluate_answer_with_plan(user_answer, plan) for user_answer, plan in submissions]
+
+
+# ---------------------------------------------------------------------------
+# KEYWORD MATCHER — compiled once per keyword set, one scan per answer
+# ---------------------------------------------------------------------------
+def _norm_term(text):
+    return re.sub(r'[-_]', ' ', text.lower())
+
+
+def _parse_keywords(expected_keywords):
+    if not expected_keywords:
+        return []
+    if isinstance(expected_keywords, (list, tuple)):
+        return [str(k).strip().lower() for k in expected_keywords]
+    return [kw.strip().lower() for kw in str(expected_keywords).split(',') if kw.strip()]
+
+
+class KeywordMatcher:
+    """
+    Pre-compiled matcher for one set of expected keywords.
+
+    All keywords and their synonyms are normalised up front and folded into a
+    single alternation regex. Terms shorter than 4 characters must match on
+    word boundaries; longer terms match as plain substrings.
+    """
+
+    def __init__(self, expected_keywords):
+        self.db_keywords = _parse_keywords(expected_keywords)
+
+        # Expand keywords with synonyms
+        expanded = set(self.db_keywords)
+        for kw in self.db_keywords:
+            if kw in SYNONYMS:
+                expanded.update(SYNONYMS[kw])
+        self.critical_keywords = list(expanded)
+
+        # Every raw form (keyword or synonym) maps to its normalised term
+        self._term_of = {kw: _norm_term(kw) for kw in self.critical_keywords}
+        self._forms = {
+            kw: {self._term_of[f] for f in [kw] + SYNONYMS.get(kw, [])}
+            for kw in self.db_keywords
+        }
+
+        terms = {t for t in self._term_of.values() if t}
+        self._empty_term = '' in self._term_of.values()
+        self._bounded = {
+            t: re.compile(r'\b' + re.escape(t) + r'\b') for t in terms if len(t) < 4
+        }
+        # A term hidden behind a longer term starting at the same position is
+        # still present there, so remember which terms are prefixes of which.
+        self._prefixes = {
+            t: [p for p in terms if p != t and t.startswith(p)] for t in terms
+        }
+        if terms:
+            alternation = '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+            self._scanner = re.compile(r'(?=(' + alternation + r'))')
+        else:
+            self._scanner = None
+
+    def found_terms(self, answer_norm):
+        """Return the set of normalised terms present in the normalised answer."""
+        found = set()
+        if self._empty_term and re.search(r'\b', answer_norm):
+            # An empty keyword is "short": it matches wherever there is a word boundary
+            found.add('')
+        if self._scanner is None:
+            return found
+        for m in self._scanner.finditer(answer_norm):
+            pos = m.start()
+            for term in [m.group(1)] + self._prefixes[m.group(1)]:
+                if term in found:
+                    continue
+                bounded = self._bounded.get(term)
+                if bounded is None or bounded.match(answer_norm, pos):
+                    found.add(term)
+        return found
+
+    def match(self, answer_norm):
+        """
+        Returns (matched_critical, covered_original) for a normalised answer:
+        every keyword/synonym found, and every original keyword covered by
+        itself or one of its synonyms.
+        """
+        found = self.found_terms(answer_norm)
+        matched_critical = [kw for kw in self.critical_keywords if self._term_of[kw] in found]
+        covered_original = [kw for kw in self.db_keywords if self._forms[kw] & found]
+        return matched_critical, covered_original
+
+
+@lru_cache(maxsize=4096)
+def _compile_keyword_matcher(keywords_key):
+    return KeywordMatcher(keywords_key)
+
+
+def get_keyword_matcher(expected_keywords):
+    """Return the cached KeywordMatcher for a keyword string or list."""
+    if isinstance(expected_keywords, list):
+        expected_keywords = tuple(expected_keywords)
+    try:
+        return _compile_keyword_matcher(expected_keywords)
+    except TypeError:
+        # Unhashable keyword payload (e.g. nested lists) - build without caching
+        return KeywordMatcher(expected_keywords)
+
+
 # ---------------------------------------------------------------------------
 # CORE TEXT / LOGIC EVALUATOR — Semantic Matching & Pillar Scoring
 # ---------------------------------------------------------------------------
 def _evaluate_text_variant(user_answer, expected_keywords):
     answer_lower = user_answer.lower()
 
-    # Parse keywords
-    if expected_keywords:
-        if isinstance(expected_keywords, list):
-            db_keywords = [str(k).strip().lower() for k in expected_keywords]
-        else:
-            db_keywords = [kw.strip().lower() for kw in str(expected_keywords).split(',') if kw.strip()]
+    # Keyword parsing, synonym expansion and pattern building are done once per
+    # keyword set and cached; scoring an answer is a single scan of the text.
+    if isinstance(expected_keywords, KeywordMatcher):
+        matcher = expected_keywords
     else:
-        db_keywords = []
-
-    # Expand keywords with synonyms
-    expanded = set(db_keywords)
-    for kw in db_keywords:
-        if kw in SYNONYMS:
-            expanded.update(SYNONYMS[kw])
-    critical_keywords = list(expanded)
+        matcher = get_keyword_matcher(expected_keywords)
+    db_keywords = matcher.db_keywords
 
     # -----------------------------------------------------------------------
     # MATCHING — Concept-Based Semantic Checking
     # -----------------------------------------------------------------------
-    def _norm(text):
-        return re.sub(r'[-_]', ' ', text.lower())
-
-    answer_norm = _norm(answer_lower)
-
-    def has_term(text_norm, term):
-        term_norm = _norm(term)
-        if len(term_norm) < 4:
-            return bool(re.search(r'\b' + re.escape(term_norm) + r'\b', text_norm))
-        return term_norm in text_norm
-
-    matched_critical = [kw for kw in critical_keywords if has_term(answer_norm, kw)]
+    matched_critical, covered_original = matcher.match(_norm_term(answer_lower))
 
     # -----------------------------------------------------------------------
     # PILLAR 1: TECHNICAL SCORE (Accuracy + Depth)
     # -----------------------------------------------------------------------
     target_count = max(len(db_keywords), 1)
-    covered_original = []
-    
-    for orig_kw in db_keywords:
-        synonyms_for_kw = SYNONYMS.get(orig_kw, [])
-        all_forms = [orig_kw] + synonyms_for_kw
-        if any(has_term(answer_norm, f) for f in all_forms):
-            covered_original.append(orig_kw)
 
     match_ratio = min(len(covered_original) / target_count, 1.2)
     accuracy_score = min(match_ratio * 7.0, 7.0)
@@ -324,9 +475,131 @@ def _evaluate_text_variant(user_answer, expected_keywords):
 
 
 # ---------------------------------------------------------------------------
-# CODING EVALUATOR (unchanged logic, improved feedback)
+# CODING EVALUATOR (runs the answer in the code sandbox, improved feedback)
 # ---------------------------------------------------------------------------
+def _load_test_cases(test_cases_json):
+    """Decode test cases, passing through ones already parsed by an evaluation plan."""
+    if not isinstance(test_cases_json, str):
+        return test_cases_json
+    return json.loads(test_cases_json)
+
+
+def _coding_runtime_error(message):
+    return {
+        'score': 0,
+        'feedback': f"**Verdict: No**\n\n**Runtime Error:** {message}",
+        'matched_keywords': [],
+        'total_keywords': 0,
+        'technical_score': 0,
+        'communication_score': 0
+    }
+
+
+def _coding_grading_unavailable(message):
+    """
+    The sandbox could not run the answer (all runners busy, or a runner
+    failed). The answer is still saved, scored 0, so one busy moment never
+    loses it or fails the rest of a batch.
+    """
+    return {
+        'score': 0,
+        'feedback': f"**Verdict: Not graded**\n\n**Grading unavailable:** {message}\nPlease retry this question.",
+        'matched_keywords': [],
+        'total_keywords': 0,
+        'technical_score': 0,
+        'communication_score': 0,
+        'grading_error': True
+    }
+
+
+def _run_test_cases(user_answer, inputs):
+    """
+    Run the answer on every test input in the sandbox.
+
+    Inputs are split into chunks that run concurrently on separate sandbox
+    workers against one shared deadline, CODING_TIME_BUDGET seconds after
+    grading starts (each chunk gets the time left when it starts). Inside a
+    chunk the first timed-out case stops the rest; a timeout in any chunk
+    also cancels the other chunks, stopping their sandbox workers, and their
+    cases are reported as skipped.
+
+    Returns (run, job_timeout) where run has the shape of a single sandbox run
+    whose payload holds one case result per input, in order.
+    Raises SandboxError when the sandbox cannot run the answer.
+    """
+    budget = min(CODING_TEST_TIMEOUT * len(inputs), CODING_TIME_BUDGET)
+    job_timeout = SANDBOX_TIMEOUT + budget
+    deadline = time.monotonic() + budget
+    chunk_count = max(1, min(CODING_PARALLEL_JOBS, len(inputs) // CODING_MIN_CASES_PER_JOB))
+    chunk_size = -(-len(inputs) // chunk_count) if inputs else 0
+    chunks = [inputs[i:i + chunk_size] for i in range(0, len(inputs), chunk_size)] if inputs else [[]]
+    aborted = threading.Event()
+
+    def run_chunk(chunk):
+        if aborted.is_set():
+            return None
+        try:
+            run = run_in_sandbox(
+                user_answer,
+                job_timeout,
+                cancel=aborted if len(chunks) > 1 else None,
+                mode='grade',
+                inputs=chunk,
+                case_timeout=CODING_TEST_TIMEOUT,
+                # Never 0: the sandbox reads a falsy budget as unlimited
+                budget=max(deadline - time.monotonic(), 0.001) if budget else budget,
+                stop_on_timeout=True
+            )
+        except SandboxCancelled:
+            return None
+        except SandboxError:
+            # The answer cannot be graded; stop the other chunks too
+            aborted.set()
+            raise
+        cases = (run.get('result') or {}).get('cases') or []
+        if run.get('timed_out') or any(case['status'] == 'timeout' for case in cases):
+            aborted.set()
+        return run
+
+    if len(chunks) == 1:
+        runs = [run_chunk(chunks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            runs = list(executor.map(run_chunk, chunks))
+
+    # Any chunk that failed outright decides the result, as a single run would
+    for run in runs:
+        if run is not None and (run.get('timed_out') or 'result' not in run
+                                or 'exec_error' in run['result']):
+            return run, job_timeout
+
+    first = next(run for run in runs if run is not None)
+    cases = []
+    for chunk, run in zip(chunks, runs):
+        if run is None:
+            cases.extend({'status': 'skipped', 'reason': 'aborted', 'ms': 0} for _ in chunk)
+        elif run['result']['cases'] is None:
+            # Script-style answer: no function to call
+            cases = None
+            break
+        else:
+            cases.extend(run['result']['cases'])
+
+    return {
+        'timed_out': False,
+        'error': first.get('error', ''),
+        'result': {'script_output': first['result'].get('script_output', ''), 'cases': cases}
+    }, job_timeout
+
+
 def evaluate_coding_answer(user_answer, test_cases_json):
+    """
+    Grade a coding answer. The code is executed in the sandbox (see
+    utils/sandbox.py), never inside the web process: the sandbox loads it,
+    calls the last function it defines on every test input with a per-test
+    timeout, and reports back the results, which are compared here.
+    Per-test status and timing are returned under 'test_results'.
+    """
     syntax_score = 0
     execution_score = 0
     feedback_lines = []
@@ -346,92 +619,94 @@ def evaluate_coding_answer(user_answer, test_cases_json):
 
     passed_tests = 0
     total_tests = 0
-    local_scope = {}
-    
-    import sys
-    from io import StringIO
+    test_results = []
+
+    test_cases = None
+    if test_cases_json:
+        try:
+            test_cases = _load_test_cases(test_cases_json)
+            if not isinstance(test_cases, list):
+                test_cases = None
+        except json.JSONDecodeError:
+            test_cases = None
 
     try:
-        # Capture stdout for script-style answers
-        old_stdout = sys.stdout
-        redirected_output = sys.stdout = StringIO()
-        
-        exec(user_answer, {}, local_scope)
-        
-        sys.stdout = old_stdout
-        script_output = redirected_output.getvalue().strip()
-        
-        defined_callables = [
-            (name, func) for name, func in local_scope.items()
-            if callable(func) and func.__module__ is None
-        ]
-
-        if not defined_callables:
-            # Fallback for script-style answers (no function defined)
-            if test_cases_json:
-                try:
-                    test_cases = json.loads(test_cases_json)
-                    total_tests = len(test_cases)
-                    
-                    # For script style, we can only reasonably test the first case's output 
-                    # since we can't pass different inputs to a raw script easily
-                    if total_tests > 0:
-                        exp = test_cases[0]['output']
-                        # Check if the script's printed output contains or matches the expected output
-                        if str(exp) in script_output or script_output == str(exp):
-                            passed_tests = total_tests # Award full if the logic printed the right thing
-                        else:
-                            feedback_lines.append(f"Script Output Failed: Got '{script_output}', Expected '{exp}'")
-                except json.JSONDecodeError:
-                    feedback_lines.append("System Error: Invalid test case format.")
-            else:
-                 feedback_lines.append("No automated tests. Syntax passed.")
-                 execution_score = 10
-                 
-            # Note: We continue to scoring below, we don't return early anymore
-            target_func = None
-        else:
-            target_func = defined_callables[-1][1]
+        inputs = [case['input'] for case in test_cases] if test_cases else []
+        expected = [case['output'] for case in test_cases] if test_cases else []
+    except (KeyError, TypeError) as e:
+        return _coding_runtime_error(str(e))
 
-        if target_func and test_cases_json:
-            try:
-                test_cases = json.loads(test_cases_json)
+    case_timeout = CODING_TEST_TIMEOUT
+    try:
+        run, job_timeout = _run_test_cases(user_answer, inputs)
+    except SandboxError as e:
+        logger.warning(f"Coding answer could not be graded: {e}")
+        return _coding_grading_unavailable(str(e))
+    payload = run.get('result')
+
+    if run.get('timed_out'):
+        return _coding_runtime_error(f"Execution timed out (Limit: {job_timeout:g} seconds).")
+    if payload is None:
+        # The answer never reached the test harness (e.g. sys.exit() or a crash)
+        error_lines = [line for line in run.get('error', '').strip().splitlines() if line.strip()]
+        return _coding_runtime_error(error_lines[-1] if error_lines else "Execution failed.")
+    if 'exec_error' in payload:
+        return _coding_runtime_error(payload['exec_error'])
+
+    script_output = payload.get('script_output', '')
+    cases = payload.get('cases')
+
+    if cases is None:
+        # Fallback for script-style answers (no function defined)
+        if test_cases_json:
+            if test_cases is None:
+                feedback_lines.append("System Error: Invalid test case format.")
+            else:
                 total_tests = len(test_cases)
 
-                for i, case in enumerate(test_cases):
-                    inp = case['input']
-                    exp = case['output']
-                    try:
-                        if isinstance(inp, list):
-                            res = target_func(*inp)
-                        else:
-                            res = target_func(inp)
-
-                        if str(res) == str(exp):
-                            passed_tests += 1
-                        else:
-                            feedback_lines.append(f"Test {i+1} Failed: Got {res}, Expected {exp}")
-                    except Exception as e:
-                        feedback_lines.append(f"Test {i+1} Runtime Error: {str(e)}")
-
-            except json.JSONDecodeError:
-                feedback_lines.append("System Error: Invalid test case format.")
-        elif target_func:
+                # For script style, we can only reasonably test the first case's output
+                # since we can't pass different inputs to a raw script easily
+                if total_tests > 0:
+                    exp = expected[0]
+                    # Check if the script's printed output contains or matches the expected output
+                    if str(exp) in script_output or script_output == str(exp):
+                        passed_tests = total_tests # Award full if the logic printed the right thing
+                    else:
+                        feedback_lines.append(f"Script Output Failed: Got '{script_output}', Expected '{exp}'")
+        else:
             feedback_lines.append("No automated tests. Syntax passed.")
             execution_score = 10
-            
-        if total_tests > 0:
-            execution_score = (passed_tests / total_tests) * 10
+    elif test_cases_json:
+        if test_cases is None:
+            feedback_lines.append("System Error: Invalid test case format.")
+        else:
+            total_tests = len(test_cases)
+
+            for i, (exp, result) in enumerate(zip(expected, cases)):
+                status = result['status']
+                if status == 'ok':
+                    if not result.get('truncated') and result['value'] == str(exp):
+                        passed_tests += 1
+                        status = 'passed'
+                    else:
+                        feedback_lines.append(f"Test {i+1} Failed: Got {result['value']}, Expected {exp}")
+                        status = 'failed'
+                elif status == 'timeout':
+                    feedback_lines.append(f"Test {i+1} Timed Out: exceeded {case_timeout} seconds")
+                elif status == 'skipped':
+                    if result.get('reason') == 'budget':
+                        feedback_lines.append(f"Test {i+1} Skipped: total time budget of {CODING_TIME_BUDGET:g} seconds used up")
+                    else:
+                        feedback_lines.append(f"Test {i+1} Skipped: an earlier test timed out")
+                else:
+                    feedback_lines.append(f"Test {i+1} Runtime Error: {result.get('error', '')}")
+                test_results.append({'test': i + 1, 'status': status, 'ms': result.get('ms', 0)})
+    else:
+        feedback_lines.append("No automated tests. Syntax passed.")
+        execution_score = 10
 
-    except Exception as e:
-        return {
-            'score': 0,
-            'feedback': f"**Verdict: No**\n\n**Runtime Error:** {str(e)}",
-            'matched_keywords': [],
-            'total_keywords': 0,
-            'technical_score': 0,
-            'communication_score': 0
-        }
+    if total_tests > 0:
+        execution_score = (passed_tests / total_tests) * 10
 
     if total_tests > 0:
         final_score = (syntax_score * 0.3) + (execution_score * 0.7)
@@ -447,10 +722,21 @@ def evaluate_coding_answer(user_answer, test_cases_json):
     elif final_score >= 7: verdict = "Leaning Yes"
     elif final_score >= 5: verdict = "Borderline"
 
+    timing_section = ""
+    timed = [t for t in test_results if t['status'] != 'skipped']
+    if timed:
+        slowest = max(timed, key=lambda t: t['ms'])
+        timing_section = (
+            f"Execution Time:\n"
+            f"- {round(sum(t['ms'] for t in timed), 2)} ms across {len(timed)} tests "
+            f"(slowest: Test {slowest['test']} at {slowest['ms']} ms)\n\n"
+        )
+
     formatted_feedback = (
         f"Overall Verdict: {verdict}\n\n"
         f"Code Output:\n"
         f"{chr(10).join(['- ' + line for line in feedback_lines]) if feedback_lines else '- All tests passed.'}\n\n"
+        f"{timing_section}"
         f"**Score Breakdown:**\n"
         f"- Technical (Correctness): {technical_score}/10\n"
         f"- Communication (Syntax/Style): {communication_score}/10"
@@ -462,7 +748,8 @@ def evaluate_coding_answer(user_answer, test_cases_json):
         'matched_keywords': [],
         'total_keywords': 0,
         'technical_score': technical_score,
-        'communication_score': communication_score
+        'communication_score': communication_score,
+        'test_results': test_results
     }
 
 
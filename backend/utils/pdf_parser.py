@@ -1,28 +1,71 @@
+import io
+import time
+import logging
 import PyPDF2
+from config import PDF_MAX_PAGES, PDF_MAX_CHARS, PDF_PAGE_TIMEOUT
 
-def extract_text_from_pdf(pdf_path):
+logger = logging.getLogger(__name__)
+
+def iter_pdf_pages(pdf_path, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS, page_timeout=PDF_PAGE_TIMEOUT):
     """
-    Extract text content from a PDF file
-    
+    Yield the text of a PDF one page at a time, stopping at the first limit
+    reached
+
     Args:
-        pdf_path: Path to the PDF file
-        
-    Returns:
-        Extracted text as a string
+        pdf_path: Path to the PDF file, or its contents as bytes (parsed in
+            memory without touching the disk)
+        max_pages: Most pages read
+        max_chars: Most characters yielded in total (the last page is cut)
+        page_timeout: Seconds one page may take. A page cannot be interrupted
+            while PyPDF2 is extracting it, so a slower page ends the
+            extraction after it.
+
+    Yields:
+        Text of each page
     """
+    data = pdf_path if isinstance(pdf_path, (bytes, bytearray, memoryview)) else None
+    if data is not None:
+        pdf_path = '<upload>'
     try:
-        text = ""
-        
-        # Open PDF file in binary read mode
-        with open(pdf_path, 'rb') as file:
+        # Open PDF file in binary read mode, or wrap the bytes (BytesIO shares
+        # a bytes object rather than copying it)
+        with (io.BytesIO(data) if data is not None else open(pdf_path, 'rb')) as file:
             # Create PDF reader object
             pdf_reader = PyPDF2.PdfReader(file)
-            
-            # Extract text from each page
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        
-        return text.strip()
-    
+
+            remaining = max_chars
+            for page_number, page in enumerate(pdf_reader.pages):
+                if page_number >= max_pages:
+                    logger.info(f"Stopped reading {pdf_path} at the {max_pages} page limit")
+                    return
+
+                started = time.monotonic()
+                text = page.extract_text() or ''
+                elapsed = time.monotonic() - started
+
+                if len(text) >= remaining:
+                    yield text[:remaining]
+                    logger.info(f"Stopped reading {pdf_path} at the {max_chars} character limit")
+                    return
+                remaining -= len(text)
+                yield text
+
+                if elapsed > page_timeout:
+                    logger.warning(f"Stopped reading {pdf_path}: page {page_number + 1} took {elapsed:.1f}s")
+                    return
+
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+def extract_text_from_pdf(pdf_path, **limits):
+    """
+    Extract text content from a PDF file
+
+    Args:
+        pdf_path: Path to the PDF file, or its contents as bytes
+        limits: max_pages / max_chars / page_timeout, see iter_pdf_pages
+
+    Returns:
+        Extracted text as a string
+    """
+    return ''.join(iter_pdf_pages(pdf_path, **limits)).strip()
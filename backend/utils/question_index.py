@@ -0,0 +1,174 @@
+import bisect
+import random
+import logging
+import time
+import threading
+from collections import OrderedDict
+from config import QUESTION_POOL_CACHE_SIZE, QUESTION_INDEX_CHECK_INTERVAL
+from models.question_model import get_question_index_rows, get_questions_fingerprint
+from utils.evaluation_cache import questions_version
+
+logger = logging.getLogger(__name__)
+
+# Random picks rejected (already excluded or taken) before falling back to
+# scanning the remaining candidates of a nearly exhausted pool
+MAX_REJECTIONS_PER_PICK = 16
+
+
+def question_filter(skills=None, difficulty=None, topic=None, runnable_only=False, require_skill=True):
+    """
+    Describe one set of questions to sample from. Pass a tuple of filters to
+    sample() to take their union (e.g. "Behavioral topic OR Easy").
+
+    skills: iterable of skill names, or None for any skill
+    require_skill: when False, questions whose skill row is missing also match
+    runnable_only: skip coding questions without usable test cases
+    """
+    return (
+        frozenset(skills) if skills is not None else None,
+        difficulty,
+        topic,
+        runnable_only,
+        require_skill,
+    )
+
+
+class QuestionIndex:
+    """
+    In-memory index of question ids, partitioned by
+    (skill_name, difficulty, question_type, topic, runnable).
+
+    Sampling picks a uniform random position across the matching partitions
+    and rejects ids in the exclusion set, so a pick costs O(1) expected time
+    instead of an ORDER BY RANDOM() sort of every candidate row.
+    """
+
+    def __init__(self, rows):
+        partitions = {}
+        for row in rows:
+            key = (row['skill_name'], row['difficulty'], row['question_type'], row['topic'], bool(row['runnable']))
+            partitions.setdefault(key, []).append(row['id'])
+        self._partitions = {key: tuple(ids) for key, ids in partitions.items()}
+        self.size = len(rows)
+
+        # filter tuple -> (matching partitions, cumulative sizes)
+        self._pools = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _matches(key, flt):
+        skill_name, difficulty, _question_type, topic, runnable = key
+        skills, want_difficulty, want_topic, runnable_only, require_skill = flt
+        if require_skill and skill_name is None:
+            return False
+        if skills is not None and skill_name not in skills:
+            return False
+        if want_difficulty is not None and difficulty != want_difficulty:
+            return False
+        if want_topic is not None and topic != want_topic:
+            return False
+        if runnable_only and not runnable:
+            return False
+        return True
+
+    def _pool(self, filters):
+        with self._lock:
+            pool = self._pools.get(filters)
+            if pool is not None:
+                self._pools.move_to_end(filters)
+                return pool
+
+        parts = [
+            ids for key, ids in self._partitions.items()
+            if any(self._matches(key, flt) for flt in filters)
+        ]
+        cumulative = []
+        total = 0
+        for ids in parts:
+            total += len(ids)
+            cumulative.append(total)
+        pool = (parts, cumulative)
+
+        with self._lock:
+            self._pools[filters] = pool
+            while len(self._pools) > QUESTION_POOL_CACHE_SIZE:
+                self._pools.popitem(last=False)
+        return pool
+
+    def count(self, filters):
+        _, cumulative = self._pool(filters)
+        return cumulative[-1] if cumulative else 0
+
+    def sample(self, filters, k=1, exclude=()):
+        """
+        Up to k distinct question ids drawn uniformly from the union of
+        filters, never returning an id in exclude (any container supporting
+        `in`). Returns fewer than k ids only when the pool runs out.
+        """
+        parts, cumulative = self._pool(filters)
+        total = cumulative[-1] if cumulative else 0
+        picked = []
+        if total == 0 or k <= 0:
+            return picked
+
+        taken = set()
+        attempts = 0
+        while len(picked) < k and attempts < k * MAX_REJECTIONS_PER_PICK:
+            attempts += 1
+            position = random.randrange(total)
+            part = bisect.bisect_right(cumulative, position)
+            offset = position - (cumulative[part - 1] if part else 0)
+            qid = parts[part][offset]
+            if qid in exclude or qid in taken:
+                continue
+            taken.add(qid)
+            picked.append(qid)
+
+        if len(picked) < k:
+            # Exclusions cover most of the pool: sample from what is left
+            remaining = [
+                qid for ids in parts for qid in ids
+                if qid not in exclude and qid not in taken
+            ]
+            picked.extend(random.sample(remaining, min(k - len(picked), len(remaining))))
+        return picked
+
+
+_index = None
+_index_key = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_question_index(conn=None):
+    """
+    Return the question index, rebuilding it when questions were added,
+    removed (count / max id changed) or edited (questions version marker).
+    The key is re-checked at most every QUESTION_INDEX_CHECK_INTERVAL
+    seconds; edits made in this process invalidate it immediately.
+    """
+    global _index, _index_key, _index_checked_at
+
+    now = time.monotonic()
+    with _index_lock:
+        if _index_key is not None and now - _index_checked_at < QUESTION_INDEX_CHECK_INTERVAL:
+            return _index
+
+    key = (questions_version(), get_questions_fingerprint(conn=conn))
+    with _index_lock:
+        if key == _index_key:
+            _index_checked_at = now
+            return _index
+
+    index = QuestionIndex(get_question_index_rows(conn=conn))
+    with _index_lock:
+        _index, _index_key, _index_checked_at = index, key, now
+    logger.info(f"Built question index over {index.size} questions")
+    return index
+
+
+def invalidate_question_index():
+    """Force a rebuild on next use (e.g. a sampled question no longer exists)."""
+    global _index_key
+    with _index_lock:
+        _index_key = None
@@ -0,0 +1,76 @@
+import atexit
+import logging
+import threading
+from config import QUESTION_STATS_FLUSH_INTERVAL
+from models.question_model import add_question_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionStatsAccumulator:
+    """
+    Per-question usage (times asked, score sum) collected in memory by the
+    grading path and written to the questions table in batches by a
+    background thread, instead of one read-modify-write per submit.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, question_id, score):
+        with self._lock:
+            count, score_sum = self._pending.get(question_id, (0, 0.0))
+            self._pending[question_id] = (count + 1, score_sum + (score or 0))
+            if self._thread is None or not self._thread.is_alive():
+                # Started on first use so importing this module (scripts,
+                # migrations, forked workers) does not spawn a thread
+                self._thread = threading.Thread(
+                    target=self._run, name='question-stats-flusher', daemon=True
+                )
+                self._thread.start()
+
+    def flush(self):
+        """Write everything accumulated so far. Returns the number of questions updated."""
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, {}
+            if not deltas:
+                return 0
+            try:
+                add_question_stats(deltas)
+            except Exception as e:
+                # Keep the counts for the next flush rather than dropping them
+                with self._lock:
+                    for qid, (count, score_sum) in deltas.items():
+                        pending_count, pending_sum = self._pending.get(qid, (0, 0.0))
+                        self._pending[qid] = (pending_count + count, pending_sum + score_sum)
+                logger.warning(f"Question stats flush failed, will retry: {e}")
+                return 0
+            return len(deltas)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def shutdown(self):
+        self._stop.set()
+        self.flush()
+
+
+_accumulator = QuestionStatsAccumulator(QUESTION_STATS_FLUSH_INTERVAL)
+atexit.register(_accumulator.shutdown)
+
+
+def record_question_scores(scores):
+    """Count graded answers towards question stats; scores is an iterable of (question_id, score)."""
+    for question_id, score in scores:
+        _accumulator.record(question_id, score)
+
+
+def flush_question_stats():
+    return _accumulator.flush()
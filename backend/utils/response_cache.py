@@ -0,0 +1,67 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import current_app, request
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+# JSON bodies of read-mostly dashboard endpoints, keyed by tuples such as
+# ('student_stats', user_id) or ('admin', 'stats'). Entries expire after
+# RESPONSE_CACHE_TTL seconds and are dropped early by invalidate_responses()
+# when a write changes what they show. The cache is per process, so other
+# workers catch up within the TTL.
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def _store(key, ttl, body, etag):
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, body, etag)
+        _entries.move_to_end(key)
+        while len(_entries) > RESPONSE_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def cached_json(key, compute, ttl=RESPONSE_CACHE_TTL):
+    """
+    Respond with compute()'s JSON-serializable result, reusing the cached
+    body for key while it is fresh. The response carries an ETag, and a
+    request whose If-None-Match matches gets an empty 304.
+    Results that look like errors (a dict with an 'error' key) are not cached.
+    """
+    entry = _lookup(key)
+    if entry is None:
+        data = compute()
+        body = current_app.json.dumps(data).encode('utf-8')
+        etag = hashlib.sha1(body).hexdigest()
+        if not (isinstance(data, dict) and 'error' in data):
+            _store(key, ttl, body, etag)
+    else:
+        _, body, etag = entry
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Let the browser keep the body but revalidate it on every load
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def invalidate_responses(*prefix):
+    """Drop every cached response whose key starts with prefix."""
+    n = len(prefix)
+    with _lock:
+        for key in [k for k in _entries if k[:n] == prefix]:
+            del _entries[key]
@@ -0,0 +1,28 @@
+"""
+Process-pool side of the bulk resume import (services/resume_import_service.py).
+
+Each pool process builds the skill dictionary once from the rows passed to
+init_worker, so parsing never touches the database from a child process.
+"""
+from utils.pdf_parser import extract_text_from_pdf
+from utils.skill_extractor import SkillDictionary, SkillStream
+
+_dictionary = None
+
+
+def init_worker(skills):
+    global _dictionary
+    _dictionary = SkillDictionary(skills)
+
+
+def parse_resume(pdf):
+    """
+    Return (extracted_text, skills) of one PDF, given as a path or bytes.
+    Raises ValueError for a PDF without text.
+    """
+    extracted_text = extract_text_from_pdf(pdf)
+    if not extracted_text:
+        raise ValueError('PDF appears to be empty or unreadable')
+    stream = SkillStream()
+    stream.feed(extracted_text)
+    return extracted_text, stream.skills(_dictionary)
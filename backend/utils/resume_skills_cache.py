@@ -0,0 +1,53 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from config import RESUME_SKILLS_CACHE_SIZE
+from models.resume_model import get_resume_by_id, get_resume_skills_row, save_resume_skills
+from utils.skill_extractor import extract_skills_from_text
+
+logger = logging.getLogger(__name__)
+
+# LRU of resume_id -> skills. A resume's skills are written once (at upload, or
+# the first time an older resume is used) and never change afterwards, and
+# resume ids are never reused, so entries need no invalidation.
+_skills = OrderedDict()
+_lock = threading.Lock()
+
+
+def remember_resume_skills(resume_id, skills):
+    with _lock:
+        _skills[resume_id] = tuple(skills)
+        _skills.move_to_end(resume_id)
+        while len(_skills) > RESUME_SKILLS_CACHE_SIZE:
+            _skills.popitem(last=False)
+
+
+def get_resume_skills(resume_id, conn=None):
+    """
+    Return the skills of a resume as a new list (callers may extend it),
+    or None if the resume does not exist.
+    """
+    with _lock:
+        skills = _skills.get(resume_id)
+        if skills is not None:
+            _skills.move_to_end(resume_id)
+            return list(skills)
+
+    row = get_resume_skills_row(resume_id, conn=conn)
+    if not row:
+        return None
+
+    if row['skills'] is not None:
+        skills = json.loads(row['skills'])
+    else:
+        # Uploaded before skills were stored: extract once and persist
+        resume = get_resume_by_id(resume_id, conn=conn)
+        skills = extract_skills_from_text(resume['extracted_text'])
+        try:
+            save_resume_skills(resume_id, skills, conn=conn)
+        except Exception as e:
+            logger.warning(f"Could not store skills for resume {resume_id}: {e}")
+
+    remember_resume_skills(resume_id, skills)
+    return list(skills)
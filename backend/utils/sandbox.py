@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import select
+import logging
+import tempfile
+import threading
+import subprocess
+from config import (
+    SANDBOX_ENABLED, SANDBOX_POOL_SIZE, SANDBOX_MAX_JOBS_PER_WORKER,
+    SANDBOX_MEMORY_LIMIT_MB, SANDBOX_OUTPUT_LIMIT, SANDBOX_QUEUE_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_worker.py')
+
+# Extra time allowed for the worker to report back after the job's own timeout
+# before the worker itself is considered hung and killed.
+WORKER_GRACE_SECONDS = 2.0
+
+# How often a job waiting on its worker checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.05
+
+
+class SandboxError(Exception):
+    pass
+
+
+class SandboxCancelled(SandboxError):
+    """The job's cancel event was set; its worker was stopped."""
+    pass
+
+
+def sandbox_available():
+    """The pool needs fork() and POSIX resource limits (Linux/macOS)."""
+    return SANDBOX_ENABLED and os.name == 'posix' and hasattr(os, 'fork')
+
+
+class SandboxWorker:
+    """One long-lived worker interpreter speaking JSON lines over its stdin/stdout."""
+
+    def __init__(self):
+        # Minimal environment: user code must not see SECRET_KEY and friends
+        env = {
+            'PATH': os.environ.get('PATH', '/usr/bin:/bin'),
+            'LANG': 'C.UTF-8',
+            'PYTHONIOENCODING': 'utf-8',
+            'SANDBOX_MEMORY_LIMIT_MB': str(SANDBOX_MEMORY_LIMIT_MB),
+            'SANDBOX_OUTPUT_LIMIT': str(SANDBOX_OUTPUT_LIMIT),
+        }
+        self.proc = subprocess.Popen(
+            [sys.executable, '-I', '-u', WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=tempfile.gettempdir(),
+            env=env,
+        )
+        self.jobs = 0
+
+    def run(self, job, timeout, cancel=None):
+        self.jobs += 1
+        self.proc.stdin.write((json.dumps(job) + '\n').encode('utf-8'))
+        self.proc.stdin.flush()
+
+        deadline = time.monotonic() + timeout + WORKER_GRACE_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SandboxError("Sandbox worker did not respond")
+            wait = min(remaining, CANCEL_POLL_SECONDS) if cancel is not None else remaining
+            ready, _, _ = select.select([self.proc.stdout], [], [], wait)
+            if ready:
+                break
+            if cancel is not None and cancel.is_set():
+                raise SandboxCancelled("Sandbox job cancelled")
+        line = self.proc.stdout.readline()
+        if not line:
+            raise SandboxError("Sandbox worker exited unexpectedly")
+        return json.loads(line)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def close(self):
+        try:
+            # SIGTERM first: the worker then kills the answer it is running
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait(timeout=1)
+        except Exception:
+            pass
+
+
+class SandboxPool:
+    """
+    Fixed-size pool of pre-started sandbox workers.
+    Workers are recycled after SANDBOX_MAX_JOBS_PER_WORKER jobs or on any failure.
+    """
+
+    def __init__(self, size, max_jobs):
+        self.size = size
+        self.max_jobs = max_jobs
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_started(self):
+        # A pool inherited through fork (e.g. gunicorn preload) must not be shared
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._idle = queue.Queue()
+            self._workers = []
+            for _ in range(self.size):
+                self._add_worker()
+            self._pid = os.getpid()
+            logger.info(f"Started sandbox pool with {self.size} workers")
+
+    def _add_worker(self):
+        worker = SandboxWorker()
+        self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _retire(self, worker):
+        worker.close()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self._add_worker()
+
+    def run(self, job, timeout, cancel=None):
+        """
+        Run one job on an idle worker; blocks while all workers are busy.
+        Setting cancel (a threading.Event) stops the job and its worker,
+        raising SandboxCancelled.
+        """
+        self._ensure_started()
+        try:
+            worker = self._idle.get(timeout=SANDBOX_QUEUE_TIMEOUT)
+        except queue.Empty:
+            raise SandboxError("All code runners are busy. Please try again in a moment.")
+
+        if cancel is not None and cancel.is_set():
+            self._idle.put(worker)
+            raise SandboxCancelled("Sandbox job cancelled")
+        try:
+            result = worker.run(job, timeout, cancel)
+        except Exception:
+            self._retire(worker)
+            raise
+
+        if worker.jobs >= self.max_jobs or not worker.alive():
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+            self._pid = None
+
+
+_pool = SandboxPool(SANDBOX_POOL_SIZE, SANDBOX_MAX_JOBS_PER_WORKER)
+atexit.register(_pool.shutdown)
+
+
+def _run_once(job, timeout):
+    """Run a job in a one-off worker process (platforms without fork())."""
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-I', WORKER_SCRIPT, '--once'],
+            input=json.dumps(job),
+            capture_output=True,
+            text=True,
+            timeout=timeout + WORKER_GRACE_SECONDS,
+            cwd=tempfile.gettempdir(),
+        )
+    except subprocess.TimeoutExpired:
+        return {'output': '', 'error': '', 'timed_out': True, 'duration_ms': timeout * 1000}
+    try:
+        return json.loads(completed.stdout)
+    except ValueError:
+        raise SandboxError(completed.stderr.strip() or "Sandbox worker exited unexpectedly")
+
+
+def run_in_sandbox(code, timeout, cancel=None, **job):
+    """
+    Run code in the sandbox pool (or a one-off worker where the pool is
+    unavailable). Extra keyword arguments become job fields, e.g.
+    mode='grade', inputs=[...], case_timeout=2.
+    cancel is an optional threading.Event that stops the job when set
+    (raising SandboxCancelled); one-off workers cannot be cancelled.
+    Returns a dict with output, error, timed_out and duration_ms
+    (plus 'result' for jobs that produce a structured payload).
+    Raises SandboxError when no worker is free or a worker fails.
+    """
+    job.update({'code': code, 'timeout': timeout})
+    if not sandbox_available():
+        return _run_once(job, timeout)
+    return _pool.run(job, timeout, cancel)
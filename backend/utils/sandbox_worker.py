@@ -0,0 +1,376 @@
+"""
+Sandbox worker process (started by utils/sandbox.py, not imported by the app).
+
+The worker is a long-lived interpreter that reads one JSON job per line on
+stdin and writes one JSON result per line on stdout. Jobs either run code as a
+script (mode "run") or load a coding answer and call it on test inputs
+(mode "grade"); graded jobs return a structured payload under "result". Every job runs in a
+freshly forked child so user code never shares state with other jobs, and the
+child drops its privileges before running anything:
+    - RLIMIT_CPU / RLIMIT_AS / RLIMIT_FSIZE / RLIMIT_NPROC resource limits
+    - a private network namespace when available, otherwise an audit hook that
+      refuses socket creation
+The parent enforces the wall-clock timeout and caps captured output.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import selectors
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - POSIX only
+    resource = None
+
+MAX_OUTPUT_BYTES = int(os.environ.get('SANDBOX_OUTPUT_LIMIT', 64 * 1024))
+MAX_RESULT_BYTES = 1024 * 1024
+MAX_VALUE_CHARS = 16 * 1024
+MEMORY_LIMIT_BYTES = int(os.environ.get('SANDBOX_MEMORY_LIMIT_MB', 256)) * 1024 * 1024
+
+# Duplicate of the worker's stdout used for results; closed in every child
+_protocol_fd = None
+
+# Pid of the child running the current job (killed with the worker on SIGTERM)
+_child_pid = None
+
+_BLOCKED_EVENTS = ('socket.', 'ctypes.dlopen', 'ctypes.dlsym', 'os.fork', 'os.system', 'subprocess.Popen', 'os.exec', 'os.posix_spawn', 'os.spawn')
+
+
+def _block_network():
+    unshare = getattr(os, 'unshare', None)
+    if unshare is not None and hasattr(os, 'CLONE_NEWNET'):
+        try:
+            unshare(os.CLONE_NEWNET)
+        except OSError:
+            pass
+
+    def audit(event, args):
+        if event.startswith(_BLOCKED_EVENTS):
+            raise PermissionError(f"'{event}' is not allowed in the sandbox")
+
+    # Audit hooks cannot be removed once installed
+    sys.addaudithook(audit)
+
+
+def _apply_limits(cpu_seconds):
+    if resource is None:
+        return
+    limits = [
+        (resource.RLIMIT_CPU, cpu_seconds),
+        (resource.RLIMIT_AS, MEMORY_LIMIT_BYTES),
+        (resource.RLIMIT_FSIZE, MAX_OUTPUT_BYTES),
+        (resource.RLIMIT_NPROC, 0),
+    ]
+    for limit, value in limits:
+        try:
+            resource.setrlimit(limit, (value, value))
+        except (ValueError, OSError):
+            pass
+
+
+def _run_child(job, out_w, err_w, result_w):
+    """Runs in the forked child; never returns."""
+    os.close(_protocol_fd)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_w, 1)
+    os.dup2(err_w, 2)
+    sys.stdout = os.fdopen(1, 'w', buffering=1)
+    sys.stderr = os.fdopen(2, 'w', buffering=1)
+    status = 0
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        os.setsid()
+        _apply_limits(int(job.get('timeout', 5)) + 1)
+        _block_network()
+        payload = _execute(job)
+        if payload is not None:
+            os.write(result_w, json.dumps(payload).encode('utf-8'))
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 1
+    except BaseException as e:
+        _print_user_traceback(e)
+        status = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(status)
+
+
+def _print_user_traceback(exc):
+    """Print a traceback like a plain `python main.py` run, hiding sandbox frames."""
+    frames = [f for f in traceback.extract_tb(exc.__traceback__) if f.filename != __file__]
+    lines = []
+    if frames:
+        lines.append('Traceback (most recent call last):\n')
+        lines.extend(traceback.format_list(frames))
+    lines.extend(traceback.format_exception_only(type(exc), exc))
+    sys.stderr.write(''.join(lines))
+
+
+def _execute(job):
+    """Execute the job's code. Returns an optional structured payload."""
+    if job.get('mode') == 'grade':
+        return _grade(job)
+    code = compile(job['code'], '<main>', 'exec')
+    exec(code, {'__name__': '__main__', '__builtins__': __builtins__})
+    return None
+
+
+class _CaseTimeout(BaseException):
+    # BaseException so a bare `except Exception` in user code cannot swallow it
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _CaseTimeout()
+
+
+def _run_case(func, inp, timeout):
+    """Call the answer on one test input with its own time budget."""
+    has_timer = timeout and hasattr(signal, 'setitimer')
+    start = time.perf_counter()
+    if has_timer:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if isinstance(inp, list):
+            res = func(*inp)
+        else:
+            res = func(inp)
+        value = str(res)
+        case = {'status': 'ok', 'value': value[:MAX_VALUE_CHARS]}
+        if len(value) > MAX_VALUE_CHARS:
+            case['truncated'] = True
+    except _CaseTimeout:
+        case = {'status': 'timeout'}
+    except Exception as e:
+        case = {'status': 'error', 'error': str(e)[:MAX_VALUE_CHARS]}
+    finally:
+        if has_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    case['ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return case
+
+
+def _grade(job):
+    """
+    Load a coding answer the way the evaluator always has (separate globals and
+    locals, module-level prints captured) and call the last function it defines
+    on each test input. Only inputs are sent here: expected outputs stay with
+    the caller, so the answer cannot report its own pass/fail.
+    """
+    import io
+
+    local_scope = {}
+    old_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        exec(compile(job['code'], '<string>', 'exec'), {}, local_scope)
+    except Exception as e:
+        return {'exec_error': str(e)}
+    finally:
+        captured, sys.stdout = sys.stdout, old_stdout
+    script_output = captured.getvalue().strip()[:MAX_VALUE_CHARS]
+
+    defined_callables = [
+        func for name, func in local_scope.items()
+        if callable(func) and getattr(func, '__module__', '') is None
+    ]
+    if not defined_callables:
+        return {'script_output': script_output, 'cases': None}
+
+    target_func = defined_callables[-1]
+    case_timeout = job.get('case_timeout')
+    budget = job.get('budget')
+    deadline = time.monotonic() + budget if budget else None
+    stop_on_timeout = job.get('stop_on_timeout', False)
+
+    cases = []
+    skip_reason = None
+    for inp in job.get('inputs', []):
+        if skip_reason is None and deadline is not None and time.monotonic() >= deadline:
+            skip_reason = 'budget'
+        if skip_reason is not None:
+            cases.append({'status': 'skipped', 'reason': skip_reason, 'ms': 0})
+            continue
+
+        timeout = case_timeout
+        cut_by_budget = False
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            cut_by_budget = not timeout or remaining < timeout
+            timeout = min(timeout, remaining) if timeout else remaining
+        case = _run_case(target_func, inp, timeout)
+        if case['status'] == 'timeout' and cut_by_budget:
+            # Stopped by the shared budget running out, not its own time limit
+            case = {'status': 'skipped', 'reason': 'budget', 'ms': case['ms']}
+            skip_reason = 'budget'
+        cases.append(case)
+        # A timed-out case almost always means a non-terminating solution;
+        # the remaining cases would only burn the same budget again.
+        if case['status'] == 'timeout' and stop_on_timeout:
+            skip_reason = 'aborted'
+    return {'script_output': script_output, 'cases': cases}
+
+
+def _collect(pid, fds, timeout):
+    """Read the child's pipes until EOF or deadline; returns (buffers, timed_out)."""
+    sel = selectors.DefaultSelector()
+    buffers = {}
+    for name, fd in fds.items():
+        sel.register(fd, selectors.EVENT_READ, name)
+        buffers[name] = bytearray()
+
+    deadline = time.monotonic() + timeout
+    open_fds = len(fds)
+    timed_out = False
+    while open_fds:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        for key, _ in sel.select(remaining):
+            chunk = os.read(key.fd, 8192)
+            if not chunk:
+                sel.unregister(key.fd)
+                open_fds -= 1
+                continue
+            buf = buffers[key.data]
+            limit = MAX_RESULT_BYTES if key.data == 'result' else MAX_OUTPUT_BYTES
+            if len(buf) < limit:
+                buf.extend(chunk[:limit - len(buf)])
+    sel.close()
+
+    if timed_out:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+    return buffers, timed_out
+
+
+def _terminate(signum, frame):
+    """SIGTERM from the pool (job cancelled or shutdown): kill the running answer too."""
+    if _child_pid is not None:
+        try:
+            os.killpg(_child_pid, signal.SIGKILL)
+        except OSError:
+            try:
+                os.kill(_child_pid, signal.SIGKILL)
+            except OSError:
+                pass
+    os._exit(0)
+
+
+def run_job(job):
+    timeout = float(job.get('timeout', 5))
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    res_r, res_w = os.pipe()
+    start = time.monotonic()
+
+    global _child_pid
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        os.close(res_r)
+        _run_child(job, out_w, err_w, res_w)
+    _child_pid = pid
+
+    for fd in (out_w, err_w, res_w):
+        os.close(fd)
+    buffers, timed_out = _collect(pid, {'output': out_r, 'error': err_r, 'result': res_r}, timeout)
+    for fd in (out_r, err_r, res_r):
+        os.close(fd)
+    _, status = os.waitpid(pid, 0)
+    _child_pid = None
+    duration_ms = round((time.monotonic() - start) * 1000, 1)
+
+    result = {
+        'output': buffers['output'].decode('utf-8', 'replace'),
+        'error': buffers['error'].decode('utf-8', 'replace'),
+        'timed_out': timed_out,
+        'duration_ms': duration_ms,
+    }
+    if os.WIFSIGNALED(status) and not timed_out:
+        sig = os.WTERMSIG(status)
+        if sig in (signal.SIGXCPU, signal.SIGKILL):
+            result['error'] += "\nProcess terminated: CPU time limit exceeded."
+        else:
+            result['error'] += f"\nProcess terminated by signal {sig}."
+    if buffers['result']:
+        try:
+            result['result'] = json.loads(buffers['result'].decode('utf-8'))
+        except ValueError:
+            result['error'] += "\nSystem Error: malformed sandbox result."
+    return result
+
+
+def run_once():
+    """
+    Run a single job read from stdin directly in this process (no fork, no
+    resource limits). Used by utils/sandbox.py on platforms without fork().
+    """
+    import io
+
+    job = json.loads(sys.stdin.read())
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = io.StringIO(), io.StringIO()
+    start = time.monotonic()
+    payload = None
+    try:
+        payload = _execute(job)
+    except SystemExit:
+        pass
+    except BaseException as e:
+        _print_user_traceback(e)
+    finally:
+        output, error = sys.stdout.getvalue(), sys.stderr.getvalue()
+        sys.stdout, sys.stderr = real_stdout, real_stderr
+
+    result = {
+        'output': output[:MAX_OUTPUT_BYTES],
+        'error': error[:MAX_OUTPUT_BYTES],
+        'timed_out': False,
+        'duration_ms': round((time.monotonic() - start) * 1000, 1),
+    }
+    if payload is not None:
+        result['result'] = payload
+    real_stdout.write(json.dumps(result))
+
+
+def main():
+    global _protocol_fd
+    # Keep the real protocol stream private so nothing else can write to it
+    _protocol_fd = os.dup(1)
+    proto_out = os.fdopen(_protocol_fd, 'w', buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    signal.signal(signal.SIGTERM, _terminate)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            result = run_job(json.loads(line))
+        except Exception as e:
+            result = {'output': '', 'error': f"System Error: {e}", 'timed_out': False, 'duration_ms': 0}
+        proto_out.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    if '--once' in sys.argv:
+        run_once()
+    else:
+        main()
@@ -0,0 +1,51 @@
+class SeenSet:
+    """
+    Set of question ids stored as a bitmap: bit n (little-endian within each
+    byte) is set when question id n has been seen. A few hundred bytes cover
+    the whole question bank, and membership tests are O(1).
+    """
+
+    __slots__ = ('_bits',)
+
+    def __init__(self, data=b''):
+        self._bits = bytearray(data or b'')
+
+    @classmethod
+    def from_ids(cls, question_ids):
+        seen = cls()
+        seen.update(question_ids)
+        return seen
+
+    def __contains__(self, question_id):
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            return False
+        byte = question_id >> 3
+        return 0 <= byte < len(self._bits) and bool(self._bits[byte] & (1 << (question_id & 7)))
+
+    def add(self, question_id):
+        question_id = int(question_id)
+        if question_id < 0:
+            raise ValueError(f"Invalid question id {question_id}")
+        byte = question_id >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(b'\x00' * (byte + 1 - len(self._bits)))
+        self._bits[byte] |= 1 << (question_id & 7)
+
+    def update(self, question_ids):
+        for question_id in question_ids:
+            self.add(question_id)
+
+    def __len__(self):
+        return bin(int.from_bytes(self._bits, 'little')).count('1')
+
+    def __iter__(self):
+        for byte_index, byte in enumerate(self._bits):
+            while byte:
+                low = byte & -byte
+                yield byte_index * 8 + low.bit_length() - 1
+                byte ^= low
+
+    def to_bytes(self):
+        return bytes(self._bits)
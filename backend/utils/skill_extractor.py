@@ -1,97 +1,195 @@
 import re
+import json
+import hashlib
+import threading
 from models.question_model import get_all_skills
 
+# Headers that mark the start of a resume's skills section, in priority order
+SKILL_HEADERS = ['technical skills', 'skills', 'technologies', 'competencies', 'programming languages']
+
+# BROAD SKILL PROTECTION:
+# Skills with very short names (like 'C') or generic names (like 'Networking')
+# only match inside an explicit "Skills" section. This prevents matching "C" in
+# "Concept" or "Networking" in "Professional Networking".
+BROAD_SKILLS = ['Web Development', 'Computer Networks']
+
+
+class SkillDictionary:
+    """
+    Every skill name and keyword compiled into one alternation regex, with
+    each term mapped back to the skills it belongs to. Extracting skills is a
+    single scan of the text; all terms must match on word boundaries.
+    version identifies the skills it was built from.
+    """
+
+    def __init__(self, skills):
+        self.version = hashlib.sha1(json.dumps(
+            [[s['id'], s['skill_name'], s['keywords']] for s in skills]
+        ).encode('utf-8')).hexdigest()
+        self.skill_names = []
+        # term -> indexes of skills matched by it inside a skills section
+        self._section_skills = {}
+        # term -> indexes of skills matched by it anywhere in the resume
+        self._global_skills = {}
+
+        for index, skill in enumerate(skills):
+            skill_name = skill['skill_name']
+            keywords = [kw.strip() for kw in skill['keywords'].lower().split(',')]
+            self.skill_names.append(skill_name)
+
+            for term in [skill_name.lower()] + keywords:
+                self._section_skills.setdefault(term, set()).add(index)
+
+            is_broad_skill = len(skill_name) <= 3 or skill_name in BROAD_SKILLS
+            if not is_broad_skill:
+                # Ultra-short keywords are ignored in the global search
+                for term in [skill_name.lower()] + [kw for kw in keywords if len(kw) > 2]:
+                    self._global_skills.setdefault(term, set()).add(index)
+
+        terms = {t for t in self._section_skills if t}
+        self._has_empty_term = '' in self._section_skills
+        self._bounded = {t: re.compile(r'\b' + re.escape(t) + r'\b') for t in terms}
+        # A term hidden behind a longer term starting at the same position is
+        # still present there, so remember which terms are prefixes of which.
+        self._prefixes = {
+            t: [p for p in terms if p != t and t.startswith(p)] for t in terms
+        }
+        if terms:
+            alternation = '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+            self._scanner = re.compile(r'(?=(' + alternation + r'))')
+        else:
+            self._scanner = None
+
+    def found_terms(self, text):
+        """Return the set of terms present in text on word boundaries."""
+        found = set()
+        if self._has_empty_term and re.search(r'\b', text):
+            # An empty keyword (e.g. a trailing comma) matches at any word boundary
+            found.add('')
+        if self._scanner is None:
+            return found
+        for m in self._scanner.finditer(text):
+            pos = m.start()
+            for term in [m.group(1)] + self._prefixes[m.group(1)]:
+                if term not in found and self._bounded[term].match(text, pos):
+                    found.add(term)
+        return found
+
+    def extract(self, text, in_section):
+        """Skill names found in text, in skills-table order."""
+        skills_by_term = self._section_skills if in_section else self._global_skills
+        matched = set()
+        for term in self.found_terms(text):
+            matched.update(skills_by_term.get(term, ()))
+        return [self.skill_names[i] for i in sorted(matched)]
+
+
+# Compiled dictionary for the current contents of the skills table
+_dictionary = None
+_dictionary_key = None
+_lock = threading.Lock()
+
+
+def get_skill_dictionary():
+    """
+    Return the compiled SkillDictionary, rebuilding it only when the skills
+    table has changed (it is re-read on every call, which is cheap; compiling
+    is not).
+    """
+    global _dictionary, _dictionary_key
+
+    skills = get_all_skills()
+    key = tuple((s['id'], s['skill_name'], s['keywords']) for s in skills)
+    with _lock:
+        if key == _dictionary_key:
+            return _dictionary
+
+    dictionary = SkillDictionary(skills)
+    with _lock:
+        _dictionary, _dictionary_key = dictionary, key
+    return dictionary
+
+
+# Characters after a skills header treated as the skills section
+SKILL_SECTION_LENGTH = 1000
+
+
+class SkillStream:
+    """
+    Skill extraction over text that arrives in pieces (e.g. PDF pages).
+
+    The highest-priority header that occurs anywhere in the text picks the
+    skills section, so the result is only known early when the top header
+    (SKILL_HEADERS[0]) shows up: once its section is complete, feed() stops
+    doing any work and returns True. Otherwise skills() decides after the
+    whole text has been fed. The result equals extract_skills_from_text()
+    on the concatenated text.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._length = 0
+        self._tail = ''
+        # header -> index of its first occurrence in the lowercased text
+        self._header_at = {}
+        self._overlap = max(len(h) for h in SKILL_HEADERS) - 1
+        self.complete = False
+
+    def feed(self, chunk):
+        """Add the next piece of text. Returns True once the result is final."""
+        if self.complete or not chunk:
+            return self.complete
+
+        chunk_lower = chunk.lower()
+        # Headers may straddle two pieces: search the end of the previous one too
+        window = self._tail + chunk_lower
+        window_start = self._length - len(self._tail)
+        for header in SKILL_HEADERS:
+            if header not in self._header_at:
+                idx = window.find(header)
+                if idx != -1:
+                    self._header_at[header] = window_start + idx
+
+        self._parts.append(chunk_lower)
+        self._length += len(chunk_lower)
+        self._tail = window[-self._overlap:] if self._overlap else ''
+
+        top = self._header_at.get(SKILL_HEADERS[0])
+        if top is not None and self._length >= top + SKILL_SECTION_LENGTH:
+            self.complete = True
+        return self.complete
+
+    def skills(self, dictionary=None):
+        """Skill names found in the text fed so far."""
+        text_lower = ''.join(self._parts)
+        dictionary = dictionary or get_skill_dictionary()
+
+        for header in SKILL_HEADERS:
+            start_idx = self._header_at.get(header)
+            if start_idx is not None:
+                # We found a skills section. Any match MUST come from there.
+                # Just grab the next 1000 chars as a heuristic for the skills section.
+                # This is much more accurate for professional resumes.
+                return dictionary.extract(text_lower[start_idx:start_idx + SKILL_SECTION_LENGTH], in_section=True)
+
+        # No explicit section: search the full text, skipping broad skills
+        return dictionary.extract(text_lower, in_section=False)
+
+
+def extract_skills_from_pages(pages):
+    """
+    Extract skills from text given as an iterable of pieces, reading no
+    further than needed once the skills section is known.
+    """
+    stream = SkillStream()
+    for page in pages:
+        if stream.feed(page):
+            break
+    return stream.skills()
+
+
 def extract_skills_from_text(resume_text):
     """
     Extract skills from resume text with section awareness to reduce false positives.
     """
-    text_lower = resume_text.lower()
-    
-    # 1. Try to isolate the "Skills" section
-    # Common headers for skills
-    skill_headers = ['technical skills', 'skills', 'technologies', 'competencies', 'programming languages']
-    
-    skills_section_text = ""
-    start_idx = -1
-    
-    for header in skill_headers:
-        # distinct header pattern (newline + header + newline/colon)
-        # simplistic check
-        idx = text_lower.find(header)
-        if idx != -1:
-            start_idx = idx
-            break
-            
-    if start_idx != -1:
-        # Find the next section header to stop (e.g., "Projects", "Experience")
-        # Just grab the next 1000 chars as a heuristic for the skills section
-        skills_section_text = text_lower[start_idx:start_idx+1000]
-    else:
-        # Fallback: Treat the bottom 30% of resume as likely place for skills if no header found?
-        # Or just use full text but be stricter.
-        skills_section_text = text_lower
-
-    # Get all skills from database
-    all_skills = get_all_skills()
-    matched_skills = []
-    
-    for skill in all_skills:
-        skill_name = skill['skill_name']
-        keywords = skill['keywords'].lower().split(',')
-        
-        # Strategy:
-        # If skill name/keyword is in the "Skills Section", it's a strong match.
-        # If it's only in general text, we need to be careful.
-        
-        is_match = False
-        
-        # 1. Check strict match in Skills Section (High Confidence)
-        if start_idx != -1:
-            if re.search(r'\b' + re.escape(skill_name.lower()) + r'\b', skills_section_text):
-                is_match = True
-            else:
-                for kw in keywords:
-                    if re.search(r'\b' + re.escape(kw.strip()) + r'\b', skills_section_text):
-                        is_match = True
-                        break
-        
-        # 2. If not found in explicit section, check full text BUT with exclusions
-        if not is_match and start_idx == -1:
-            # BROAD SKILL PROTECTION:
-            # For skills with very short names (like 'C') or generic keywords (like 'Networking'),
-            # we only match if they appear in an explicit "Skills" section.
-            # This prevents matching "C" in "Concept" or "Networking" in "Professional Networking".
-            is_broad_skill = len(skill_name) <= 3 or skill_name in ['Web Development', 'Computer Networks']
-            
-            if not is_broad_skill:
-                # Simple check: Does the skill name appear?
-                if re.search(r'\b' + re.escape(skill_name.lower()) + r'\b', text_lower):
-                     is_match = True
-                     
-                # If skill name didn't match, check keywords
-                if not is_match:
-                    for kw in keywords:
-                        kw = kw.strip()
-                        if len(kw) <= 2: continue # Ignore ultra-short keywords in global search
-                        if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                            is_match = True
-                            break
-
-        if start_idx != -1:
-             # We found a skills section. Any match MUST come from there.
-             # This is much more accurate for professional resumes.
-             is_match = False
-             if re.search(r'\b' + re.escape(skill_name.lower()) + r'\b', skills_section_text):
-                 is_match = True
-             else:
-                 for kw in keywords:
-                     kw = kw.strip()
-                     # In the explicit skills section, we can be slightly more lenient with kw length
-                     if re.search(r'\b' + re.escape(kw) + r'\b', skills_section_text):
-                         is_match = True
-                         break
-        
-        if is_match:
-            matched_skills.append(skill_name)
-    
-    return matched_skills
+    return extract_skills_from_pages([resume_text])
@@ -0,0 +1,197 @@
+import sys
+import os
+import sqlite3
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from database import get_db_connection
+from models.analytics_model import _student_summary_query
+
+
+def _student_summary_page(after_id=None, search=None):
+    """The admin student listing's keyset page, as get_student_summaries runs it."""
+    query, params = _student_summary_query(after_id, search)
+    return query + " LIMIT ?", tuple(params) + (51,)
+
+
+# Hot queries (copied from the services, routes and models that run them) that
+# must be answered through an index, and whose ORDER BY (if any) must come
+# from the index order instead of a temporary sort. Each is (name, sql, params).
+HOT_QUERIES = [
+    # interview_service.py / session_model.py: starting a session, every submit
+    ("answered questions of a session",
+     "SELECT question_id FROM answers WHERE session_id = ?", (1,)),
+    ("questions seen by a user",
+     """SELECT DISTINCT a.question_id FROM answers a
+        JOIN interview_sessions s ON a.session_id = s.id WHERE s.user_id = ?""", (1,)),
+    ("seen-question set",
+     "SELECT seen FROM user_seen_questions WHERE user_id = ?", (1,)),
+    ("session plan position",
+     "SELECT question_id, stage FROM session_plan WHERE session_id = ? AND position = ?", (1, 0)),
+    ("question with skill",
+     """SELECT q.*, s.skill_name FROM questions q
+        LEFT JOIN skills s ON q.skill_id = s.id WHERE q.id = ?""", (1,)),
+    ("session running score",
+     """UPDATE interview_sessions SET
+            answer_count = answer_count + ?,
+            score_sum = score_sum + ?,
+            technical_sum = technical_sum + ?,
+            communication_sum = communication_sum + ?,
+            problem_solving_sum = problem_solving_sum + ?,
+            total_score = (score_sum + ?) / (answer_count + ?)
+        WHERE id = ?""", (1, 5, 5, 5, 5, 5, 1, 1)),
+    ("skill totals of an answer",
+     """INSERT INTO skill_score_totals (skill_id, answer_count, score_sum)
+        SELECT skill_id, 1, ? FROM questions WHERE id = ? AND skill_id IS NOT NULL
+        ON CONFLICT(skill_id) DO UPDATE SET
+            answer_count = answer_count + excluded.answer_count,
+            score_sum = score_sum + excluded.score_sum""", (5, 1)),
+    ("flag an answer",
+     "UPDATE answers SET flagged = 1, flag_reason = ? WHERE session_id = ? AND question_id = ?", ('x', 1, 1)),
+
+    # student_service.py: student dashboard and history
+    ("student session count",
+     "SELECT COUNT(*) FROM interview_sessions WHERE user_id = ?", (1,)),
+    ("student average score",
+     "SELECT AVG(total_score) FROM interview_sessions WHERE user_id = ? AND status = 'completed'", (1,)),
+    ("student pending interviews",
+     "SELECT COUNT(*) FROM interview_sessions WHERE user_id = ? AND status = 'in_progress'", (1,)),
+    # Without its ORDER BY avg_score DESC: sorting the per-skill groups is unavoidable
+    ("student skill heatmap",
+     """SELECT s.skill_name, AVG(a.score) as avg_score, COUNT(a.id) as answer_count
+        FROM answers a
+        JOIN interview_sessions ises ON a.session_id = ises.id
+        JOIN questions q ON a.question_id = q.id
+        JOIN skills s ON q.skill_id = s.id
+        WHERE ises.user_id = ?
+        GROUP BY s.skill_name""", (1,)),
+    ("student history",
+     """SELECT id, total_score, status, started_at, total_questions FROM interview_sessions
+        WHERE user_id = ? ORDER BY started_at DESC""", (1,)),
+    ("candidate skills",
+     "SELECT skill_name FROM candidate_skills WHERE user_id = ?", (1,)),
+
+    # admin_routes.py / analytics_model.py / question_model.py: admin dashboard
+    ("admin session totals",
+     """SELECT COALESCE(SUM(total_sessions), 0) AS total_interviews,
+               COALESCE(SUM(completed_sessions), 0) AS completed_sessions,
+               COALESCE(SUM(completed_score_sum), 0) AS completed_score_sum,
+               COALESCE(SUM(completed_scored_sessions), 0) AS completed_scored_sessions,
+               COALESCE(SUM(strong_sessions), 0) AS strong_sessions
+        FROM student_stats""", ()),
+    ("admin student page", *_student_summary_page()),
+    ("admin student page after a cursor", *_student_summary_page(after_id=1)),
+    ("admin student search", *_student_summary_page(search='ann')),
+    ("admin student search after a cursor", *_student_summary_page(after_id=1, search='ann')),
+    ("admin question page",
+     """SELECT q.id, q.question_text, q.difficulty, q.question_type, q.topic, q.expected_keywords, s.skill_name
+        FROM questions q JOIN skills s ON q.skill_id = s.id
+        ORDER BY q.id DESC LIMIT ?""", (51,)),
+    ("admin question page of a skill after a cursor",
+     """SELECT q.id, q.question_text, q.difficulty, q.question_type, q.topic, q.expected_keywords, s.skill_name
+        FROM questions q JOIN skills s ON q.skill_id = s.id
+        WHERE q.skill_id = ? AND q.id < ?
+        ORDER BY q.id DESC LIMIT ?""", (1, 100, 51)),
+    ("admin question page filtered by difficulty, type and text",
+     """SELECT q.id, q.question_text, q.difficulty, q.question_type, q.topic, q.expected_keywords, s.skill_name
+        FROM questions q JOIN skills s ON q.skill_id = s.id
+        WHERE q.difficulty = ? AND q.question_type = ? AND q.question_text LIKE ? ESCAPE '\\' AND q.id < ?
+        ORDER BY q.id DESC LIMIT ?""", ('Easy', 'text', '%sql%', 100, 51)),
+    ("admin skill averages",
+     """SELECT sk.skill_name, t.score_sum / t.answer_count as avg_score
+        FROM skill_score_totals t
+        JOIN skills sk ON t.skill_id = sk.id
+        WHERE t.answer_count > 0""", ()),
+    ("admin daily activity",
+     """SELECT day as interview_date, session_count
+        FROM daily_activity
+        WHERE session_count > 0
+        ORDER BY day DESC
+        LIMIT ?""", (7,)),
+    ("admin recent activity",
+     """SELECT u.full_name, s.id as session_id, s.started_at, s.status,
+               s.total_questions as questions_answered, s.total_score
+        FROM interview_sessions s JOIN users u ON s.user_id = u.id
+        ORDER BY s.started_at DESC LIMIT 10""", ()),
+    # Without its ORDER BY s.started_at DESC: only the few flagged answers are sorted
+    ("admin reports",
+     """SELECT u.full_name as student_name, a.session_id, q.question_text, a.flag_reason,
+               a.transcript as user_answer, a.feedback, a.score
+        FROM answers a
+        JOIN interview_sessions s ON a.session_id = s.id
+        JOIN users u ON s.user_id = u.id
+        JOIN questions q ON a.question_id = q.id
+        WHERE a.flagged = 1""", ()),
+
+    # resume_job_model.py: background resume parsing and status polls
+    ("resume job claim",
+     """UPDATE resume_jobs
+        SET status = 'processing', stage = 'starting', progress = 0, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'queued'
+        RETURNING *""", (1,)),
+    ("resume job poll",
+     """SELECT j.*, substr(r.extracted_text, 1, 503) AS extracted_text,
+            j.updated_at < datetime('now', ?) AS stale
+        FROM resume_jobs j
+        LEFT JOIN resumes r ON j.resume_id = r.id
+        WHERE j.id = ?""", ('-300 seconds', 1)),
+    ("resume job requeue",
+     """UPDATE resume_jobs SET status = 'queued'
+        WHERE status = 'processing' AND updated_at < datetime('now', ?)""", ('-300 seconds',)),
+    ("queued resume jobs",
+     """SELECT id, filepath, updated_at < datetime('now', ?) AS stale
+        FROM resume_jobs WHERE status = 'queued' ORDER BY id""", ('-300 seconds',)),
+]
+
+# Tables (by the alias in the plan) a query is meant to read from start to
+# end: rollup tables with one small row per skill or student, and keyset
+# pages walking the primary key in order until LIMIT is reached
+EXPECTED_SCANS = {
+    "admin session totals": {"student_stats"},
+    "admin student page": {"u"},
+    "admin student search": {"u"},
+    "admin question page": {"q"},
+    "admin question page filtered by difficulty, type and text": {"q"},
+    "admin skill averages": {"t"},
+}
+
+
+def slow_steps(plan_rows, expected_scans=()):
+    """
+    Plan steps that read a whole table (SCAN without any index, unless the
+    table is in expected_scans) or sort the result in a temporary b-tree to
+    satisfy ORDER BY.
+    """
+    return [row['detail'] for row in plan_rows
+            if (row['detail'].startswith('SCAN') and 'INDEX' not in row['detail']
+                and row['detail'].split()[1] not in expected_scans)
+            or row['detail'] == 'USE TEMP B-TREE FOR ORDER BY']
+
+
+def check():
+    conn = get_db_connection()
+    failures = 0
+    try:
+        for name, sql, params in HOT_QUERIES:
+            try:
+                plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                # Table added by a migration that has not been run here
+                print(f"skip  {name}: {e}")
+                continue
+            scans = slow_steps(plan, EXPECTED_SCANS.get(name, ()))
+            if scans:
+                failures += 1
+                print(f"FAIL  {name}: {'; '.join(scans)}")
+            else:
+                print(f"ok    {name}: {'; '.join(row['detail'] for row in plan)}")
+    finally:
+        conn.close()
+
+    if failures:
+        print(f"{failures} hot queries fall back to a full table scan or sort. Run database/migrate_indexes.py.")
+    else:
+        print("All hot queries use an index.")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check() else 1)
@@ -0,0 +1,66 @@
+import sqlite3
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from models.analytics_model import rebuild_rollups
+
+# The rollups are maintained with upserts and UPDATE ... FROM (SQLite 3.33+)
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+def migrate():
+    if sqlite3.sqlite_version_info < (3, 33, 0):
+        print(f"Migration failed: SQLite 3.33+ is required, found {sqlite3.sqlite_version}")
+        return
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Creating admin dashboard rollup tables...")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_activity (
+                day TEXT PRIMARY KEY,
+                session_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS skill_score_totals (
+                skill_id INTEGER PRIMARY KEY,
+                answer_count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                FOREIGN KEY (skill_id) REFERENCES skills(id)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS student_stats (
+                user_id INTEGER PRIMARY KEY,
+                total_sessions INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                scored_sessions INTEGER NOT NULL DEFAULT 0,
+                completed_sessions INTEGER NOT NULL DEFAULT 0,
+                completed_score_sum REAL NOT NULL DEFAULT 0,
+                completed_scored_sessions INTEGER NOT NULL DEFAULT 0,
+                strong_sessions INTEGER NOT NULL DEFAULT 0,
+                last_active TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+        # Tables created before the averages skipped sessions without a score
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(student_stats)").fetchall()]
+        for column in ['scored_sessions', 'completed_scored_sessions']:
+            if column not in columns:
+                print(f"Adding {column} column...")
+                conn.execute(f"ALTER TABLE student_stats ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        conn.commit()
+
+        # Start the rollups from the sessions and answers recorded so far
+        print("Computing rollups from existing sessions and answers...")
+        rebuild_rollups(conn=conn)
+        print("Migration successful: rollup tables are ready.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
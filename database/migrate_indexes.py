@@ -0,0 +1,58 @@
+import sqlite3
+import os
+
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+# (index name, table, definition) chosen from the query shapes in
+# interview_service.py, session_model.py, admin_routes.py and
+# student_service.py. Run database/check_query_plans.py afterwards.
+INDEXES = [
+    # answered questions / seen-set rebuild / per-session score, covering
+    ("idx_answers_session_question", "answers", "answers(session_id, question_id, score)"),
+    # foreign key checks when a question is deleted with foreign_keys on
+    ("idx_answers_question_id", "answers", "answers(question_id)"),
+    # admin reports: only flagged answers are ever looked up
+    ("idx_answers_flagged", "answers", "answers(session_id) WHERE flagged = 1"),
+    # student history / dashboards: WHERE user_id = ? ORDER BY started_at DESC
+    ("idx_sessions_user_started", "interview_sessions", "interview_sessions(user_id, started_at)"),
+    # recent activity feed and per-day activity
+    ("idx_sessions_started", "interview_sessions", "interview_sessions(started_at)"),
+    # drive matching: skills of one candidate, covering
+    ("idx_candidate_skills_user", "candidate_skills", "candidate_skills(user_id, skill_name)"),
+]
+
+# Left-prefix duplicates of the new composite indexes, and
+# idx_sessions_status_score: the admin stats it covered now read the
+# student_stats rollup, and it had to be updated on every answer
+REDUNDANT_INDEXES = ["idx_answers_session_id", "idx_sessions_user_id", "idx_sessions_status_score"]
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        tables = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+        for name, table, definition in INDEXES:
+            if table not in tables:
+                print(f"Skipping {name}: table '{table}' does not exist.")
+                continue
+            print(f"Creating index {name}...")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+        for name in REDUNDANT_INDEXES:
+            print(f"Dropping redundant index {name}...")
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+        # Refresh planner statistics so the new indexes are picked up
+        conn.execute("ANALYZE")
+        conn.commit()
+        print("Migration successful: indexes are up to date.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
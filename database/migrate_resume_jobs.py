@@ -0,0 +1,42 @@
+import sqlite3
+import os
+
+# The app claims queued jobs with UPDATE ... RETURNING (SQLite 3.35+)
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Creating resume_jobs table...")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS resume_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                filepath TEXT NOT NULL,
+                content_hash TEXT,
+                status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'processing', 'done', 'failed')),
+                stage TEXT,
+                progress INTEGER NOT NULL DEFAULT 0,
+                resume_id INTEGER,
+                skills TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (resume_id) REFERENCES resumes(id)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_jobs_status ON resume_jobs(status)")
+        conn.commit()
+        print("Migration successful: resume_jobs table is ready.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
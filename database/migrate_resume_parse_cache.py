@@ -0,0 +1,39 @@
+import sqlite3
+import os
+
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Creating resume_parse_cache table...")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS resume_parse_cache (
+                content_hash TEXT PRIMARY KEY,
+                extracted_text TEXT NOT NULL,
+                skills TEXT,
+                skills_version TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        print("Checking for content_hash column in resume_jobs...")
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(resume_jobs)").fetchall()]
+        if 'content_hash' not in columns:
+            print("Adding content_hash column...")
+            conn.execute("ALTER TABLE resume_jobs ADD COLUMN content_hash TEXT")
+        else:
+            print("Column 'content_hash' already exists.")
+
+        conn.commit()
+        print("Migration successful: resume parse cache is ready.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
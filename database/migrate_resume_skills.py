@@ -0,0 +1,42 @@
+import sqlite3
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from utils.skill_extractor import extract_skills_from_text
+
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Checking for skills column in resumes...")
+        cursor = conn.execute("PRAGMA table_info(resumes)")
+        columns = [row['name'] for row in cursor.fetchall()]
+
+        if 'skills' not in columns:
+            print("Adding skills column...")
+            conn.execute("ALTER TABLE resumes ADD COLUMN skills TEXT")
+            print("Migration successful: Added 'skills' column.")
+        else:
+            print("Column 'skills' already exists.")
+
+        # Backfill existing resumes so interviews never have to extract on the fly
+        rows = conn.execute("SELECT id, extracted_text FROM resumes WHERE skills IS NULL").fetchall()
+        print(f"Extracting skills for {len(rows)} existing resumes...")
+        for row in rows:
+            skills = extract_skills_from_text(row['extracted_text'] or '')
+            conn.execute("UPDATE resumes SET skills = ? WHERE id = ?", (json.dumps(skills), row['id']))
+
+        conn.commit()
+        print("Backfill complete.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,43 @@
+import sqlite3
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from models.session_model import get_globally_seen_questions
+from utils.seen_set import SeenSet
+
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Creating user_seen_questions table...")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_seen_questions (
+                user_id INTEGER PRIMARY KEY,
+                seen BLOB NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+
+        # Backfill every user who has answered something
+        users = conn.execute("SELECT DISTINCT user_id FROM interview_sessions").fetchall()
+        print(f"Building seen-question sets for {len(users)} users...")
+        for row in users:
+            seen = SeenSet.from_ids(get_globally_seen_questions(row['user_id'], conn=conn))
+            conn.execute(
+                "INSERT OR REPLACE INTO user_seen_questions (user_id, seen) VALUES (?, ?)",
+                (row['user_id'], seen.to_bytes())
+            )
+
+        conn.commit()
+        print("Migration successful: user_seen_questions is up to date.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
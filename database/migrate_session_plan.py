@@ -0,0 +1,35 @@
+import sqlite3
+import os
+
+# The app creates sessions with INSERT ... RETURNING (SQLite 3.35+)
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+def migrate():
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Creating session_plan table...")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_plan (
+                session_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                question_id INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                PRIMARY KEY (session_id, position),
+                FOREIGN KEY (session_id) REFERENCES interview_sessions(id),
+                FOREIGN KEY (question_id) REFERENCES questions(id)
+            )
+        """)
+        conn.commit()
+        # Sessions started before this migration have no plan and keep
+        # choosing their questions one at a time.
+        print("Migration successful: session_plan table is ready.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
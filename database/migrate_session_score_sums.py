@@ -0,0 +1,66 @@
+import sqlite3
+import os
+
+# The backfill below uses UPDATE ... FROM (SQLite 3.33+)
+DATABASE_PATH = 'database/interview.db'
+if not os.path.exists(DATABASE_PATH):
+    DATABASE_PATH = '../database/interview.db'
+
+# Running sums kept on interview_sessions by session_model._add_to_session_score
+SUM_COLUMNS = [
+    ("answer_count", "INTEGER DEFAULT 0"),
+    ("score_sum", "REAL DEFAULT 0"),
+    ("technical_sum", "REAL DEFAULT 0"),
+    ("communication_sum", "REAL DEFAULT 0"),
+    ("problem_solving_sum", "REAL DEFAULT 0"),
+]
+
+def migrate():
+    if sqlite3.sqlite_version_info < (3, 33, 0):
+        print(f"Migration failed: SQLite 3.33+ is required, found {sqlite3.sqlite_version}")
+        return
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        print("Checking for score sum columns in interview_sessions...")
+        cursor = conn.execute("PRAGMA table_info(interview_sessions)")
+        columns = [row['name'] for row in cursor.fetchall()]
+
+        for name, definition in SUM_COLUMNS:
+            if name not in columns:
+                print(f"Adding {name} column...")
+                conn.execute(f"ALTER TABLE interview_sessions ADD COLUMN {name} {definition}")
+            else:
+                print(f"Column '{name}' already exists.")
+
+        # Backfill the sums (and total_score from them) from existing answers
+        print("Backfilling score sums from answers...")
+        conn.execute("""
+            UPDATE interview_sessions SET
+                answer_count = COALESCE(t.answer_count, 0),
+                score_sum = COALESCE(t.score_sum, 0),
+                technical_sum = COALESCE(t.technical_sum, 0),
+                communication_sum = COALESCE(t.communication_sum, 0),
+                problem_solving_sum = COALESCE(t.problem_solving_sum, 0),
+                total_score = COALESCE(t.score_sum / t.answer_count, 0)
+            FROM (
+                SELECT session_id,
+                       COUNT(*) AS answer_count,
+                       SUM(score) AS score_sum,
+                       SUM(technical_score) AS technical_sum,
+                       SUM(communication_score) AS communication_sum,
+                       SUM(problem_solving_score) AS problem_solving_sum
+                FROM answers
+                GROUP BY session_id
+            ) AS t
+            WHERE t.session_id = interview_sessions.id
+        """)
+        conn.commit()
+        print("Migration successful: session scores are now maintained incrementally.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -17,6 +17,7 @@ CREATE TABLE IF NOT EXISTS resumes (
     user_id INTEGER NOT NULL,
     filename TEXT NOT NULL,
     extracted_text TEXT NOT NULL,
+    skills TEXT, -- JSON list of skills extracted at upload (NULL = not extracted yet)
     uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
@@ -50,6 +51,36 @@ CREATE TABLE IF NOT EXISTS questions (
     FOREIGN KEY (skill_id) REFERENCES skills(id)
 );
 
+-- Resume ingestion jobs: an upload is parsed in the background and its
+-- progress is reported by GET /resume/jobs/<id>
+CREATE TABLE IF NOT EXISTS resume_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    filepath TEXT NOT NULL, -- retained copy of the upload ('' if not kept)
+    content_hash TEXT, -- SHA-256 of the uploaded bytes (key of resume_parse_cache)
+    status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'processing', 'done', 'failed')),
+    stage TEXT, -- step the worker is on while processing
+    progress INTEGER NOT NULL DEFAULT 0, -- percent
+    resume_id INTEGER,
+    skills TEXT, -- JSON list, once extracted
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (resume_id) REFERENCES resumes(id)
+);
+
+-- Text and skills parsed from each distinct uploaded PDF, keyed by the
+-- SHA-256 of its bytes, so re-uploading the same file skips parsing
+CREATE TABLE IF NOT EXISTS resume_parse_cache (
+    content_hash TEXT PRIMARY KEY,
+    extracted_text TEXT NOT NULL,
+    skills TEXT, -- JSON list (NULL = not extracted)
+    skills_version TEXT, -- version of the skill dictionary the skills came from
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Interview sessions table: Track each interview attempt
 CREATE TABLE IF NOT EXISTS interview_sessions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -57,6 +88,12 @@ CREATE TABLE IF NOT EXISTS interview_sessions (
     resume_id INTEGER NOT NULL,
     total_questions INTEGER NOT NULL,
     total_score REAL DEFAULT 0,
+    -- Running sums over the session's answers (total_score = score_sum / answer_count)
+    answer_count INTEGER DEFAULT 0,
+    score_sum REAL DEFAULT 0,
+    technical_sum REAL DEFAULT 0,
+    communication_sum REAL DEFAULT 0,
+    problem_solving_sum REAL DEFAULT 0,
     status TEXT DEFAULT 'in_progress' CHECK(status IN ('in_progress', 'completed')),
     started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     completed_at TIMESTAMP,
@@ -74,11 +111,60 @@ CREATE TABLE IF NOT EXISTS answers (
     feedback TEXT NOT NULL,
     flagged BOOLEAN DEFAULT 0, -- Added for reporting issues
     flag_reason TEXT,          -- Reason for flagging
+    technical_score REAL DEFAULT 0.0,
+    communication_score REAL DEFAULT 0.0,
+    problem_solving_score REAL DEFAULT 0.0,
     answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (session_id) REFERENCES interview_sessions(id),
     FOREIGN KEY (question_id) REFERENCES questions(id)
 );
 
+-- Session plan: the questions of a session, chosen when it starts and asked in order
+CREATE TABLE IF NOT EXISTS session_plan (
+    session_id INTEGER NOT NULL,
+    position INTEGER NOT NULL, -- 0-based order in which the question is asked
+    question_id INTEGER NOT NULL,
+    stage TEXT NOT NULL, -- Warm-up, Core, Advanced
+    PRIMARY KEY (session_id, position),
+    FOREIGN KEY (session_id) REFERENCES interview_sessions(id),
+    FOREIGN KEY (question_id) REFERENCES questions(id)
+);
+
+-- Seen questions: per-user bitmap of every question answered in any session
+-- (bit n of the blob = question id n), kept up to date when answers are saved
+CREATE TABLE IF NOT EXISTS user_seen_questions (
+    user_id INTEGER PRIMARY KEY,
+    seen BLOB NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Admin dashboard rollups, updated in the same transaction as the sessions
+-- and answers they summarize (see backend/models/analytics_model.py)
+CREATE TABLE IF NOT EXISTS daily_activity (
+    day TEXT PRIMARY KEY, -- date(started_at)
+    session_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS skill_score_totals (
+    skill_id INTEGER PRIMARY KEY,
+    answer_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    FOREIGN KEY (skill_id) REFERENCES skills(id)
+);
+
+CREATE TABLE IF NOT EXISTS student_stats (
+    user_id INTEGER PRIMARY KEY,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0, -- sum of total_score over all sessions
+    scored_sessions INTEGER NOT NULL DEFAULT 0, -- sessions with a total_score
+    completed_sessions INTEGER NOT NULL DEFAULT 0,
+    completed_score_sum REAL NOT NULL DEFAULT 0,
+    completed_scored_sessions INTEGER NOT NULL DEFAULT 0,
+    strong_sessions INTEGER NOT NULL DEFAULT 0, -- completed with total_score >= 7
+    last_active TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
 -- Drives table: Placement drives
 CREATE TABLE IF NOT EXISTS drives (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -89,8 +175,22 @@ CREATE TABLE IF NOT EXISTS drives (
     status TEXT DEFAULT 'Upcoming' -- Upcoming, Open, Completed
 );
 
+-- Candidate skills table: Skills extracted from each student's resume
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    skill_name TEXT NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_resumes_user_id ON resumes(user_id);
 CREATE INDEX IF NOT EXISTS idx_questions_skill_id ON questions(skill_id);
-CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON interview_sessions(user_id);
-CREATE INDEX IF NOT EXISTS idx_answers_session_id ON answers(session_id);
\ No newline at end of file
+-- Composite indexes below: add to existing databases with database/migrate_indexes.py
+CREATE INDEX IF NOT EXISTS idx_sessions_user_started ON interview_sessions(user_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON interview_sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_answers_session_question ON answers(session_id, question_id, score);
+CREATE INDEX IF NOT EXISTS idx_answers_question_id ON answers(question_id);
+CREATE INDEX IF NOT EXISTS idx_answers_flagged ON answers(session_id) WHERE flagged = 1;
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_user ON candidate_skills(user_id, skill_name);
+CREATE INDEX IF NOT EXISTS idx_resume_jobs_status ON resume_jobs(status);
\ No newline at end of file
@@ -251,31 +251,43 @@ async function loadAnalytics() {
     }
 }
 
-async function loadStudents() {
+let studentsCursor = null; // Last student id of the loaded pages
+
+async function loadStudents(append = false) {
 
     const tableBody = document.getElementById('students-table-body');
     if (!tableBody) {
         console.error("students-table-body not found!");
         return;
     }
-    tableBody.innerHTML = '<tr><td colspan="6" style="text-align: center;">Loading students...</td></tr>';
+    const moreButton = document.getElementById('students-more');
+    if (!append) {
+        studentsCursor = null;
+        tableBody.innerHTML = '<tr><td colspan="6" style="text-align: center;">Loading students...</td></tr>';
+    }
 
     try {
+        const params = new URLSearchParams();
+        const search = document.getElementById('s-search').value.trim();
+        if (search) params.set('q', search);
+        if (append && studentsCursor !== null) params.set('cursor', studentsCursor);
 
-
-        const response = await fetch(`${ADMIN_API_BASE}/students`);
+        const response = await fetch(`${ADMIN_API_BASE}/students?${params}`);
         if (!response.ok) throw new Error("Failed to fetch students. Status: " + response.status);
 
         const data = await response.json();
+        studentsCursor = data.next_cursor;
+        moreButton.style.display = data.next_cursor !== null ? 'inline-block' : 'none';
 
-        tableBody.innerHTML = '';
-        if (data.length === 0) {
+        if (!append) tableBody.innerHTML = '';
+        if (!append && data.students.length === 0) {
             tableBody.innerHTML = '<tr><td colspan="6">No students found</td></tr>';
             return;
         }
 
-        data.forEach(s => {
-            const row = `
+        let rowsHtml = '';
+        data.students.forEach(s => {
+            rowsHtml += `
                 <tr>
                     <td><b>${s.full_name}</b></td>
                     <td>${s.email}</td>
@@ -288,8 +300,8 @@ async function loadStudents() {
                     </td>
                 </tr>
             `;
-            tableBody.innerHTML += row;
         });
+        tableBody.insertAdjacentHTML('beforeend', rowsHtml);
 
     } catch (e) {
         console.error("Error in loadStudents:", e);
@@ -551,27 +563,51 @@ function animateValue(id, start, end, duration) {
 }
 // --- Question Management ---
 
-let allQuestions = []; // Store locally for sorting
+let allQuestions = []; // Loaded pages, stored locally for sorting
+let questionsCursor = null; // Last question id of the loaded pages
 
-async function loadQuestions() {
+async function loadQuestions(append = false) {
     const tableBody = document.getElementById('questions-table-body');
-    tableBody.innerHTML = '<tr><td colspan="5" style="text-align: center;">Loading questions...</td></tr>';
+    const moreButton = document.getElementById('questions-more');
+    if (!append) {
+        allQuestions = [];
+        questionsCursor = null;
+        tableBody.innerHTML = '<tr><td colspan="5" style="text-align: center;">Loading questions...</td></tr>';
+    }
 
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/questions`, {
+        // Filtering happens on the server; only one page is fetched at a time
+        const params = new URLSearchParams();
+        const search = document.getElementById('q-search').value.trim();
+        const skillFilter = document.getElementById('q-filter-skill').value;
+        const difficultyFilter = document.getElementById('q-filter-difficulty').value;
+        if (search) params.set('q', search);
+        if (skillFilter) params.set('skill_id', skillFilter);
+        if (difficultyFilter) params.set('difficulty', difficultyFilter);
+        if (append && questionsCursor !== null) params.set('cursor', questionsCursor);
+
+        const response = await fetch(`${ADMIN_API_BASE}/questions?${params}`, {
             headers: { 'Authorization': localStorage.getItem('token') }
         });
         if (!response.ok) throw new Error("Failed to load questions");
         const data = await response.json();
 
-        allQuestions = data.questions; // Store
-
-        // Populate Skills Dropdown
-        const skillSelect = document.getElementById('q-skill');
-        skillSelect.innerHTML = '';
-        data.skills.forEach(s => {
-            skillSelect.innerHTML += `<option value="${s.id}">${s.skill_name}</option>`;
-        });
+        allQuestions = allQuestions.concat(data.questions); // Store
+        questionsCursor = data.next_cursor;
+        moreButton.style.display = data.next_cursor !== null ? 'inline-block' : 'none';
+
+        if (!append) {
+            // Populate Skills Dropdowns
+            const skillSelect = document.getElementById('q-skill');
+            const filterSelect = document.getElementById('q-filter-skill');
+            let skillOptions = '';
+            data.skills.forEach(s => {
+                skillOptions += `<option value="${s.id}">${s.skill_name}</option>`;
+            });
+            skillSelect.innerHTML = skillOptions;
+            filterSelect.innerHTML = '<option value="">All Skills</option>' + skillOptions;
+            filterSelect.value = skillFilter;
+        }
 
         renderQuestionsTable();
 
@@ -4,6 +4,10 @@ import argparse
 import sys
 import os
 
+# Reuse the app's cache invalidation (it knows where the version marker lives)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from utils.evaluation_cache import mark_questions_changed
+
 DATABASE_PATH = 'database/interview.db'
 if not os.path.exists(DATABASE_PATH):
     if os.path.exists('interview.db'):
@@ -81,6 +85,7 @@ def add_question(args):
             ) VALUES (?, ?, ?, ?, ?)
         """, (skill_id, text, difficulty, keywords, q_type))
         conn.commit()
+        mark_questions_changed()
         print(f"\nQuestion added successfully.")
     except Exception as e:
         print(f"\nError adding question: {e}")
@@ -103,6 +108,7 @@ def delete_question(args):
         if confirm.lower() == 'y':
             conn.execute("DELETE FROM questions WHERE id = ?", (args.id,))
             conn.commit()
+            mark_questions_changed()
             print("Question deleted.")
         else:
             print("Deletion cancelled.")
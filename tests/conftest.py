@@ -0,0 +1,52 @@
+import os
+import sys
+import queue
+import sqlite3
+import pytest
+
+# The backend is run from its own directory (see Procfile); import it the same way
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'schema.sql')
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """
+    A fresh database built from database/schema.sql. Model functions called
+    without a conn use it through the backend's connection pool.
+    """
+    import database
+
+    path = str(tmp_path / 'interview.db')
+    conn = sqlite3.connect(path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    conn.close()
+
+    monkeypatch.setattr(database, 'DATABASE_PATH', path)
+    # Start a new pool so no connection to another test's database is reused
+    monkeypatch.setattr(database, '_pool_pid', None)
+    yield path
+    while True:
+        try:
+            database._idle.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+@pytest.fixture
+def seed(db):
+    """Add rows with plain sqlite3; returns the new row's id."""
+    def insert(table, **values):
+        conn = sqlite3.connect(db)
+        try:
+            columns = ', '.join(values)
+            marks = ', '.join('?' * len(values))
+            row_id = conn.execute(f"INSERT INTO {table} ({columns}) VALUES ({marks})", list(values.values())).lastrowid
+            conn.commit()
+        finally:
+            conn.close()
+        return row_id
+    return insert
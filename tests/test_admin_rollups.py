@@ -0,0 +1,137 @@
+import random
+import sqlite3
+import pytest
+from database import get_db_connection
+from models.analytics_model import (
+    ROLLUP_TABLES, remove_user_activity, rebuild_rollups, get_overall_stats, get_student_summaries
+)
+from models.session_model import create_session, save_answers_batch, complete_session
+
+
+def snapshot(db):
+    """Every rollup row, by table, in key order."""
+    conn = sqlite3.connect(db)
+    try:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall() for table in ROLLUP_TABLES}
+    finally:
+        conn.close()
+
+
+def assert_same_rollups(actual, expected):
+    for table in ROLLUP_TABLES:
+        assert len(actual[table]) == len(expected[table]), table
+        for got, want in zip(actual[table], expected[table]):
+            assert [pytest.approx(v) if isinstance(v, float) else v for v in got] == list(want), table
+
+
+def delete_user(user_id):
+    """The data delete_student removes, in the same order."""
+    conn = get_db_connection()
+    try:
+        remove_user_activity(conn, user_id)
+        conn.execute("DELETE FROM answers WHERE session_id IN (SELECT id FROM interview_sessions WHERE user_id = ?)", (user_id,))
+        conn.execute("DELETE FROM interview_sessions WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def record_activity(seed, rng):
+    """Random sessions, answers and completions; returns (users, question ids, skill ids)."""
+    skill_ids = [seed('skills', skill_name=name, keywords=name.lower()) for name in ('Python', 'SQL', 'Java')]
+    question_ids = [
+        seed('questions', skill_id=rng.choice(skill_ids), question_text=f'Question {i}', difficulty='Easy', expected_keywords='x')
+        for i in range(30)
+    ]
+    users = []
+    for i in range(4):
+        user_id = seed('users', full_name=f'Student {i}', email=f'student{i}@example.com', password_hash='x')
+        users.append((user_id, seed('resumes', user_id=user_id, filename='cv.pdf', extracted_text='x')))
+
+    sessions = []
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.15 or not sessions:
+            user_id, resume_id = rng.choice(users)
+            sessions.append(create_session(user_id, resume_id, 15))
+        elif action < 0.85:
+            # Answers also arrive after completion (late submits of a finished session)
+            batch = [{
+                'question_id': rng.choice(question_ids), 'user_answer': 'answer',
+                'score': round(rng.uniform(0, 10), 1), 'feedback': '',
+                'technical_score': 0, 'communication_score': 0, 'problem_solving_score': 0,
+            } for _ in range(rng.randint(1, 3))]
+            save_answers_batch(rng.choice(sessions), batch)
+        else:
+            # Completing twice must only count once
+            complete_session(rng.choice(sessions))
+    return users, question_ids, skill_ids
+
+
+@pytest.mark.parametrize('run', range(3))
+def test_rollups_match_a_rebuild(db, seed, run):
+    users, _, _ = record_activity(seed, random.Random(run))
+
+    delete_user(users[0][0])
+
+    maintained = snapshot(db)
+    assert maintained['student_stats'] and maintained['skill_score_totals'] and maintained['daily_activity']
+    rebuild_rollups()
+    assert_same_rollups(maintained, snapshot(db))
+
+
+def test_question_edits_keep_rollups_in_line(db, seed, tmp_path, monkeypatch):
+    import utils.evaluation_cache
+    from app import create_app
+    from services.auth_service import generate_token
+
+    monkeypatch.setattr(utils.evaluation_cache, 'QUESTIONS_VERSION_PATH', str(tmp_path / 'questions.version'))
+    rng = random.Random(7)
+    _, question_ids, skill_ids = record_activity(seed, rng)
+    admin_id = seed('users', full_name='Admin', email='admin@example.com', password_hash='x', role='admin')
+    client = create_app().test_client()
+    headers = {'Authorization': f'Bearer {generate_token(admin_id)}'}
+
+    for question_id in question_ids[:5]:
+        response = client.delete(f'/api/admin/questions/{question_id}', headers=headers)
+        assert response.status_code == 200
+    for question_id in question_ids[5:15]:
+        response = client.put(f'/api/admin/questions/{question_id}', headers=headers, json={
+            'skill_id': rng.choice(skill_ids), 'question_text': 'Edited', 'expected_keywords': 'x'
+        })
+        assert response.status_code == 200
+
+    maintained = snapshot(db)
+    rebuild_rollups()
+    assert_same_rollups(maintained, snapshot(db))
+
+
+def test_averages_skip_sessions_without_a_score(db, seed):
+    rng = random.Random(3)
+    users, question_ids, _ = record_activity(seed, rng)
+    # Sessions from before total_score defaulted to 0, picked up by the migration's rebuild
+    legacy = [
+        seed('interview_sessions', user_id=user_id, resume_id=resume_id, total_questions=15,
+             total_score=None, status=status)
+        for (user_id, resume_id), status in zip(users, ['completed', 'in_progress', 'completed', 'in_progress'])
+    ]
+    rebuild_rollups()
+    # A legacy session that gets answered and completed afterwards starts to count
+    save_answers_batch(legacy[1], [{
+        'question_id': question_ids[0], 'user_answer': 'answer', 'score': 4.0, 'feedback': '',
+        'technical_score': 0, 'communication_score': 0, 'problem_solving_score': 0,
+    }])
+    complete_session(legacy[1])
+
+    conn = sqlite3.connect(db)
+    try:
+        expected = dict(conn.execute("SELECT user_id, AVG(total_score) FROM interview_sessions GROUP BY user_id"))
+        completed_avg = conn.execute("SELECT AVG(total_score) FROM interview_sessions WHERE status = 'completed'").fetchone()[0]
+    finally:
+        conn.close()
+
+    summaries = {row['id']: row['avg_score'] for row in get_student_summaries(100)}
+    assert summaries == pytest.approx(expected)
+    totals = get_overall_stats()
+    assert totals['completed_score_sum'] / totals['completed_scored_sessions'] == pytest.approx(completed_avg)
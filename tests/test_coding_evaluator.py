@@ -0,0 +1,89 @@
+import json
+import time
+import pytest
+from utils import evaluator
+from utils.evaluator import evaluate_coding_answer
+from utils.sandbox import sandbox_available, SandboxError
+
+needs_sandbox = pytest.mark.skipif(not sandbox_available(), reason='needs the fork-based sandbox pool')
+
+SLEEPER = "def wait(seconds):\n    import time\n    time.sleep(seconds)\n    return seconds\n"
+
+
+def cases(inputs, outputs=None):
+    outputs = inputs if outputs is None else outputs
+    return json.dumps([{'input': i, 'output': o} for i, o in zip(inputs, outputs)])
+
+
+def statuses(result):
+    return [test['status'] for test in result['test_results']]
+
+
+@needs_sandbox
+def test_correct_answer_passes_every_case():
+    result = evaluate_coding_answer("def add(a, b):\n    return a + b\n", cases([[1, 2], [2, 3]], [3, 5]))
+    assert result['score'] == 10
+    assert statuses(result) == ['passed', 'passed']
+
+
+@needs_sandbox
+def test_wrong_output_fails_that_case():
+    result = evaluate_coding_answer("def add(a, b):\n    return a - b\n", cases([[1, 0], [2, 3]], [1, 5]))
+    assert statuses(result) == ['passed', 'failed']
+    assert result['score'] == 6.5
+
+
+@needs_sandbox
+def test_timed_out_case_skips_the_rest(monkeypatch):
+    monkeypatch.setattr(evaluator, 'CODING_TEST_TIMEOUT', 0.3)
+    answer = "def spin(x):\n    while x:\n        pass\n    return x\n"
+    start = time.monotonic()
+    result = evaluate_coding_answer(answer, cases([0, 1, 0, 0]))
+    assert time.monotonic() - start < 2
+    assert statuses(result) == ['passed', 'timeout', 'skipped', 'skipped']
+
+
+@needs_sandbox
+def test_cases_share_one_time_budget(monkeypatch):
+    monkeypatch.setattr(evaluator, 'CODING_TEST_TIMEOUT', 0.8)
+    monkeypatch.setattr(evaluator, 'CODING_TIME_BUDGET', 1)
+    start = time.monotonic()
+    result = evaluate_coding_answer(SLEEPER, cases([0.3] * 6))
+    assert time.monotonic() - start < 2
+    assert 'passed' in statuses(result)
+    assert statuses(result)[-1] == 'skipped'
+    assert 'time budget' in result['feedback']
+
+
+@needs_sandbox
+def test_timeout_in_one_chunk_cancels_the_others(monkeypatch):
+    monkeypatch.setattr(evaluator, 'CODING_TEST_TIMEOUT', 0.5)
+    monkeypatch.setattr(evaluator, 'CODING_PARALLEL_JOBS', 2)
+    monkeypatch.setattr(evaluator, 'CODING_MIN_CASES_PER_JOB', 2)
+    # First chunk times out on its second case; the second would take 1.6s
+    inputs = [0, 5, 0, 0, 0.4, 0.4, 0.4, 0.4]
+    start = time.monotonic()
+    result = evaluate_coding_answer(SLEEPER, cases(inputs))
+    assert time.monotonic() - start < 1.4
+    assert statuses(result)[:4] == ['passed', 'timeout', 'skipped', 'skipped']
+    assert 'skipped' in statuses(result)[4:]
+    assert len(result['test_results']) == len(inputs)
+
+
+@needs_sandbox
+def test_answer_that_exits_is_a_runtime_error():
+    result = evaluate_coding_answer("import os\nos._exit(3)\n", cases([1]))
+    assert result['score'] == 0
+    assert 'Runtime Error' in result['feedback']
+    assert not result.get('grading_error')
+
+
+def test_sandbox_failure_is_reported_as_ungraded(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise SandboxError('All code runners are busy. Please try again in a moment.')
+
+    monkeypatch.setattr(evaluator, 'run_in_sandbox', unavailable)
+    result = evaluate_coding_answer("def add(a, b):\n    return a + b\n", cases([[1, 2]], [3]))
+    assert result['score'] == 0
+    assert result['grading_error'] is True
+    assert 'Please retry' in result['feedback']
@@ -0,0 +1,81 @@
+import re
+import random
+import pytest
+from utils.evaluator import SYNONYMS, KeywordMatcher, get_keyword_matcher, _norm_term
+
+
+def reference_match(answer, expected_keywords):
+    """Keyword matching as _evaluate_text_variant did it before KeywordMatcher."""
+    if expected_keywords:
+        if isinstance(expected_keywords, list):
+            db_keywords = [str(k).strip().lower() for k in expected_keywords]
+        else:
+            db_keywords = [kw.strip().lower() for kw in str(expected_keywords).split(',') if kw.strip()]
+    else:
+        db_keywords = []
+
+    expanded = set(db_keywords)
+    for kw in db_keywords:
+        if kw in SYNONYMS:
+            expanded.update(SYNONYMS[kw])
+    critical_keywords = list(expanded)
+
+    def _norm(text):
+        return re.sub(r'[-_]', ' ', text.lower())
+
+    answer_norm = _norm(answer.lower())
+
+    def has_term(text_norm, term):
+        term_norm = _norm(term)
+        if len(term_norm) < 4:
+            return bool(re.search(r'\b' + re.escape(term_norm) + r'\b', text_norm))
+        return term_norm in text_norm
+
+    matched_critical = [kw for kw in critical_keywords if has_term(answer_norm, kw)]
+    covered_original = [
+        kw for kw in db_keywords
+        if any(has_term(answer_norm, f) for f in [kw] + SYNONYMS.get(kw, []))
+    ]
+    return critical_keywords, matched_critical, covered_original
+
+
+def check(answer, expected_keywords):
+    critical, matched, covered = reference_match(answer, expected_keywords)
+    matcher = KeywordMatcher(expected_keywords)
+    got_matched, got_covered = matcher.match(_norm_term(answer.lower()))
+    assert sorted(matcher.critical_keywords) == sorted(critical)
+    assert sorted(got_matched) == sorted(matched)
+    assert got_covered == covered
+
+
+@pytest.mark.parametrize('answer, keywords', [
+    ('A stack is LIFO and a queue is FIFO', 'stack, queue, lifo, fifo'),
+    ('Use an API over HTTP', 'api, http, rest'),
+    ('rapid prototyping', 'api'),                       # short term inside a word
+    ('SQLite is a database', 'sql, sqlite, database'),  # term that prefixes another
+    ('object-oriented design with multi_threading', 'object oriented, multi-threading'),
+    ('', 'stack, queue'),
+    ('anything at all', ''),
+    ('anything at all', ' , ,'),
+    ('The OS schedules processes', ['os', 'Process', ' scheduling ']),
+    ('polymorphism and inheritance', 'oop, polymorphism'),
+])
+def test_matches_reference_examples(answer, keywords):
+    check(answer, keywords)
+
+
+def test_matches_reference_random():
+    rng = random.Random(1)
+    vocabulary = sorted(set(SYNONYMS) | {s for syns in SYNONYMS.values() for s in syns})
+    vocabulary += ['os', 'io', 'db', 'api', 'sql', 'c++', 'a', 'lorem', 'ipsum', 'x-y', 'x_y']
+    for _ in range(500):
+        keywords = ', '.join(rng.sample(vocabulary, rng.randint(0, 8)))
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 40))]
+        separators = [rng.choice([' ', '', '-', '_', ', ', '. ']) for _ in words]
+        answer = ''.join(w + s for w, s in zip(words, separators))
+        check(answer, keywords)
+
+
+def test_matchers_are_cached_per_keyword_set():
+    assert get_keyword_matcher('stack, queue') is get_keyword_matcher('stack, queue')
+    assert get_keyword_matcher(['stack', 'queue']) is get_keyword_matcher(['stack', 'queue'])
@@ -0,0 +1,72 @@
+import time
+import threading
+import pytest
+from config import SANDBOX_OUTPUT_LIMIT
+from utils.sandbox import run_in_sandbox, sandbox_available, SandboxCancelled, WORKER_GRACE_SECONDS
+
+pytestmark = pytest.mark.skipif(not sandbox_available(), reason='needs the fork-based sandbox pool')
+
+
+def test_captures_output_and_traceback():
+    result = run_in_sandbox("print('hello')\nraise ValueError('boom')", timeout=5)
+    assert result['output'] == 'hello\n'
+    assert 'ValueError: boom' in result['error']
+    assert not result['timed_out']
+
+
+def test_infinite_loop_times_out():
+    start = time.monotonic()
+    result = run_in_sandbox('while True:\n    pass', timeout=1)
+    assert result['timed_out']
+    assert time.monotonic() - start < 1 + WORKER_GRACE_SECONDS
+
+
+def test_pool_recovers_after_timeout():
+    run_in_sandbox('while True:\n    pass', timeout=0.5)
+    assert run_in_sandbox("print(6 * 7)", timeout=5)['output'] == '42\n'
+
+
+def test_jobs_do_not_share_state():
+    # More jobs than workers, so some land on a worker that ran the first one
+    run_in_sandbox("import builtins\nbuiltins.leaked = True", timeout=5)
+    for _ in range(8):
+        result = run_in_sandbox("import builtins\nprint(hasattr(builtins, 'leaked'))", timeout=5)
+        assert result['output'] == 'False\n'
+
+
+def test_environment_is_not_inherited(monkeypatch):
+    monkeypatch.setenv('SECRET_KEY', 'do-not-leak')
+    result = run_in_sandbox("import os\nprint(os.environ.get('SECRET_KEY'))", timeout=5)
+    assert result['output'] == 'None\n'
+
+
+@pytest.mark.parametrize('code', [
+    "import socket\nsocket.socket()",
+    "import os\nos.system('echo escaped')",
+    "import subprocess\nsubprocess.run(['echo', 'escaped'])",
+])
+def test_network_and_processes_are_blocked(code):
+    result = run_in_sandbox(code, timeout=5)
+    assert 'escaped' not in result['output']
+    assert 'not allowed in the sandbox' in result['error']
+
+
+def test_memory_is_limited():
+    result = run_in_sandbox("data = bytearray(1024 * 1024 * 1024)\nprint('allocated')", timeout=5)
+    assert 'allocated' not in result['output']
+    assert 'MemoryError' in result['error']
+
+
+def test_output_is_capped():
+    result = run_in_sandbox("print('x' * 1000000)", timeout=5)
+    assert len(result['output']) <= SANDBOX_OUTPUT_LIMIT
+
+
+def test_cancel_stops_a_running_job():
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    start = time.monotonic()
+    with pytest.raises(SandboxCancelled):
+        run_in_sandbox("import time\ntime.sleep(30)", timeout=30, cancel=cancel)
+    assert time.monotonic() - start < 2
+    assert run_in_sandbox("print('still serving')", timeout=5)['output'] == 'still serving\n'
@@ -0,0 +1,105 @@
+import random
+import sqlite3
+import threading
+import pytest
+from models.session_model import create_session, save_answer, save_answers_batch
+
+
+@pytest.fixture
+def interview(seed):
+    """A new session and 50 questions to answer."""
+    user_id = seed('users', full_name='Test Student', email='student@example.com', password_hash='x')
+    skill_id = seed('skills', skill_name='Python', keywords='python')
+    resume_id = seed('resumes', user_id=user_id, filename='cv.pdf', extracted_text='Python')
+    question_ids = [
+        seed('questions', skill_id=skill_id, question_text=f'Question {i}', difficulty='Easy', expected_keywords='python')
+        for i in range(50)
+    ]
+    return create_session(user_id, resume_id, 15), question_ids
+
+
+def graded(question_id, rng):
+    return {
+        'question_id': question_id,
+        'user_answer': 'answer',
+        'score': round(rng.uniform(0, 10), 1),
+        'feedback': '',
+        'technical_score': round(rng.uniform(0, 10), 1),
+        'communication_score': round(rng.uniform(0, 10), 1),
+        'problem_solving_score': round(rng.uniform(0, 10), 1),
+    }
+
+
+def assert_matches_answers(db, session_id):
+    """The running sums on the session agree with aggregating its answers."""
+    conn = sqlite3.connect(db)
+    try:
+        expected = conn.execute(
+            """
+            SELECT COUNT(*), COALESCE(AVG(score), 0), COALESCE(SUM(score), 0),
+                   COALESCE(SUM(technical_score), 0), COALESCE(SUM(communication_score), 0),
+                   COALESCE(SUM(problem_solving_score), 0)
+            FROM answers WHERE session_id = ?
+            """,
+            (session_id,)
+        ).fetchone()
+        actual = conn.execute(
+            """
+            SELECT answer_count, total_score, score_sum, technical_sum, communication_sum, problem_solving_sum
+            FROM interview_sessions WHERE id = ?
+            """,
+            (session_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    assert actual[0] == expected[0]
+    assert actual[1:] == pytest.approx(expected[1:])
+    return expected[1]
+
+
+def test_new_session_scores_zero(db, interview):
+    session_id, _ = interview
+    assert assert_matches_answers(db, session_id) == 0
+
+
+def test_running_sums_match_avg_after_every_submit(db, interview):
+    session_id, question_ids = interview
+    rng = random.Random(16)
+    remaining = list(question_ids)
+    while remaining:
+        if rng.random() < 0.5:
+            answer = graded(remaining.pop(), rng)
+            score = save_answer(session_id, answer['question_id'], answer['user_answer'], answer['score'],
+                                answer['feedback'], answer['technical_score'], answer['communication_score'],
+                                answer['problem_solving_score'])
+        else:
+            batch = [graded(remaining.pop(), rng) for _ in range(min(rng.randint(1, 5), len(remaining)))]
+            score = save_answers_batch(session_id, batch)
+        assert score == pytest.approx(assert_matches_answers(db, session_id))
+
+
+def test_concurrent_submits_lose_no_answer(db, interview):
+    session_id, question_ids = interview
+    errors = []
+
+    def submit(worker):
+        rng = random.Random(worker)
+        try:
+            for question_id in question_ids[worker::5]:
+                save_answers_batch(session_id, [graded(question_id, rng)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=submit, args=(worker,)) for worker in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert_matches_answers(db, session_id)
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT answer_count FROM interview_sessions WHERE id = ?", (session_id,)).fetchone()[0] == len(question_ids)
+    finally:
+        conn.close()
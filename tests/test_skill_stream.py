@@ -0,0 +1,122 @@
+import re
+import random
+from utils.skill_extractor import (
+    SKILL_HEADERS, SkillDictionary, SkillStream, extract_skills_from_pages, extract_skills_from_text
+)
+
+SKILLS = [
+    {'skill_name': 'Python', 'keywords': 'python,django,flask,pandas'},
+    {'skill_name': 'Java', 'keywords': 'java,spring,jvm'},
+    {'skill_name': 'JavaScript', 'keywords': 'javascript,js,node.js,react'},
+    {'skill_name': 'C', 'keywords': 'c,pointers'},
+    {'skill_name': 'C++', 'keywords': 'c++,stl'},
+    {'skill_name': 'SQL', 'keywords': 'sql,mysql,postgresql,'},
+    {'skill_name': 'Go', 'keywords': 'go,golang'},
+    {'skill_name': 'Web Development', 'keywords': 'html,css,web development'},
+    {'skill_name': 'Computer Networks', 'keywords': 'networking,tcp,ip'},
+    {'skill_name': 'Machine Learning', 'keywords': 'machine learning,ml,scikit-learn'},
+]
+for skill_id, skill in enumerate(SKILLS, start=1):
+    skill['id'] = skill_id
+
+
+def reference_extract(resume_text, all_skills):
+    """extract_skills_from_text as it was before SkillDictionary/SkillStream."""
+    text_lower = resume_text.lower()
+    start_idx = -1
+    for header in ['technical skills', 'skills', 'technologies', 'competencies', 'programming languages']:
+        idx = text_lower.find(header)
+        if idx != -1:
+            start_idx = idx
+            break
+    skills_section_text = text_lower[start_idx:start_idx + 1000] if start_idx != -1 else text_lower
+
+    matched_skills = []
+    for skill in all_skills:
+        skill_name = skill['skill_name']
+        keywords = skill['keywords'].lower().split(',')
+        is_match = False
+        if start_idx == -1:
+            is_broad_skill = len(skill_name) <= 3 or skill_name in ['Web Development', 'Computer Networks']
+            if not is_broad_skill:
+                if re.search(r'\b' + re.escape(skill_name.lower()) + r'\b', text_lower):
+                    is_match = True
+                if not is_match:
+                    for kw in keywords:
+                        kw = kw.strip()
+                        if len(kw) <= 2:
+                            continue
+                        if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
+                            is_match = True
+                            break
+        else:
+            if re.search(r'\b' + re.escape(skill_name.lower()) + r'\b', skills_section_text):
+                is_match = True
+            else:
+                for kw in keywords:
+                    if re.search(r'\b' + re.escape(kw.strip()) + r'\b', skills_section_text):
+                        is_match = True
+                        break
+        if is_match:
+            matched_skills.append(skill_name)
+    return matched_skills
+
+
+def random_resume(rng):
+    words = ['Lorem', 'ipsum', 'built', 'services', 'with', 'concept', 'professional', 'team', 'C', 'Go']
+    words += [kw for skill in SKILLS for kw in skill['keywords'].split(',') if kw]
+    parts = []
+    for _ in range(rng.randint(1, 6)):
+        if rng.random() < 0.3:
+            parts.append('\n' + rng.choice(SKILL_HEADERS).title() + ':\n')
+        parts.append(' '.join(rng.choice(words) for _ in range(rng.randint(5, 300))))
+    return ' '.join(parts)
+
+
+def split(text, rng):
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 20))))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_stream_matches_reference_in_any_chunking():
+    rng = random.Random(22)
+    dictionary = SkillDictionary(SKILLS)
+    for _ in range(300):
+        text = random_resume(rng)
+        stream = SkillStream()
+        for chunk in split(text, rng):
+            if stream.feed(chunk):
+                break
+        assert stream.skills(dictionary) == reference_extract(text, SKILLS)
+
+
+def test_header_split_across_chunks():
+    dictionary = SkillDictionary(SKILLS)
+    stream = SkillStream()
+    chunks = ['Worked with Java. Technical Sk', 'ills: Python, Go']
+    for chunk in chunks:
+        stream.feed(chunk)
+    assert 'Java' not in stream.skills(dictionary)
+    assert stream.skills(dictionary) == reference_extract(''.join(chunks), SKILLS)
+
+
+def test_stops_reading_once_the_top_section_is_complete(db, seed):
+    for skill in SKILLS:
+        seed('skills', **skill)
+
+    first_page = 'Technical Skills: Python, Go\n' + 'x' * 1000
+
+    def pages():
+        yield first_page
+        raise AssertionError('read past the skills section')
+
+    assert extract_skills_from_pages(pages()) == reference_extract(first_page, SKILLS)
+
+
+def test_extract_from_text_uses_the_skills_table(db, seed):
+    for skill in SKILLS:
+        seed('skills', **skill)
+    rng = random.Random(10)
+    for _ in range(50):
+        text = random_resume(rng)
+        assert extract_skills_from_text(text) == reference_extract(text, SKILLS)